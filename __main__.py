@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+# __main__.py  -  Runs the command line interface of the PL-ETRF2000 to PL-2000 converter
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# cli.py  -  Command line interface of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Użycie: python -m <katalog wtyczki> --strefa 6 [plik_we] [plik_wy]
+#        python -m <katalog wtyczki> --odwrotnie [plik_we] [plik_wy]
+# Bez plików dane czytane są ze standardowego wejścia i zapisywane na standardowe wyjście.
+# Pliki .npy, .f64 i .bin są plikami binarnymi par współrzędnych float64 (konwerter.konwertuj_plik_binarny).
+# Wynik w pliku .gpkg albo .shp zapisywany jest jako warstwy punktowe stref PL-2000 (eksport.eksportuj_plik).
+# Opcje --uklad, --epoka i --siatka podają układ źródłowy φ λ przeliczany najpierw do PL-ETRF2000
+# (konwerter.do_pl_etrf2000).
+
+import sys, os, argparse, time
+
+from . import konwerter, eksport
+from .powiaty import granice_powiatow_dostepne, BRAK_GRANIC_POWIATOW
+
+SEPARATORY={"spacja":" ","tab":"\t","enter":"\n"}
+SEPARATORY_DZIESIETNE={"kropka":".","przecinek":","}
+
+def parser_argumentow():
+    parser=argparse.ArgumentParser(
+        description="Konwerter współrzędnych punktów z układu PL-ETRF2000 do układu PL-2000. "
+                    "Wiersz wejściowy: id φ λ w formacie deg albo dms. "
+                    "Wiersz wynikowy: id x y mx my, gdzie mx, my to dokładność w mm. "
+                    "Z opcją --odwrotnie wiersz wejściowy: id x y, wiersz wynikowy: id φ λ. "
+                    "Pliki .npy, .f64 i .bin zawierają pary współrzędnych float64 bez id "
+                    "i przeliczane są przez mapy pamięci. "
+                    "Plik wynikowy .gpkg albo .shp zawiera warstwy punktowe stref PL-2000.")
+    parser.add_argument("wejscie",nargs="?",default="-",
+                        help="plik ze współrzędnymi PL-ETRF2000 albo - dla standardowego wejścia")
+    parser.add_argument("wyjscie",nargs="?",default="-",
+                        help="plik wynikowy PL-2000 albo - dla standardowego wyjścia")
+    parser.add_argument("-s","--strefa",
+                        help="numer strefy PL-2000 (5-8), kod EPSG:2176-2179, auto "
+                             "dla strefy wg długości geograficznej λ każdego punktu albo powiat "
+                             "dla strefy wg granic powiatu, w którym leży punkt; "
+                             "z opcją --odwrotnie domyślnie strefa z pierwszej cyfry y")
+    parser.add_argument("--odwrotnie",action="store_true",help="konwersja z PL-2000 do PL-ETRF2000")
+    parser.add_argument("--format",choices=["deg","dms"],default="deg",
+                        help="format wynikowych φ λ konwersji odwrotnej (domyślnie deg)")
+    parser.add_argument("--separator",choices=SEPARATORY,default="spacja",
+                        help="separator współrzędnych (domyślnie spacja)")
+    parser.add_argument("--separator-dziesietny",choices=SEPARATORY_DZIESIETNE,default="kropka",
+                        help="separator dziesiętny wyników (domyślnie kropka)")
+    parser.add_argument("--kolejnosc-lb",action="store_true",help="współrzędne wejściowe w kolejności λ φ")
+    parser.add_argument("--kolejnosc-yx",action="store_true",help="współrzędne wynikowe w kolejności y x")
+    parser.add_argument("--podzial-stref",action="store_true",
+                        help="wiersze każdej strefy w osobnym pliku wynikowym nazwa_strefa_N")
+    parser.add_argument("--gk",action="store_true",
+                        help="przeliczenie szeregiem Krügera w numpy zamiast transformacji PROJ")
+    parser.add_argument("--uklad",
+                        help="kod układu źródłowego φ λ, np. EPSG:7912 (ITRF2014), przeliczanego najpierw "
+                             "do PL-ETRF2000 (domyślnie PL-ETRF2000)")
+    parser.add_argument("--epoka",type=float,
+                        help="epoka współrzędnych układu dynamicznego --uklad jako rok dziesiętny, np. 2024.5")
+    parser.add_argument("--siatka",
+                        help="plik siatki poprawek dφ dλ do PL-ETRF2000 (.npz albo tekst z wierszami φ λ dφ dλ, "
+                             "poprawki w sekundach)")
+    parser.add_argument("-p","--procesy",type=int,default=1,
+                        help="liczba procesów przeliczających dane równolegle, 0 - liczba rdzeni (domyślnie 1)")
+    return parser
+
+def strefa_z_argumentu(tekst):
+    if tekst==konwerter.STREFA_POWIATY and not granice_powiatow_dostepne():
+        raise argparse.ArgumentTypeError(BRAK_GRANIC_POWIATOW)
+    if tekst in konwerter.KODY_STREF.values() or tekst in (konwerter.STREFA_AUTO,konwerter.STREFA_POWIATY):
+        return tekst
+    if tekst.isdigit() and int(tekst) in konwerter.KODY_STREF:
+        return konwerter.kod_strefy(tekst)
+    raise argparse.ArgumentTypeError(f"nieznana strefa PL-2000: {tekst}")
+
+def uklad_zrodlowy(args):
+    # konwerter.UkladZrodlowy z opcji --uklad, --epoka i --siatka albo None dla PL-ETRF2000.
+    # Siatka wczytywana jest od razu, więc błędny plik zgłaszany jest przed konwersją.
+    if args.uklad is None and args.epoka is None and args.siatka is None:
+        return None
+    if args.siatka:
+        konwerter.wczytaj_siatke(args.siatka)
+    return konwerter.UkladZrodlowy(args.uklad or konwerter.KOD_PL_ETRF2000,args.epoka,args.siatka)
+
+def main(argv=None):
+    parser=parser_argumentow()
+    args=parser.parse_args(argv)
+    if args.strefa is None and not args.odwrotnie:
+        parser.error("wymagany jest argument -s/--strefa")
+    try:
+        strefa=strefa_z_argumentu(args.strefa) if args.strefa else None
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if args.odwrotnie and (args.uklad or args.epoka is not None or args.siatka):
+        parser.error("opcje --uklad, --epoka i --siatka dotyczą tylko konwersji do PL-2000")
+    try:
+        zrodlo=uklad_zrodlowy(args)
+    except (OSError,ValueError) as e:
+        parser.error(f"błędna siatka poprawek {args.siatka}: {e}")
+    if konwerter.plik_binarny(args.wejscie) or konwerter.plik_binarny(args.wyjscie):
+        if not (konwerter.plik_binarny(args.wejscie) and konwerter.plik_binarny(args.wyjscie)):
+            parser.error("plik binarny można przeliczyć tylko do pliku binarnego")
+        konwerter.inicjuj_qgis()
+        return konwertuj_binarnie(args,strefa,zrodlo)
+    if eksport.plik_wektorowy(args.wyjscie):
+        if args.odwrotnie or args.wejscie=="-":
+            parser.error("do pliku .gpkg albo .shp można zapisać tylko wynik konwersji pliku do PL-2000")
+        konwerter.inicjuj_qgis()
+        return konwertuj_do_warstwy(args,strefa,zrodlo)
+    if args.podzial_stref:
+        if args.odwrotnie or args.wejscie=="-" or args.wyjscie=="-":
+            parser.error("opcja --podzial-stref wymaga konwersji pliku do PL-2000 i pliku wynikowego")
+        konwerter.inicjuj_qgis()
+        return konwertuj_strefami(args,strefa,zrodlo)
+    konwerter.inicjuj_qgis()
+    return uruchom(lambda: konwertuj_strumieniowo(args,strefa,zrodlo))
+
+def uruchom(konwersja,opis="Przeliczono",jednostka="wierszy",
+            opis_blednych="Pominięto {} błędnych wierszy, pierwszy w linii {}."):
+    # Wykonuje konwersja() zwracającą (liczba przeliczonych, liczba błędnych, numer pierwszego błędnego),
+    # wypisuje podsumowanie z czasem i zwraca kod wyjścia: 1 - z błędnymi wierszami, 2 - błąd pliku albo danych
+    start=time.perf_counter()
+    try:
+        liczba,bledne,pierwszy_bledny=konwersja()
+    except (OSError,ValueError) as e:
+        print(e,file=sys.stderr)
+        return 2
+    czas=time.perf_counter()-start
+    text=f"{opis} {liczba} {jednostka} w {czas:.1f} s ({liczba/max(czas,1e-9):.0f} {jednostka}/s)."
+    if bledne:
+        text+=" "+opis_blednych.format(bledne,pierwszy_bledny)
+    print(text,file=sys.stderr)
+    return 1 if bledne else 0
+
+def metoda(args):
+    return konwerter.METODA_GK if args.gk else konwerter.METODA_PROJ
+
+def konwertuj_strumieniowo(args,strefa,zrodlo=None):
+    separator=SEPARATORY[args.separator]
+    decimal_point=SEPARATORY_DZIESIETNE[args.separator_dziesietny]
+    if args.wejscie=="-":
+        we=sys.stdin.buffer
+        rozmiar=None
+    else:
+        we=open(args.wejscie,"rb")
+        rozmiar=os.path.getsize(args.wejscie)
+    if args.wyjscie=="-":
+        wy=sys.stdout
+    else:
+        wy=open(args.wyjscie,"w",encoding="utf-8",newline="\n")
+    try:
+        procesy=args.procesy or os.cpu_count() or 1
+        if args.odwrotnie:
+            return konwerter.konwertuj_strumien_odwrotnie(
+                we,wy,strefa,separator,decimal_point,args.format,args.kolejnosc_lb,args.kolejnosc_yx,
+                rozmiar=rozmiar,procesy=procesy)
+        return konwerter.konwertuj_strumien(
+            we,wy,strefa,separator,decimal_point,args.kolejnosc_lb,args.kolejnosc_yx,rozmiar=rozmiar,
+            procesy=procesy,metoda=metoda(args),zrodlo=zrodlo)
+    finally:
+        if we is not sys.stdin.buffer:
+            we.close()
+        if wy is not sys.stdout:
+            wy.close()
+
+def konwertuj_binarnie(args,strefa,zrodlo=None):
+    sciezka_wy=None if os.path.abspath(args.wyjscie)==os.path.abspath(args.wejscie) else args.wyjscie
+    return uruchom(lambda: konwerter.konwertuj_plik_binarny(
+                       args.wejscie,sciezka_wy,strefa,args.odwrotnie,args.kolejnosc_lb,args.kolejnosc_yx,
+                       metoda=metoda(args),zrodlo=zrodlo),
+                   jednostka="punktów",opis_blednych="Nie przeliczono {} punktów (nan), pierwszy w wierszu {}.")
+
+def konwertuj_do_warstwy(args,strefa,zrodlo=None):
+    return uruchom(lambda: eksport.eksportuj_plik(
+                       args.wejscie,args.wyjscie,strefa,SEPARATORY[args.separator],
+                       SEPARATORY_DZIESIETNE[args.separator_dziesietny],args.kolejnosc_lb,
+                       metoda=metoda(args),zrodlo=zrodlo),
+                   opis="Zapisano",jednostka="punktów")
+
+def konwertuj_strefami(args,strefa,zrodlo=None):
+    return uruchom(lambda: konwerter.konwertuj_plik_strefami(
+                       args.wejscie,args.wyjscie,strefa,SEPARATORY[args.separator],
+                       SEPARATORY_DZIESIETNE[args.separator_dziesietny],args.kolejnosc_lb,args.kolejnosc_yx,
+                       procesy=args.procesy or os.cpu_count() or 1,metoda=metoda(args),zrodlo=zrodlo))
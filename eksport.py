@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# eksport.py  -  GeoPackage and Shapefile export of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Przeliczone punkty zapisywane są wprost do warstw punktowych GeoPackage (.gpkg) albo Shapefile (.shp)
+# w układzie strefy PL-2000 (EPSG:2176-2179), po jednej warstwie (pliku .shp) na strefę.
+# QgsVectorFileWriter zapisuje warstwę w jednej transakcji OGR zatwierdzanej przy zamknięciu,
+# obiekty dodawane są paczkami po ROZMIAR_PACZKI, a indeks przestrzenny budowany jest raz
+# po zapisaniu wszystkich obiektów, a nie aktualizowany przy każdym obiekcie.
+
+import os, tempfile
+
+import numpy as np
+
+from qgis.core import \
+  QgsVectorFileWriter, QgsVectorLayer, QgsFields, QgsField, QgsFeature, QgsGeometry, QgsPoint, \
+  QgsWkbTypes, QgsCoordinateTransformContext
+
+from qgis.PyQt.QtCore import QVariant
+
+from . import konwerter
+from .konwerter import ROZMIAR_PACZKI, pula_transformacji
+
+ROZSZERZENIA_WEKTOROWE={".gpkg":"GPKG",".shp":"ESRI Shapefile"}
+
+def plik_wektorowy(sciezka):
+    return os.path.splitext(sciezka)[1].lower() in ROZSZERZENIA_WEKTOROWE
+
+def pola():
+    # Atrybuty punktu: id, strefa, x y PL-2000 i dokładność mx my w mm
+    fields=QgsFields()
+    fields.append(QgsField("id",QVariant.String))
+    fields.append(QgsField("strefa",QVariant.Int))
+    fields.append(QgsField("x_2000",QVariant.Double))
+    fields.append(QgsField("y_2000",QVariant.Double))
+    fields.append(QgsField("mx",QVariant.Double))
+    fields.append(QgsField("my",QVariant.Double))
+    return fields
+
+def nazwa_warstwy(nr):
+    return f"PL-2000_strefa_{int(nr)}"
+
+def sciezka_warstwy(sciezka,nr):
+    # Plik z warstwą strefy nr: plik GeoPackage zawiera warstwy wszystkich stref,
+    # a Shapefile jest osobnym plikiem nazwa_strefa_nr.shp dla każdej strefy
+    if sciezka.lower().endswith(".shp"):
+        return konwerter.sciezka_strefy(sciezka,nr)
+    return sciezka
+
+def uri_warstwy(sciezka,nr):
+    sciezka_strefy=sciezka_warstwy(sciezka,nr)
+    if sciezka_strefy==sciezka:
+        return f"{sciezka}|layername={nazwa_warstwy(nr)}"
+    return sciezka_strefy
+
+def _utworz_warstwe(sciezka,nr,fields,nowy_plik,context):
+    options=QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName=ROZSZERZENIA_WEKTOROWE[os.path.splitext(sciezka)[1].lower()]
+    options.layerName=nazwa_warstwy(nr)
+    options.fileEncoding="UTF-8"
+    options.layerOptions=["SPATIAL_INDEX=NO"]
+    # Shapefile każdej strefy jest osobnym plikiem, więc tylko GeoPackage dostaje kolejne warstwy w istniejącym pliku
+    if nowy_plik or sciezka_warstwy(sciezka,nr)!=sciezka:
+        options.actionOnExistingFile=QgsVectorFileWriter.CreateOrOverwriteFile
+    else:
+        options.actionOnExistingFile=QgsVectorFileWriter.CreateOrOverwriteLayer
+    writer=QgsVectorFileWriter.create(sciezka_warstwy(sciezka,nr),fields,QgsWkbTypes.Point,
+                                      pula_transformacji().crs(konwerter.kod_strefy(nr)),context,options)
+    if writer.hasError()!=QgsVectorFileWriter.NoError:
+        raise OSError(f"Nie można utworzyć warstwy {nazwa_warstwy(nr)} w pliku {sciezka}: {writer.errorMessage()}")
+    return writer
+
+def _milimetry(d,n):
+    if d is None:
+        return [None]*n
+    return [None if v!=v else v for v in (d*1000).tolist()]
+
+def zapisz_warstwe(sciezka,nr,paczki,nowy_plik=True,context=None,feedback=None,postep=None):
+    # Zapisuje punkty strefy nr do warstwy nazwa_warstwy(nr). paczki - paczki punktów (ids, x, y, dx, dy),
+    # gdzie x y to współrzędne PL-2000, a dx dy dokładność w m albo None.
+    # nowy_plik=False dodaje warstwę do istniejącego pliku GeoPackage, a Shapefile strefy zawsze jest nowym plikiem.
+    # postep - funkcja wywoływana z liczbą zapisanych punktów po każdej paczce.
+    # Zwraca liczbę zapisanych punktów, po przerwaniu w feedback tylko z zapisanych paczek.
+    if context is None:
+        context=QgsCoordinateTransformContext()
+    fields=pola()
+    zapisane=0
+    writer=_utworz_warstwe(sciezka,nr,fields,nowy_plik,context)
+    try:
+        for ids,x,y,dx,dy in paczki:
+            xs=x.tolist()
+            ys=y.tolist()
+            mx=_milimetry(dx,len(xs))
+            my=_milimetry(dy,len(xs))
+            features=[]
+            for i in range(len(xs)):
+                out=QgsFeature(fields)
+                out.setGeometry(QgsGeometry(QgsPoint(ys[i],xs[i])))
+                out.setAttributes([ids[i],int(nr),xs[i],ys[i],mx[i],my[i]])
+                features.append(out)
+            if not writer.addFeatures(features):
+                raise OSError(f"Błąd zapisu warstwy {nazwa_warstwy(nr)}: {writer.lastError()}")
+            zapisane+=len(features)
+            if postep:
+                postep(zapisane)
+            if feedback and feedback.isCanceled():
+                break
+    finally:
+        # Usunięcie obiektu zatwierdza transakcję i zamyka plik
+        del writer
+    warstwa=QgsVectorLayer(uri_warstwy(sciezka,nr),nazwa_warstwy(nr),"ogr")
+    if warstwa.isValid():
+        warstwa.dataProvider().createSpatialIndex()
+    return zapisane
+
+def _paczki_punktow(ids,x,y,dx,dy,idx):
+    for start in range(0,len(idx),ROZMIAR_PACZKI):
+        i=idx[start:start+ROZMIAR_PACZKI]
+        yield [ids[j] for j in i],x[i],y[i],None if dx is None else dx[i],None if dy is None else dy[i]
+
+def zapisz_punkty(sciezka,ids,x,y,nr,dx=None,dy=None,context=None,feedback=None):
+    # Zapisuje punkty do pliku .gpkg albo .shp po jednej warstwie na strefę, z id i w kolejności punktów.
+    # ids - lista id, x y - tablice współrzędnych PL-2000, nr - tablica numerów stref punktów,
+    # dx dy - tablice dokładności w m albo None.
+    # Zwraca słownik {nr strefy: uri warstwy} zapisanych warstw.
+    x=np.asarray(x,dtype=np.float64)
+    y=np.asarray(y,dtype=np.float64)
+    nr=np.broadcast_to(np.asarray(nr),(len(x),))
+    warstwy={}
+    zapisane=0
+    for z,idx in konwerter.koszyki_stref(nr):
+        if z not in konwerter.KODY_STREF:
+            continue
+        def postep(n):
+            feedback.setProcessedCount(zapisane+n)
+            feedback.setProgress(100*(zapisane+n)/len(x))
+        zapisane+=zapisz_warstwe(sciezka,z,_paczki_punktow(ids,x,y,dx,dy,idx),not warstwy,context,feedback,
+                                 postep if feedback else None)
+        warstwy[z]=uri_warstwy(sciezka,z)
+        if feedback and feedback.isCanceled():
+            break
+    return warstwy
+
+class _BuforStrefy():
+    # Przeliczone punkty jednej strefy odkładane w plikach tymczasowych do zapisu warstwy:
+    # pary x y i dokładność jako float64 oraz id w osobnych liniach pliku tekstowego.
+
+    def __init__(self,katalog,nr):
+        self.sciezka_wsp=os.path.join(katalog,f"strefa_{nr}.f64")
+        self.sciezka_ids=os.path.join(katalog,f"strefa_{nr}.txt")
+        self.wsp=open(self.sciezka_wsp,"wb")
+        self.ids=open(self.sciezka_ids,"w",encoding="utf-8",newline="\n")
+        self.n=0
+
+    def dodaj(self,ids,x,y,dx,dy):
+        np.column_stack((x,y,dx,dy)).tofile(self.wsp)
+        self.ids.writelines(i+"\n" for i in ids)
+        self.n+=len(ids)
+
+    def paczki(self):
+        # Paczki (ids, x, y, dx, dy) po ROZMIAR_PACZKI punktów do zapisz_warstwe
+        self.zamknij()
+        with open(self.sciezka_wsp,"rb") as wsp, open(self.sciezka_ids,encoding="utf-8",newline="\n") as ids:
+            for start in range(0,self.n,ROZMIAR_PACZKI):
+                n=min(ROZMIAR_PACZKI,self.n-start)
+                okno=np.fromfile(wsp,dtype=np.float64,count=4*n).reshape(n,4)
+                yield [next(ids)[:-1] for _ in range(n)],okno[:,0],okno[:,1],okno[:,2],okno[:,3]
+
+    def zamknij(self):
+        self.wsp.close()
+        self.ids.close()
+
+def eksportuj_plik(sciezka_we,sciezka_wy,strefa,separator=" ",decimal_point=".",reverse_order=False,
+                   feedback=None,context=None,metoda=konwerter.METODA_PROJ,zrodlo=None):
+    # Przelicza plik tekstowy z wierszami id φ λ (albo id λ φ dla reverse_order) jak konwerter.konwertuj_plik
+    # (z φ λ układu zrodlo, jeśli podano konwerter.UkladZrodlowy)
+    # i zapisuje punkty do pliku .gpkg albo .shp jak zapisz_punkty. x, y zaokrąglane są
+    # do oszacowanej dokładności tak jak w pliku tekstowym.
+    # Paczki wierszy przelicza konwerter.przelicz_strumien i dzieli na strefy jednym stabilnym sortowaniem
+    # (konwerter.koszyki_stref), a punkty stref odkładane są w plikach tymczasowych i zapisywane do warstw
+    # kolejno, strefa po strefie, bo do pliku GeoPackage pisać może naraz tylko jedna transakcja.
+    # W pamięci jest więc tylko jedna paczka punktów, niezależnie od liczby punktów i stref.
+    # Po przerwaniu w czasie przeliczania zapisywane są punkty już przeliczone, jak w konwerter.konwertuj_plik.
+    # Zwraca (liczba zapisanych punktów, liczba błędnych wierszy, numer pierwszej błędnej linii).
+    rozmiar=max(os.path.getsize(sciezka_we),1)
+    bufory={}
+    przeliczone,bledne,pierwszy_bledny=0,0,None
+    with open(sciezka_we,"rb") as we, tempfile.TemporaryDirectory() as katalog:
+        try:
+            for paczka in konwerter.przelicz_strumien(we,strefa,separator,decimal_point,reverse_order,context,
+                                                      metoda,zrodlo):
+                if pierwszy_bledny is None and not paczka.poprawne.all():
+                    pierwszy_bledny=paczka.numery[int(np.flatnonzero(~paczka.poprawne)[0])]
+                bledne+=len(paczka.numery)-len(paczka.x)
+                ids=[paczka.ids[i] for i in np.flatnonzero(paczka.poprawne)]
+                skala=10.0**paczka.xy_decimal
+                x=np.round(paczka.x*skala)/skala
+                y=np.round(paczka.y*skala)/skala
+                for z,idx in konwerter.koszyki_stref(paczka.nr):
+                    if z not in bufory:
+                        bufory[z]=_BuforStrefy(katalog,z)
+                    bufory[z].dodaj([ids[i] for i in idx],x[idx],y[idx],paczka.dx[idx],paczka.dy[idx])
+                przeliczone+=len(ids)
+                if feedback:
+                    feedback.setProcessedCount(przeliczone)
+                    feedback.setProgress(50*we.tell()/rozmiar)
+                    if feedback.isCanceled():
+                        break
+            przerwano=bool(feedback and feedback.isCanceled())
+            zapisane=0
+            for i,z in enumerate(sorted(bufory)):
+                def postep(n):
+                    feedback.setProcessedCount(zapisane+n)
+                    feedback.setProgress(50+50*(zapisane+n)/przeliczone)
+                zapisane+=zapisz_warstwe(sciezka_wy,z,bufory[z].paczki(),i==0,context,
+                                         None if przerwano else feedback,postep if feedback else None)
+                if not przerwano and feedback and feedback.isCanceled():
+                    break
+        finally:
+            for bufor in bufory.values():
+                bufor.zamknij()
+    return zapisane,bledne,pierwszy_bledny
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# historia.py  -  Conversion history of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Historia konwersji punktów w panelu zapisywana jest w bazie SQLite. Wpisy są tylko dopisywane,
+# a indeksy czasu i wartości współrzędnych pozwalają wyszukiwać wpisy bez przeglądania całej tabeli,
+# także przy setkach tysięcy wpisów.
+
+import re, json, time, sqlite3, collections
+
+from . import konwerter
+
+LIMIT_WYNIKOW=200
+# Najwięcej cyfr części całkowitej wyszukiwanych współrzędnych (x PL-2000)
+CYFRY_CALKOWITE=7
+
+# uklad - konwerter.UkladZrodlowy wpisanych φ λ albo None dla PL-ETRF2000
+Wpis=collections.namedtuple("Wpis","id czas odwrotnie format b_text l_text strefa x_text y_text dx dy uklad")
+
+_KOLUMNY="id,czas,odwrotnie,format,b_text,l_text,strefa,x_text,y_text,dx,dy,uklad"
+_LICZBA=re.compile("(\\d+)(?:[.,](\\d*))?")
+_FORMATY_CZASU=(("%Y-%m-%d %H:%M:%S",1),("%Y-%m-%d %H:%M",60),("%Y-%m-%d",86400))
+
+class Historia():
+
+    def __init__(self,sciezka):
+        self.sciezka=sciezka
+        self._polaczenie=None
+
+    def _baza(self):
+        # Baza otwierana jest przy pierwszym użyciu, więc nie opóźnia uruchamiania wtyczki
+        if self._polaczenie is None:
+            polaczenie=sqlite3.connect(self.sciezka)
+            polaczenie.execute("PRAGMA journal_mode=WAL")
+            polaczenie.execute("PRAGMA synchronous=NORMAL")
+            polaczenie.executescript("""
+                CREATE TABLE IF NOT EXISTS historia(
+                    id INTEGER PRIMARY KEY,
+                    czas REAL NOT NULL,
+                    odwrotnie INTEGER NOT NULL,
+                    format TEXT NOT NULL,
+                    b_text TEXT NOT NULL,
+                    l_text TEXT NOT NULL,
+                    b REAL NOT NULL,
+                    l REAL NOT NULL,
+                    strefa TEXT NOT NULL,
+                    x_text TEXT NOT NULL,
+                    y_text TEXT NOT NULL,
+                    x REAL NOT NULL,
+                    y REAL NOT NULL,
+                    dx REAL,
+                    dy REAL,
+                    uklad TEXT);
+            """)
+            # Bazy z wersji bez układu źródłowego dostają kolumnę uklad, dotychczasowe wpisy mają NULL
+            if "uklad" not in [k[1] for k in polaczenie.execute("PRAGMA table_info(historia)")]:
+                polaczenie.execute("ALTER TABLE historia ADD COLUMN uklad TEXT")
+            polaczenie.executescript("""
+                CREATE INDEX IF NOT EXISTS historia_czas ON historia(czas);
+                CREATE INDEX IF NOT EXISTS historia_b ON historia(b);
+                CREATE INDEX IF NOT EXISTS historia_l ON historia(l);
+                CREATE INDEX IF NOT EXISTS historia_x ON historia(x);
+                CREATE INDEX IF NOT EXISTS historia_y ON historia(y);
+            """)
+            self._polaczenie=polaczenie
+        return self._polaczenie
+
+    def dodaj(self,format,b_text,l_text,b,l,strefa,x_text,y_text,x,y,dx=None,dy=None,odwrotnie=False,uklad=None):
+        # format - format tekstów φ, λ (deg albo dms); b, l, x, y - wartości do wyszukiwania;
+        # uklad - konwerter.UkladZrodlowy wpisanych φ λ (kod, epoka, siatka) albo None
+        baza=self._baza()
+        with baza:
+            baza.execute("INSERT INTO historia(czas,odwrotnie,format,b_text,l_text,b,l,strefa,"
+                         "x_text,y_text,x,y,dx,dy,uklad) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                         (time.time(),int(odwrotnie),format,b_text,l_text,float(b),float(l),strefa,
+                          x_text,y_text,float(x),float(y),dx,dy,json.dumps(list(uklad)) if uklad else None))
+
+    def ostatnie(self,n=LIMIT_WYNIKOW):
+        return self._wpisy(f"SELECT {_KOLUMNY} FROM historia ORDER BY czas DESC LIMIT ?",(n,))
+
+    def szukaj(self,tekst,n=LIMIT_WYNIKOW):
+        # Wyszukiwanie wg daty (RRRR-MM-DD [GG:MM[:SS]]) albo wartości współrzędnej φ, λ, x lub y.
+        # Liczba dopasowuje wartości zaczynające się od jej cyfr, np. 52.12 wartości od 52.12 do 52.13,
+        # a liczba bez części ułamkowej także dłuższe części całkowite, np. 5800 wartości 5800-5801,
+        # 58000-58010, ..., 5800000-5801000.
+        tekst=tekst.strip()
+        if not tekst:
+            return self.ostatnie(n)
+        for format_czasu,dlugosc in _FORMATY_CZASU:
+            try:
+                od=time.mktime(time.strptime(tekst,format_czasu))
+            except ValueError:
+                continue
+            return self._wpisy(f"SELECT {_KOLUMNY} FROM historia WHERE czas>=? AND czas<? "
+                               "ORDER BY czas DESC LIMIT ?",(od,od+dlugosc,n))
+        m=_LICZBA.fullmatch(tekst)
+        if m and m.group(2) is None:
+            calkowita=int(m.group(1))
+            przedzialy=[(calkowita*10**k,(calkowita+1)*10**k)
+                        for k in range(max(CYFRY_CALKOWITE-len(m.group(1)),0)+1)]
+        elif m:
+            od=float(m.group(1)+"."+m.group(2))
+            przedzialy=[(od,od+10.0**-len(m.group(2)))]
+        else:
+            wynik=konwerter.text_to_deg(tekst.replace(",","."),".")
+            if wynik is None:
+                return []
+            od,format,miejsca=wynik
+            przedzialy=[(od,od+10.0**-miejsca/(3600 if format=="dms" else 1))]
+        # Wpisy wybierane są osobno z indeksu każdej kolumny, bez przeglądania tabeli w kolejności czasu
+        podzapytania=" UNION ".join(f"SELECT id FROM historia WHERE {k}>=? AND {k}<?"
+                                    for _ in przedzialy for k in "blxy")
+        parametry=[v for od,do in przedzialy for _ in "blxy" for v in (float(od),float(do))]
+        return self._wpisy(f"SELECT {_KOLUMNY} FROM historia WHERE id IN ({podzapytania}) "
+                           "ORDER BY czas DESC LIMIT ?",parametry+[n])
+
+    def liczba(self):
+        return self._baza().execute("SELECT count(*) FROM historia").fetchone()[0]
+
+    def _wpisy(self,sql,parametry):
+        return [Wpis(*w[:-1],konwerter.UkladZrodlowy(*json.loads(w[-1])) if w[-1] else None)
+                for w in self._baza().execute(sql,parametry)]
+
+    def zamknij(self):
+        if self._polaczenie is not None:
+            self._polaczenie.close()
+            self._polaczenie=None
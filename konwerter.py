@@ -0,0 +1,1296 @@
+# -*- coding: utf-8 -*-
+# konwerter.py  -  Conversion core of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+
+import re, os, csv, json, time, threading, weakref, collections, contextlib, multiprocessing, functools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from qgis.core import \
+  QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject, QgsLineString, QgsPointXY, \
+  QgsCsException, QgsCoordinateFormatter, QgsApplication
+
+KOD_PL_ETRF2000="EPSG:9702"
+KODY_STREF={5:"EPSG:2176",6:"EPSG:2177",7:"EPSG:2178",8:"EPSG:2179"}
+STREFA_AUTO="auto"
+STREFA_POWIATY="powiat"
+METODA_PROJ="proj"
+METODA_GK="gk"
+ROZMIAR_PACZKI=100000
+ROZMIAR_PACZKI_PLIKU=1<<20
+PLIK_POWIATOW=os.path.join(os.path.dirname(os.path.abspath(__file__)),"Powiaty_w_strefach_PL-2000.csv")
+
+LOWER_DEG_DECI=8
+UPPER_DEG_DECI=10
+LOWER_DMS_DECI=5
+UPPER_DMS_DECI=7
+
+# Elipsoida GRS80 i skala na południku osiowym stref PL-2000
+A_GRS80=6378137.0
+F_GRS80=1/298.257222101
+K0_PL2000=0.999923
+
+# Diagnostyka: liczba wywołań, liczba elementów i czas etapów przeliczeń. Pomiar jest domyślnie
+# wyłączony, a wyłączony pomiar to tylko sprawdzenie flagi. Statystyki dotyczą bieżącego procesu,
+# więc nie obejmują procesów roboczych konwertuj_rownolegle.
+ETAPY={
+    "odczyt":"odczyt współrzędnych",
+    "walidacja":"walidacja pól",
+    "strefa":"wybór strefy",
+    "budowa_transformacji":"budowa transformacji",
+    "transformacja":"transformacja",
+    "formatowanie":"formatowanie wyników",
+}
+
+_diagnostyka=False
+_statystyki={}
+_blokada_statystyk=threading.Lock()
+_BEZ_POMIARU=contextlib.nullcontext()
+
+class _Pomiar():
+
+    __slots__=("etap","n","start")
+
+    def __init__(self,etap,n):
+        self.etap=etap
+        self.n=n
+
+    def __enter__(self):
+        self.start=time.perf_counter()
+        return self
+
+    def __exit__(self,*exc):
+        czas=time.perf_counter()-self.start
+        with _blokada_statystyk:
+            s=_statystyki.setdefault(self.etap,[0,0,0.0,0.0])
+            s[0]+=1
+            s[1]+=self.n
+            s[2]+=czas
+            s[3]=max(s[3],czas)
+        return False
+
+def pomiar(etap,n=1):
+    # with pomiar("transformacja",len(xs)): ... - n to liczba przetwarzanych elementów
+    if not _diagnostyka:
+        return _BEZ_POMIARU
+    return _Pomiar(etap,n)
+
+def wlacz_diagnostyke(wlaczona=True):
+    global _diagnostyka
+    _diagnostyka=bool(wlaczona)
+
+def diagnostyka_wlaczona():
+    return _diagnostyka
+
+def wyczysc_statystyki():
+    with _blokada_statystyk:
+        _statystyki.clear()
+
+def statystyki():
+    # Słownik etap: {wywolania, elementy, czas, czas_max, czas_na_element} w sekundach
+    with _blokada_statystyk:
+        kopia={etap:list(s) for etap,s in _statystyki.items()}
+    wynik={}
+    for etap in sorted(kopia,key=lambda e: list(ETAPY).index(e) if e in ETAPY else len(ETAPY)):
+        wywolania,elementy,czas,czas_max=kopia[etap]
+        wynik[etap]={"wywolania":wywolania,"elementy":elementy,"czas":czas,"czas_max":czas_max,
+                     "czas_na_element":czas/elementy if elementy else 0.0}
+    return wynik
+
+def statystyki_tekst():
+    # Tabela statystyk do wyświetlenia i zapisu w dzienniku
+    wynik=statystyki()
+    if not wynik:
+        return "Brak pomiarów"
+    suma=sum(s["czas"] for s in wynik.values()) or 1.0
+    linie=[f"{'etap':22s} {'wywołania':>10s} {'elementy':>11s} {'czas [ms]':>11s} {'µs/element':>11s} {'udział':>7s}"]
+    for etap,s in wynik.items():
+        linie.append(f"{ETAPY.get(etap,etap):22s} {s['wywolania']:>10d} {s['elementy']:>11d} "
+                     f"{s['czas']*1000:>11.2f} {s['czas_na_element']*1e6:>11.3f} {s['czas']/suma:>7.1%}")
+    return "\n".join(linie)
+
+def zapisz_statystyki(sciezka):
+    with open(sciezka,"w",encoding="utf-8") as f:
+        json.dump({"czas_zapisu":time.strftime("%Y-%m-%d %H:%M:%S"),"statystyki":statystyki()},
+                  f,indent=2,ensure_ascii=False)
+
+def _klucz_crs(kod):
+    if isinstance(kod,QgsCoordinateReferenceSystem):
+        return kod.authid() or kod.toWkt()
+    return kod
+
+class PulaTransformacji():
+    # Transformacje QgsCoordinateTransform budowane raz dla pary układów
+    # i kontekstu transformacji. Kontekst projektu jest zapamiętywany pod kluczem None
+    # i unieważniany sygnałami projektu.
+
+    def __init__(self):
+        self._crs={}
+        self._transformacje={}
+        self._konteksty=[]
+
+    def crs(self,kod,epoka=None):
+        # epoka - epoka współrzędnych (rok dziesiętny) dla układu dynamicznego, np. ITRF2014
+        if isinstance(kod,QgsCoordinateReferenceSystem):
+            if epoka is None or not kod.isDynamic():
+                return kod
+            crs=QgsCoordinateReferenceSystem(kod)
+            crs.setCoordinateEpoch(epoka)
+            return crs
+        crs=self._crs.get((kod,epoka))
+        if crs is None:
+            crs=QgsCoordinateReferenceSystem(kod)
+            if epoka is not None and crs.isDynamic():
+                crs.setCoordinateEpoch(epoka)
+            self._crs[(kod,epoka)]=crs
+        return crs
+
+    def _klucz_kontekstu(self,context):
+        if context is None:
+            return None
+        for i,c in enumerate(self._konteksty):
+            if c==context:
+                return i
+        self._konteksty.append(context)
+        return len(self._konteksty)-1
+
+    def transformacja(self,kod_zrodla,kod_celu,context=None,epoka=None):
+        # kod_zrodla, kod_celu - kod układu, np. "EPSG:2177", albo QgsCoordinateReferenceSystem
+        # epoka - epoka współrzędnych układu źródłowego, jeśli jest układem dynamicznym
+        klucz=(_klucz_crs(kod_zrodla),_klucz_crs(kod_celu),self._klucz_kontekstu(context),epoka)
+        proj=self._transformacje.get(klucz)
+        if proj is None:
+            with pomiar("budowa_transformacji"):
+                if context is None:
+                    context=QgsProject.instance().transformContext()
+                proj=QgsCoordinateTransform(self.crs(kod_zrodla,epoka),self.crs(kod_celu),context)
+            self._transformacje[klucz]=proj
+        return proj
+
+    def wyczysc(self):
+        self._transformacje.clear()
+        self._konteksty.clear()
+
+    def wyczysc_kontekst_projektu(self):
+        for klucz in [k for k in self._transformacje if k[2] is None]:
+            del self._transformacje[klucz]
+
+_watek=threading.local()
+_pule=weakref.WeakSet()
+_sygnaly_projektu_polaczone=False
+
+def _kontekst_projektu_zmieniony():
+    for pula in list(_pule):
+        pula.wyczysc_kontekst_projektu()
+
+def _polacz_sygnaly_projektu():
+    global _sygnaly_projektu_polaczone
+    if _sygnaly_projektu_polaczone:
+        return
+    if threading.current_thread() is not threading.main_thread():
+        return
+    projekt=QgsProject.instance()
+    projekt.transformContextChanged.connect(_kontekst_projektu_zmieniony)
+    projekt.cleared.connect(_kontekst_projektu_zmieniony)
+    _sygnaly_projektu_polaczone=True
+
+def pula_transformacji():
+    pula=getattr(_watek,'pula',None)
+    if pula is None:
+        pula=PulaTransformacji()
+        _watek.pula=pula
+        _pule.add(pula)
+    _polacz_sygnaly_projektu()
+    return pula
+
+_aplikacja=None
+
+def inicjuj_qgis():
+    # Uruchomienie bez interfejsu QGIS (wiersz poleceń, procesy robocze) wymaga QgsApplication
+    # z dostępem do bazy układów współrzędnych.
+    global _aplikacja
+    if QgsApplication.instance() is None:
+        _aplikacja=QgsApplication([],False)
+        _aplikacja.initQgis()
+
+def kod_strefy(nr_strefy):
+    return KODY_STREF[int(nr_strefy)]
+
+def nr_strefy(kod_strefy):
+    for nr,kod in KODY_STREF.items():
+        if kod==kod_strefy:
+            return nr
+    raise ValueError(f"Nieznany kod strefy PL-2000: {kod_strefy}")
+
+# Strefy PL-2000 mają południki osiowe 15°, 18°, 21° i 24°, więc granice stref leżą na wielokrotnościach
+# 0,5°. Numer strefy odczytywany jest z tablicy dla półstopniowych przedziałów λ od 0° do 180°.
+# Punkty poza zasięgiem układu dostają najbliższą strefę, a λ=nan strefę 0.
+_STREFY_POLSTOPNI=np.clip(np.floor((np.arange(361)/2+1.5)/3),5,8).astype(np.int8)
+
+def nr_strefy_z_dlugosci(l):
+    l=np.asarray(l,dtype=np.float64)
+    indeks=np.clip(np.nan_to_num(l*2,nan=0),0,len(_STREFY_POLSTOPNI)-1).astype(np.intp)
+    return np.where(np.isnan(l),0,_STREFY_POLSTOPNI[indeks]).astype(np.int8)
+
+def kod_strefy_z_dlugosci(l):
+    return KODY_STREF[int(nr_strefy_z_dlugosci(l))]
+
+def nr_strefy_z_y(y):
+    # Numer strefy z pierwszej cyfry współrzędnej y PL-2000, 0 dla y spoza stref
+    y=np.asarray(y,dtype=np.float64)
+    nr=np.floor(np.nan_to_num(y,nan=0)/1e6)
+    return np.where(np.isin(nr,list(KODY_STREF)),nr,0).astype(np.int8)
+
+def wczytaj_powiaty(sciezka):
+    powiaty={}
+    with open(sciezka,encoding="utf-8") as f:
+        dict_reader=csv.DictReader(f,delimiter=',')
+        for row in dict_reader:
+            powiaty[row['Województwo']+' '+row['Powiat']]=row['Nr strefy']
+    return powiaty
+
+def _nazwa_powiatu(nazwa):
+    nazwa=" ".join(str(nazwa).lower().split())
+    if nazwa.startswith("powiat "):
+        nazwa=nazwa[len("powiat "):]
+    return nazwa
+
+def indeks_powiatow(powiaty):
+    # Nazwa "województwo powiat" albo sama nazwa powiatu, jeśli jednoznacznie wskazuje strefę
+    indeks={}
+    strefy_nazw={}
+    for klucz,nr in powiaty.items():
+        indeks[_nazwa_powiatu(klucz)]=int(nr)
+        strefy_nazw.setdefault(_nazwa_powiatu(klucz.split(" ",1)[1]),set()).add(int(nr))
+    for nazwa,strefy in strefy_nazw.items():
+        if len(strefy)==1:
+            indeks.setdefault(nazwa,strefy.pop())
+    return indeks
+
+def nr_strefy_powiatu(indeks,nazwa):
+    if nazwa is None:
+        return None
+    return indeks.get(_nazwa_powiatu(nazwa))
+
+@functools.lru_cache(maxsize=None)
+def _tabela_powiatow(sciezka):
+    powiaty=wczytaj_powiaty(sciezka)
+    return powiaty,tuple(sorted(powiaty)),indeks_powiatow(powiaty)
+
+# Tabela powiatów wczytywana jest raz w procesie przy pierwszym użyciu i współdzielona
+# przez panel i algorytm przetwarzania, więc zwracanych słowników nie należy modyfikować.
+
+def tabela_powiatow(sciezka=PLIK_POWIATOW):
+    # Słownik "województwo powiat": nr strefy jak wczytaj_powiaty
+    return _tabela_powiatow(sciezka)[0]
+
+def nazwy_powiatow(sciezka=PLIK_POWIATOW):
+    # Posortowane klucze tabela_powiatow
+    return _tabela_powiatow(sciezka)[1]
+
+def indeks_tabeli_powiatow(sciezka=PLIK_POWIATOW):
+    # indeks_powiatow dla tabela_powiatow
+    return _tabela_powiatow(sciezka)[2]
+
+_POTEGI_10=np.array([float(f"1e-{i}") for i in range(20)])
+
+def jakobian_gk(b,l,nr):
+    # Pochodne cząstkowe x, y strefy nr PL-2000 po φ i λ w metrach na stopień.
+    # Odwzorowanie Gaussa-Krügera jest wiernokątne, więc pochodne wynikają ze skali k
+    # i zbieżności południków γ (wzory szeregowe dla elipsoidy GRS80).
+    # Zwraca (dx/dφ, dx/dλ, dy/dφ, dy/dλ), nan dla nr spoza stref.
+    b=np.radians(np.asarray(b,dtype=np.float64))
+    nr=np.asarray(nr,dtype=np.float64)
+    nr=np.where(np.isin(nr,list(KODY_STREF)),nr,np.nan)
+    l=np.radians(np.asarray(l,dtype=np.float64)-3*nr)
+    e2=F_GRS80*(2-F_GRS80)
+    sin_b=np.sin(b)
+    cos_b=np.cos(b)
+    t2=np.tan(b)**2
+    eta2=e2/(1-e2)*cos_b**2
+    w=np.sqrt(1-e2*sin_b**2)
+    n=A_GRS80/w
+    m=A_GRS80*(1-e2)/w**3
+    lc2=(l*cos_b)**2
+    k=K0_PL2000*(1+lc2*(1+eta2)/2+lc2**2*(5-4*t2)/24)
+    gamma=l*sin_b*(1+lc2*(1+3*eta2+2*eta2**2)/3+lc2**2*(2-t2)/15)
+    sk=k*np.sin(gamma)*np.pi/180
+    ck=k*np.cos(gamma)*np.pi/180
+    return m*ck,n*cos_b*sk,-m*sk,n*cos_b*ck
+
+def _wspolczynniki_krugera():
+    # Współczynniki szeregu Krügera do n^6 (Karney 2011) dla elipsoidy GRS80
+    n=F_GRS80/(2-F_GRS80)
+    alfa=np.array([
+        n/2-2*n**2/3+5*n**3/16+41*n**4/180-127*n**5/288+7891*n**6/37800,
+        13*n**2/48-3*n**3/5+557*n**4/1440+281*n**5/630-1983433*n**6/1935360,
+        61*n**3/240-103*n**4/140+15061*n**5/26880+167603*n**6/181440,
+        49561*n**4/161280-179*n**5/168+6601661*n**6/7257600,
+        34729*n**5/80640-3418889*n**6/1995840,
+        212378941*n**6/319334400])
+    a=A_GRS80/(1+n)*(1+n**2/4+n**4/64+n**6/256)
+    return alfa,a
+
+_ALFA_KRUGERA,_A_KRUGERA=_wspolczynniki_krugera()
+
+def gk_wsadowo(b,l,nr):
+    with pomiar("transformacja",np.size(b)):
+        return _gk_wsadowo(b,l,nr)
+
+def _gk_wsadowo(b,l,nr):
+    # Odwzorowanie Gaussa-Krügera strefy nr PL-2000 szeregiem Krügera, bez wywołań PROJ.
+    # Dokładność szeregu jest rzędu nanometrów, a PL-ETRF2000 i PL-2000 mają tę samą elipsoidę,
+    # więc wynik zgadza się z transformacją QGIS (sprawdza odchylenie_gk).
+    # Zwraca x, y w PL-2000, nan dla nr spoza stref.
+    e=np.sqrt(F_GRS80*(2-F_GRS80))
+    nr=np.asarray(nr,dtype=np.float64)
+    nr=np.where(np.isin(nr,list(KODY_STREF)),nr,np.nan)
+    tau=np.tan(np.radians(np.asarray(b,dtype=np.float64)))
+    l=np.radians(np.asarray(l,dtype=np.float64)-3*nr)
+    sigma=np.sinh(e*np.arctanh(e*tau/np.sqrt(1+tau**2)))
+    tau_c=tau*np.sqrt(1+sigma**2)-sigma*np.sqrt(1+tau**2)
+    cos_l=np.cos(l)
+    xi_c=np.arctan2(tau_c,cos_l)
+    eta_c=np.arcsinh(np.sin(l)/np.sqrt(tau_c**2+cos_l**2))
+    xi=xi_c.copy()
+    eta=eta_c.copy()
+    for j,alfa in enumerate(_ALFA_KRUGERA,1):
+        xi+=alfa*np.sin(2*j*xi_c)*np.cosh(2*j*eta_c)
+        eta+=alfa*np.cos(2*j*xi_c)*np.sinh(2*j*eta_c)
+    x=K0_PL2000*_A_KRUGERA*xi
+    y=K0_PL2000*_A_KRUGERA*eta+nr*1e6+500000
+    return x,y
+
+def odchylenie_gk(b,l,nr,context=None):
+    # Największa różnica w metrach między gk_wsadowo a transformacją QGIS (PROJ)
+    x,y,_,_,_=konwertuj_wsadowo(b,l,nr,context=context)
+    x_gk,y_gk=gk_wsadowo(b,l,nr)
+    return float(np.nanmax(np.hypot(x-x_gk,y-y_gk)))
+
+def xy_round_accuracy_wsadowo(format,miejsca_b,miejsca_l,b,l,nr):
+    # Dokładność x, y wynikająca z liczby miejsc dziesiętnych φ i λ: jednostka ostatniego
+    # miejsca φ i λ przeniesiona przez jakobian_gk i zaokrąglona w górę do xy_decimal miejsc.
+    # Punkty o różnej liczbie miejsc dziesiętnych φ i λ dostają xy_decimal=-1 i dx=dy=nan.
+    miejsca_b,miejsca_l=np.broadcast_arrays(np.asarray(miejsca_b,dtype=np.int64),
+                                            np.asarray(miejsca_l,dtype=np.int64))
+    dms=np.asarray(format)=="dms"
+    xy_decimal=np.where(dms,miejsca_b-1,miejsca_b-5)
+    zgodne=(miejsca_b==miejsca_l)&(xy_decimal>0)&(xy_decimal<len(_POTEGI_10))
+    xy_decimal=np.where(zgodne,xy_decimal,-1)
+    potega=np.where(zgodne,_POTEGI_10[np.clip(xy_decimal,0,len(_POTEGI_10)-1)],np.nan)
+    krok=_POTEGI_10[np.clip(miejsca_b,0,len(_POTEGI_10)-1)]/np.where(dms,3600.0,1.0)
+    x_b,x_l,y_b,y_l=jakobian_gk(b,l,nr)
+    dx=np.ceil((np.abs(x_b)+np.abs(x_l))*krok/potega-1e-9)*potega
+    dy=np.ceil((np.abs(y_b)+np.abs(y_l))*krok/potega-1e-9)*potega
+    return xy_decimal,dx,dy
+
+def xy_round_accuracy(format,len_decimal_remainder1,len_decimal_remainder2,b,l,strefa):
+    # Wersja xy_round_accuracy_wsadowo dla jednego punktu, zwraca (None, None, None)
+    # dla różnej liczby miejsc dziesiętnych φ i λ
+    b=np.array([b],dtype=np.float64)
+    l=np.array([l],dtype=np.float64)
+    xy_decimal,dx,dy=xy_round_accuracy_wsadowo(format,[len_decimal_remainder1],[len_decimal_remainder2],
+                                               b,l,_tablica_stref(strefa,1,l,b))
+    if xy_decimal[0]<0 or np.isnan(dx[0]):
+        return None,None,None
+    return int(xy_decimal[0]),float(dx[0]),float(dy[0])
+
+def _transformuj_tablice(proj,xs,ys):
+    with pomiar("transformacja",len(xs)):
+        return _transformuj_linie(proj,xs,ys)
+
+def _transformuj_linie(proj,xs,ys):
+    ls=QgsLineString(xs.tolist(),ys.tolist())
+    try:
+        ls.transform(proj)
+        return np.array(ls.xVector()),np.array(ls.yVector())
+    except QgsCsException:
+        tx=np.full(len(xs),np.nan)
+        ty=np.full(len(xs),np.nan)
+        for i in range(len(xs)):
+            try:
+                pt=proj.transform(QgsPointXY(xs[i],ys[i]))
+                tx[i]=pt.x()
+                ty[i]=pt.y()
+            except QgsCsException:
+                pass
+        return tx,ty
+
+def _tablica_stref(strefa,n,l,b,context=None):
+    # context - kontekst transformacji dla indeksu granic powiatów (STREFA_POWIATY)
+    with pomiar("strefa",n):
+        return _strefy_punktow(strefa,n,l,b,context)
+
+def _strefy_punktow(strefa,n,l,b,context=None):
+    if strefa is None:
+        return nr_strefy_z_dlugosci(l)
+    if isinstance(strefa,str):
+        if strefa==STREFA_AUTO:
+            return nr_strefy_z_dlugosci(l)
+        if strefa==STREFA_POWIATY:
+            from .powiaty import indeks_granic_powiatow
+            return indeks_granic_powiatow(context).strefy_wsadowo(l,b)
+        return np.full(n,nr_strefy(strefa),dtype=np.int8)
+    return np.broadcast_to(np.asarray(strefa,dtype=np.int8),(n,))
+
+def koszyki_stref(nr):
+    # Podział punktów na strefy w jednym przebiegu: stabilne sortowanie numerów stref zachowuje
+    # kolejność punktów w każdej strefie. Zwraca listę par (nr strefy, tablica indeksów punktów).
+    nr=np.asarray(nr)
+    kolejnosc=np.argsort(nr,kind="stable")
+    posortowane=nr[kolejnosc]
+    granice=np.concatenate(([0],np.flatnonzero(posortowane[1:]!=posortowane[:-1])+1,[len(nr)]))
+    return [(int(posortowane[p]),kolejnosc[p:k]) for p,k in zip(granice[:-1],granice[1:]) if k>p]
+
+def sciezka_strefy(sciezka,nr):
+    # Nazwa pliku z punktami strefy nr przy podziale wyników na strefy: nazwa_strefa_nr.rozszerzenie
+    nazwa,rozszerzenie=os.path.splitext(sciezka)
+    return f"{nazwa}_strefa_{int(nr)}{rozszerzenie}"
+
+# Układ źródłowy współrzędnych innych niż PL-ETRF2000: kod - kod układu geograficznego (np. "EPSG:4258"
+# dla ETRF89 albo układ ITRF) albo None dla PL-ETRF2000, epoka - epoka współrzędnych (rok dziesiętny)
+# dla układu dynamicznego, siatka - plik lokalnej siatki poprawek φ λ PL-ETRF2000 (wczytaj_siatke) albo None
+UkladZrodlowy=collections.namedtuple("UkladZrodlowy","kod epoka siatka",defaults=(None,None))
+
+class SiatkaPoprawek():
+    # Regularna siatka poprawek dφ, dλ w węzłach φ, λ PL-ETRF2000 trzymana w tablicach numpy.
+    # Poprawki punktów interpolowane są dwuliniowo dla całych tablic naraz, punkty poza siatką dostają nan.
+
+    def __init__(self,b,l,db,dl):
+        # b, l - rosnące współrzędne węzłów w stopniach ze stałym krokiem, co najmniej po 2 węzły
+        # db, dl - tablice (len(b), len(l)) poprawek w sekundach łuku
+        b=np.asarray(b,dtype=np.float64)
+        l=np.asarray(l,dtype=np.float64)
+        db=np.asarray(db,dtype=np.float64)
+        dl=np.asarray(dl,dtype=np.float64)
+        if len(b)<2 or len(l)<2 or db.shape!=(len(b),len(l)) or dl.shape!=(len(b),len(l)):
+            raise ValueError("Siatka poprawek musi mieć co najmniej 2x2 węzły i poprawki w każdym węźle")
+        for wezly in (b,l):
+            kroki=np.diff(wezly)
+            if kroki[0]<=0 or not np.allclose(kroki,kroki[0],rtol=1e-6,atol=1e-12):
+                raise ValueError("Węzły siatki poprawek muszą być rosnące ze stałym krokiem")
+        self.b0,self.l0=b[0],l[0]
+        self.krok_b=(b[-1]-b[0])/(len(b)-1)
+        self.krok_l=(l[-1]-l[0])/(len(l)-1)
+        self.nb,self.nl=len(b),len(l)
+        self.db=np.ascontiguousarray(db/3600).ravel()
+        self.dl=np.ascontiguousarray(dl/3600).ravel()
+
+    def interpoluj(self,b,l):
+        # Zwraca poprawki dφ, dλ w stopniach dla tablic φ, λ
+        i=(np.asarray(b,dtype=np.float64)-self.b0)/self.krok_b
+        j=(np.asarray(l,dtype=np.float64)-self.l0)/self.krok_l
+        poza=~((i>=0)&(i<=self.nb-1)&(j>=0)&(j<=self.nl-1))
+        i0=np.clip(np.floor(np.nan_to_num(i)),0,self.nb-2).astype(np.intp)
+        j0=np.clip(np.floor(np.nan_to_num(j)),0,self.nl-2).astype(np.intp)
+        ti=i-i0
+        tj=j-j0
+        k=i0*self.nl+j0
+        wagi=((1-ti)*(1-tj),(1-ti)*tj,ti*(1-tj),ti*tj)
+        wyniki=[]
+        for g in (self.db,self.dl):
+            d=wagi[0]*g[k]+wagi[1]*g[k+1]+wagi[2]*g[k+self.nl]+wagi[3]*g[k+self.nl+1]
+            d[poza]=np.nan
+            wyniki.append(d)
+        return wyniki[0],wyniki[1]
+
+    def popraw(self,b,l):
+        db,dl=self.interpoluj(b,l)
+        return b+db,l+dl
+
+def wczytaj_siatke(sciezka):
+    # Siatka poprawek: .npz z tablicami b, l, db, dl jak w SiatkaPoprawek albo plik tekstowy
+    # z wierszami φ λ dφ dλ (stopnie, sekundy łuku) rozdzielonymi spacją, tabulatorem albo średnikiem,
+    # w dowolnej kolejności węzłów; linie od # są pomijane. Siatka wczytywana jest ponownie po zmianie
+    # pliku (czas modyfikacji, rozmiar), a pamiętanych jest tylko kilka ostatnich siatek.
+    stat=os.stat(sciezka)
+    return _wczytaj_siatke(sciezka,stat.st_mtime_ns,stat.st_size)
+
+@functools.lru_cache(maxsize=4)
+def _wczytaj_siatke(sciezka,mtime_ns,rozmiar):
+    if sciezka.lower().endswith(".npz"):
+        with np.load(sciezka) as dane:
+            return SiatkaPoprawek(dane["b"],dane["l"],dane["db"],dane["dl"])
+    with open(sciezka,encoding="utf-8") as f:
+        wiersze=[w.replace(";"," ").split() for w in f if w.strip() and not w.lstrip().startswith("#")]
+    try:
+        dane=np.array(wiersze,dtype=np.float64)
+    except ValueError:
+        raise ValueError(f"Plik {sciezka} nie zawiera wierszy φ λ dφ dλ") from None
+    if dane.ndim!=2 or dane.shape[1]!=4:
+        raise ValueError(f"Plik {sciezka} nie zawiera wierszy φ λ dφ dλ")
+    b,i=np.unique(dane[:,0],return_inverse=True)
+    l,j=np.unique(dane[:,1],return_inverse=True)
+    if len(b)*len(l)!=len(dane) or len(np.unique(i*len(l)+j))!=len(dane):
+        raise ValueError(f"Węzły w pliku {sciezka} nie tworzą regularnej siatki")
+    db=np.empty((len(b),len(l)))
+    dl=np.empty((len(b),len(l)))
+    db[i,j]=dane[:,2]
+    dl[i,j]=dane[:,3]
+    return SiatkaPoprawek(b,l,db,dl)
+
+def do_pl_etrf2000(b,l,zrodlo,context=None):
+    # Przelicza tablice φ, λ w stopniach układu zrodlo (UkladZrodlowy albo None) do PL-ETRF2000:
+    # transformacją z puli (z epoką układu dynamicznego), a potem poprawkami z siatki.
+    # Punkty, których nie udało się przeliczyć, mają nan.
+    b=np.asarray(b,dtype=np.float64)
+    l=np.asarray(l,dtype=np.float64)
+    if zrodlo is None:
+        return b,l
+    if zrodlo.kod is not None and _klucz_crs(zrodlo.kod)!=KOD_PL_ETRF2000:
+        proj=pula_transformacji().transformacja(zrodlo.kod,KOD_PL_ETRF2000,context,zrodlo.epoka)
+        l,b=_transformuj_tablice(proj,l,b)
+    if zrodlo.siatka:
+        siatka=wczytaj_siatke(zrodlo.siatka)
+        with pomiar("transformacja",len(b)):
+            b,l=siatka.popraw(b,l)
+    return b,l
+
+def konwertuj_wsadowo(b,l,strefa,format="deg",miejsca=None,miejsca_l=None,context=None,metoda=METODA_PROJ,
+                      zrodlo=None):
+    # b, l - tablice φ, λ w stopniach PL-ETRF2000 albo układu zrodlo
+    # strefa - kod EPSG strefy, numer strefy, tablica numerów stref dla punktów
+    #          albo STREFA_AUTO (albo None) dla strefy wg λ każdego punktu
+    #          albo STREFA_POWIATY dla strefy wg granic powiatu, w którym leży punkt
+    # miejsca, miejsca_l - liczba miejsc dziesiętnych wprowadzonych φ i λ
+    #                      (stopni albo sekund dla format="dms") do oszacowania dokładności
+    # metoda - METODA_PROJ: transformacja QGIS, METODA_GK: gk_wsadowo bez kontekstu transformacji
+    # zrodlo - UkladZrodlowy współrzędnych przeliczanych najpierw do PL-ETRF2000 (do_pl_etrf2000) albo None
+    # Zwraca x, y w PL-2000 oraz xy_decimal, dx, dy jak xy_round_accuracy albo None,
+    # jeśli nie podano miejsc. Punkty, których nie udało się przeliczyć, mają x=y=nan.
+    b,l=do_pl_etrf2000(b,l,zrodlo,context)
+    n=len(b)
+    nr=_tablica_stref(strefa,n,l,b,context)
+    if metoda==METODA_GK:
+        x,y=gk_wsadowo(b,l,nr)
+        koszyki=[]
+    else:
+        x=np.full(n,np.nan)
+        y=np.full(n,np.nan)
+        koszyki=koszyki_stref(nr)
+    pula=pula_transformacji()
+    for z,idx in koszyki:
+        if z not in KODY_STREF:
+            continue
+        proj=pula.transformacja(KOD_PL_ETRF2000,kod_strefy(z),context)
+        for start in range(0,len(idx),ROZMIAR_PACZKI):
+            i=idx[start:start+ROZMIAR_PACZKI]
+            e,p=_transformuj_tablice(proj,l[i],b[i])
+            x[i]=p
+            y[i]=e
+    if miejsca is None:
+        return x,y,None,None,None
+    if miejsca_l is None:
+        miejsca_l=miejsca
+    xy_decimal,dx,dy=xy_round_accuracy_wsadowo(format,np.broadcast_to(miejsca,(n,)),miejsca_l,b,l,nr)
+    return x,y,xy_decimal,dx,dy
+
+def _tablica_stref_y(strefa,n,y):
+    if strefa is None:
+        return nr_strefy_z_y(y)
+    if isinstance(strefa,str):
+        if strefa in (STREFA_AUTO,STREFA_POWIATY):
+            return nr_strefy_z_y(y)
+        return np.full(n,nr_strefy(strefa),dtype=np.int8)
+    return np.broadcast_to(np.asarray(strefa,dtype=np.int8),(n,))
+
+def konwertuj_odwrotnie_wsadowo(x,y,strefa=None,context=None):
+    # x, y - tablice współrzędnych PL-2000
+    # strefa - kod EPSG strefy, numer strefy, tablica numerów stref dla punktów
+    #          albo None (STREFA_AUTO) dla strefy z pierwszej cyfry y
+    # Zwraca b, l w stopniach PL-ETRF2000, nan dla punktów, których nie udało się przeliczyć.
+    # Transformacje odwrotne pochodzą z tej samej puli co transformacje konwertuj_wsadowo.
+    x=np.asarray(x,dtype=np.float64)
+    y=np.asarray(y,dtype=np.float64)
+    n=len(x)
+    with pomiar("strefa",n):
+        nr=_tablica_stref_y(strefa,n,y)
+    b=np.full(n,np.nan)
+    l=np.full(n,np.nan)
+    pula=pula_transformacji()
+    for z,idx in koszyki_stref(nr):
+        if z not in KODY_STREF:
+            continue
+        proj=pula.transformacja(kod_strefy(z),KOD_PL_ETRF2000,context)
+        for start in range(0,len(idx),ROZMIAR_PACZKI):
+            i=idx[start:start+ROZMIAR_PACZKI]
+            l[i],b[i]=_transformuj_tablice(proj,y[i],x[i])
+    return b,l
+
+def miejsca_bl(format,xy_decimal):
+    # Liczba miejsc dziesiętnych φ, λ (stopni albo sekund) odpowiadająca xy_decimal miejscom x, y,
+    # odwrotnie niż w xy_round_accuracy
+    if format=="dms":
+        return np.clip(np.asarray(xy_decimal)+1,LOWER_DMS_DECI,UPPER_DMS_DECI)
+    return np.clip(np.asarray(xy_decimal)+5,LOWER_DEG_DECI,UPPER_DEG_DECI)
+
+def bl_to_text(b,l,format,miejsca,decimal_point="."):
+    # Tekst φ, λ punktu w formacie deg albo dms
+    with pomiar("formatowanie"):
+        return _bl_to_text(b,l,format,miejsca,decimal_point)
+
+def _bl_to_text(b,l,format,miejsca,decimal_point):
+    if format=="dms":
+        b_text=deg_b_to_dms_text(b,miejsca).replace(",",".").replace(".",decimal_point)
+        l_text=deg_l_to_dms_text(l,miejsca).replace(",",".").replace(".",decimal_point)
+        return b_text,l_text
+    return f"{b:.{miejsca}f}".replace(".",decimal_point),f"{l:.{miejsca}f}".replace(".",decimal_point)
+
+def deg_b_to_dms_text(b,precision):
+    return QgsCoordinateFormatter.formatY(
+        b,
+        QgsCoordinateFormatter.FormatDegreesMinutesSeconds,
+        precision,
+        QgsCoordinateFormatter.FlagDegreesPadMinutesSeconds
+    )
+
+def deg_l_to_dms_text(l,precision):
+    return QgsCoordinateFormatter.formatX(
+        l,
+        QgsCoordinateFormatter.FormatDegreesMinutesSeconds,
+        precision,
+        QgsCoordinateFormatter.FlagDegreesPadMinutesSeconds
+    )
+
+@functools.lru_cache(maxsize=None)
+def wzorzec(rodzaj,decimal_point=".",separator=" ",upper_deci=None):
+    # Rejestr skompilowanych wyrażeń regularnych. Wzorzec kompilowany jest raz dla każdej
+    # kombinacji (rodzaj, separator dziesiętny, separator współrzędnych), a zmiana ustawień
+    # wybiera tylko inny klucz rejestru.
+    # rodzaj: "deg", "dms" - pojedyncza współrzędna, "para", "para_dms" - dwie współrzędne
+    #         wklejane ze schowka, "linia" - linia pliku: id i dwie współrzędne,
+    #         "wiersz" - wiersz wklejanej kolumny: opcjonalne id i dwie współrzędne,
+    #         "liczba" - współrzędna PL-2000, "linia_xy" - linia pliku: id, x, y i dowolne dalsze pola
+    if rodzaj=="deg":
+        if upper_deci is None:
+            upper_deci=UPPER_DEG_DECI
+        return re.compile(f"\\d{{2}}[{decimal_point}.,]\\d{{{LOWER_DEG_DECI},{upper_deci}}}")
+    if rodzaj=="dms":
+        d_pattern="((\\d{2})[° ])"
+        m_pattern="((\\d{1,2})[′' ])"
+        s_pattern=f"(\\d{{0,2}}[{decimal_point}]\\d{{{LOWER_DMS_DECI},{UPPER_DMS_DECI}}})(\"|″|'')?"
+        return re.compile(f"{d_pattern}{m_pattern}{s_pattern}")
+    sep=re.escape(separator)
+    if rodzaj=="para":
+        return re.compile(f"(\\S+){sep}(\\S+)")
+    if rodzaj=="para_dms":
+        d_pattern="\\d{1,2}[° ]"
+        m_pattern="(?:\\d{1,2}[′' ])"
+        s_pattern=f"(?:\\d{{0,2}}[{decimal_point}.,](?=\\d)\\d*|\\d{{1,2}})(?:\"|″|'')?"
+        pattern=f"({d_pattern}{m_pattern}{s_pattern})"
+        return re.compile(f"{pattern}{sep}{pattern}")
+    if rodzaj=="liczba":
+        return re.compile(f"\\d+(?:[{decimal_point}.,](\\d+))?")
+    if rodzaj=="linia_xy":
+        if separator==" ":
+            return re.compile("\\s*(\\S+)\\s+(\\S+)\\s+(\\S+)(?:\\s.*)?")
+        return re.compile(f"\\s*([^{sep}]+?)\\s*{sep}\\s*([^{sep}]+?)\\s*{sep}\\s*([^{sep}]+?)\\s*(?:{sep}.*)?")
+    if rodzaj=="linia":
+        if separator==" ":
+            wsp="(\\d+[° ]\\d+[′' ]\\S+|\\S+)"
+            return re.compile(f"\\s*(\\S+) +{wsp} +{wsp}\\s*")
+        return re.compile(f"\\s*([^{sep}]+?)\\s*{sep}\\s*([^{sep}]+?)\\s*{sep}\\s*([^{sep}]+?)\\s*")
+    if rodzaj=="wiersz":
+        if separator==" ":
+            wsp="(\\d+[° ]\\d+[′' ]\\S+|\\S+)"
+            return re.compile(f"\\s*(?:(\\S+)\\s+)?{wsp}\\s+{wsp}\\s*")
+        return re.compile(f"\\s*(?:([^{sep}]*?)\\s*{sep})?\\s*([^{sep}]+?)\\s*{sep}\\s*([^{sep}]+?)\\s*")
+    raise ValueError(f"Nieznany rodzaj wzorca: {rodzaj}")
+
+def deg_text_to_deg(deg_text,decimal_point,upper_deg_deci=UPPER_DEG_DECI):
+    if deg_text:
+        with pomiar("odczyt"):
+            m=wzorzec("deg",decimal_point,upper_deci=upper_deg_deci).fullmatch(deg_text)
+            if m:
+                deg=float(deg_text.replace(",","."))
+                return deg
+    return None
+
+def dms_text_to_parts(dms_text,decimal_point):
+    with pomiar("odczyt"):
+        m=wzorzec("dms",decimal_point).fullmatch(dms_text)
+    if m:
+        return (m.group(2),m.group(4),m.group(5))
+    return None
+
+def dms_parts_to_dms(dms_parts,decimal_point):
+    d_text,m_text,s_text=dms_parts
+    d=float(d_text) if d_text else 0.0
+    m=float(m_text) if m_text else 0.0
+    s=float(s_text.replace(decimal_point,".")) if s_text else 0.0
+    return (d,m,s)
+
+def dms_to_deg(dms):
+    d,m,s=dms
+    deg=d+m/60+s/(60*60)
+    return deg
+
+def text_to_deg(text,decimal_point):
+    # Rozpoznaje format deg albo dms. Zwraca (stopnie, format, liczba miejsc dziesiętnych)
+    # albo None, jeśli tekst nie jest poprawną współrzędną.
+    deg=deg_text_to_deg(text,decimal_point)
+    if deg:
+        return deg,"deg",len(text.replace(",",".").split(".")[1])
+    dms_parts=dms_text_to_parts(text,decimal_point)
+    if dms_parts:
+        deg=dms_to_deg(dms_parts_to_dms(dms_parts,decimal_point))
+        return deg,"dms",len(dms_parts[2].split(decimal_point)[1])
+    return None
+
+_POTEGI_10_DODATNIE=np.array([10.0**i for i in range(23)])
+_ZNAKI_STOPNI=np.array([ord("°"),ord(" ")],dtype=np.uint32)
+_ZNAKI_MINUT=np.array([ord("′"),ord("'"),ord(" ")],dtype=np.uint32)
+
+def _kody_znakow(texts,szerokosc_min):
+    a=np.asarray(texts,dtype=str).ravel()
+    dlugosci=np.char.str_len(a)
+    szerokosc=a.dtype.itemsize//4
+    if szerokosc:
+        kody=a.view(np.uint32).reshape(len(a),szerokosc)
+    else:
+        kody=np.zeros((len(a),0),dtype=np.uint32)
+    if szerokosc<szerokosc_min:
+        kody=np.pad(kody,((0,0),(0,szerokosc_min-szerokosc)))
+    return kody,dlugosci
+
+def _znak(kody,pozycje):
+    pozycje=np.clip(pozycje,0,kody.shape[1]-1)
+    return np.take_along_axis(kody,pozycje[:,None],axis=1)[:,0]
+
+def _mantysa(kody,cyfry,od,do,pomin):
+    # Liczba całkowita z cyfr na pozycjach od..do-1 z pominięciem pozycji pomin
+    mantysa=np.zeros(len(kody),dtype=np.int64)
+    for p in range(kody.shape[1]):
+        liczona=(p>=od)&(p<do)&(p!=pomin)&cyfry[:,p]
+        mantysa=np.where(liczona,mantysa*10+(kody[:,p].astype(np.int64)-48),mantysa)
+    return mantysa
+
+def deg_texts_to_deg(texts,decimal_point,upper_deg_deci=UPPER_DEG_DECI):
+    # Wersja tablicowa deg_text_to_deg. Zwraca (stopnie, maska poprawnych, liczba miejsc dziesiętnych).
+    kody,dlugosci=_kody_znakow(texts,3)
+    cyfry=(kody>=48)&(kody<=57)
+    pozycje=np.arange(kody.shape[1])
+    miejsca=dlugosci-3
+    w_ulamku=(pozycje>=3)&(pozycje<dlugosci[:,None])
+    poprawne=(miejsca>=LOWER_DEG_DECI)&(miejsca<=upper_deg_deci) \
+             &cyfry[:,0]&cyfry[:,1]&np.isin(kody[:,2],[ord(decimal_point),ord("."),ord(",")]) \
+             &np.all(cyfry|~w_ulamku,axis=1)
+    miejsca=np.where(poprawne,miejsca,0)
+    mantysa=_mantysa(kody,cyfry,0,dlugosci,2)
+    deg=np.where(poprawne,mantysa/_POTEGI_10_DODATNIE[np.clip(miejsca,0,22)],np.nan)
+    return deg,poprawne,miejsca
+
+def dms_texts_to_deg(texts,decimal_point):
+    # Wersja tablicowa dms_text_to_parts, dms_parts_to_dms i dms_to_deg.
+    # Zwraca (stopnie, maska poprawnych, liczba miejsc dziesiętnych sekund).
+    kody,dlugosci=_kody_znakow(texts,6)
+    n=len(kody)
+    cyfry=(kody>=48)&(kody<=57)
+    ostatni=_znak(kody,dlugosci-1)
+    przedostatni=_znak(kody,dlugosci-2)
+    apostrof=ord("'")
+    dlugosci=np.where((dlugosci>=2)&(ostatni==apostrof)&(przedostatni==apostrof),dlugosci-2,
+                      np.where(np.isin(ostatni,[ord('"'),ord("″")]),dlugosci-1,dlugosci))
+    poprawne=cyfry[:,0]&cyfry[:,1]&np.isin(kody[:,2],_ZNAKI_STOPNI)
+    minuty_1=cyfry[:,3]&np.isin(kody[:,4],_ZNAKI_MINUT)
+    minuty_2=cyfry[:,3]&cyfry[:,4]&np.isin(kody[:,5],_ZNAKI_MINUT)
+    poprawne&=minuty_1|minuty_2
+    sekundy=np.where(minuty_2,6,5)
+    przecinek=np.full(n,-1)
+    for k in (2,1,0):
+        kandydat=_znak(kody,sekundy+k)==ord(decimal_point)
+        for j in range(k):
+            kandydat&=np.isin(_znak(kody,sekundy+j),np.arange(48,58))
+        przecinek=np.where(kandydat,sekundy+k,przecinek)
+    miejsca=dlugosci-1-przecinek
+    pozycje=np.arange(kody.shape[1])
+    w_ulamku=(pozycje>przecinek[:,None])&(pozycje<dlugosci[:,None])
+    poprawne&=(przecinek>=0)&(miejsca>=LOWER_DMS_DECI)&(miejsca<=UPPER_DMS_DECI) \
+              &np.all(cyfry|~w_ulamku,axis=1)
+    miejsca=np.where(poprawne,miejsca,0)
+    d=(kody[:,0].astype(np.int64)-48)*10+(kody[:,1].astype(np.int64)-48)
+    m=np.where(minuty_2,(kody[:,3].astype(np.int64)-48)*10+(kody[:,4].astype(np.int64)-48),
+               kody[:,3].astype(np.int64)-48)
+    mantysa=_mantysa(kody,cyfry,sekundy,dlugosci,przecinek)
+    s=mantysa/_POTEGI_10_DODATNIE[np.clip(miejsca,0,22)]
+    deg=d.astype(np.float64)+m.astype(np.float64)/60+s/(60*60)
+    return np.where(poprawne,deg,np.nan),poprawne,miejsca
+
+def texts_to_deg(texts,decimal_point,dowolny_separator=False):
+    # Wersja tablicowa text_to_deg. Zwraca (stopnie, maska poprawnych, tablica formatów "deg"/"dms",
+    # liczba miejsc dziesiętnych). Dla dowolny_separator=True kropka i przecinek
+    # traktowane są jak separator dziesiętny.
+    with pomiar("odczyt",len(texts)):
+        return _texts_to_deg(texts,decimal_point,dowolny_separator)
+
+def _texts_to_deg(texts,decimal_point,dowolny_separator):
+    texts=np.asarray(texts,dtype=str).ravel()
+    if dowolny_separator:
+        texts=np.char.replace(np.char.replace(texts,".",decimal_point),",",decimal_point)
+    deg,poprawne,miejsca=deg_texts_to_deg(texts,decimal_point)
+    poprawne&=deg!=0
+    dms=~poprawne
+    if dms.any():
+        deg_dms,poprawne_dms,miejsca_dms=dms_texts_to_deg(texts[dms],decimal_point)
+        deg[dms]=deg_dms
+        miejsca[dms]=miejsca_dms
+        poprawne[dms]=poprawne_dms
+    formaty=np.where(dms,"dms","deg")
+    return deg,poprawne,formaty,miejsca
+
+def texts_to_float(texts,decimal_point):
+    # Współrzędne PL-2000 z tekstów. Zwraca (liczby, maska poprawnych, liczba miejsc dziesiętnych).
+    with pomiar("odczyt",len(texts)):
+        return _texts_to_float(texts,decimal_point)
+
+def _texts_to_float(texts,decimal_point):
+    w=wzorzec("liczba",decimal_point)
+    n=len(texts)
+    liczby=np.full(n,np.nan)
+    poprawne=np.zeros(n,dtype=bool)
+    miejsca=np.zeros(n,dtype=np.int64)
+    for i,text in enumerate(texts):
+        m=w.fullmatch(text)
+        if m:
+            liczby[i]=float(text.replace(",",".").replace(decimal_point,"."))
+            poprawne[i]=True
+            miejsca[i]=len(m.group(1) or "")
+    return liczby,poprawne,miejsca
+
+def _paczki_linii(we,separator):
+    # Zwraca paczki (numer pierwszej linii, linie) czytane po ROZMIAR_PACZKI_PLIKU bajtów.
+    # Przy separatorze enter rekord zajmuje trzy niepuste linie, więc paczka kończy się na pełnym rekordzie.
+    nr_linii=1
+    reszta=[]
+    while True:
+        linie=we.readlines(ROZMIAR_PACZKI_PLIKU)
+        if not linie:
+            break
+        if separator=="\n":
+            linie=reszta+linie
+            niepuste=[i for i,linia in enumerate(linie) if linia.strip()]
+            koniec=len(niepuste)-len(niepuste)%3
+            podzial=niepuste[koniec-1]+1 if koniec else 0
+            linie,reszta=linie[:podzial],linie[podzial:]
+        if linie:
+            yield nr_linii,linie
+            nr_linii+=len(linie)
+    if reszta:
+        yield nr_linii,reszta
+
+def _rekordy(paczka,separator,rodzaj="linia"):
+    # Zwraca (numery linii, id, pierwsza współrzędna, druga współrzędna) rekordów paczki linii.
+    # Rekord niepasujący do wzorca rodzaj ma id None.
+    nr_linii,linie=paczka
+    numery,ids,wsp1,wsp2=[],[],[],[]
+    if separator=="\n":
+        niepuste=[]
+        for i,linia in enumerate(linie):
+            linia=linia.decode("utf-8","replace").strip()
+            if linia:
+                niepuste.append((nr_linii+i,linia))
+        koniec=len(niepuste)-len(niepuste)%3
+        for i in range(0,koniec,3):
+            numery.append(niepuste[i][0])
+            ids.append(niepuste[i][1])
+            wsp1.append(niepuste[i+1][1])
+            wsp2.append(niepuste[i+2][1])
+        if koniec<len(niepuste):
+            numery.append(niepuste[koniec][0])
+            ids.append(None)
+            wsp1.append("")
+            wsp2.append("")
+    else:
+        wzorzec_linii=wzorzec(rodzaj,separator=separator)
+        for i,linia in enumerate(linie):
+            linia=linia.decode("utf-8","replace").strip()
+            if not linia:
+                continue
+            numery.append(nr_linii+i)
+            m=wzorzec_linii.fullmatch(linia)
+            if m:
+                ids.append(m.group(1))
+                wsp1.append(m.group(2))
+                wsp2.append(m.group(3))
+            else:
+                ids.append(None)
+                wsp1.append("")
+                wsp2.append("")
+    return numery,ids,wsp1,wsp2
+
+# Wynik przelicz_rekordy: poprawne - maska rekordów z przeliczonym punktem, a numery stref nr,
+# współrzędne PL-2000 x y, liczba miejsc dziesiętnych xy_decimal i dokładność dx dy w m dla rekordów poprawnych.
+# Paczka przelicz_strumien ma dodatkowo numery linii i id wszystkich rekordów paczki.
+PrzeliczoneRekordy=collections.namedtuple("PrzeliczoneRekordy","poprawne nr x y xy_decimal dx dy")
+PaczkaRekordow=collections.namedtuple("PaczkaRekordow","numery ids poprawne nr x y xy_decimal dx dy")
+
+def przelicz_rekordy(wsp1,wsp2,strefa,decimal_point=".",reverse_order=False,context=None,metoda=METODA_PROJ,
+                     zrodlo=None):
+    # Odczyt φ λ z tekstów wsp1, wsp2 (λ φ dla reverse_order), wybór strefy, przeliczenie do PL-2000
+    # i oszacowanie dokładności. Rekordy z błędnym tekstem albo nieprzeliczonym punktem nie są poprawne.
+    # Zwraca PrzeliczoneRekordy.
+    if reverse_order:
+        wsp1,wsp2=wsp2,wsp1
+    b,poprawne_b,formaty,miejsca_b=texts_to_deg(wsp1,decimal_point,True)
+    l,poprawne_l,formaty_l,miejsca_l=texts_to_deg(wsp2,decimal_point,True)
+    poprawne=poprawne_b&poprawne_l&(formaty==formaty_l)
+    b,l=do_pl_etrf2000(b[poprawne],l[poprawne],zrodlo,context)
+    nr=_tablica_stref(strefa,len(b),l,b,context)
+    x,y,xy_decimal,dx,dy=konwertuj_wsadowo(b,l,nr,formaty[poprawne],miejsca_b[poprawne],miejsca_l[poprawne],
+                                           context,metoda)
+    ok=(xy_decimal>=0)&~np.isnan(x)
+    poprawne[poprawne]=ok
+    return PrzeliczoneRekordy(poprawne,np.asarray(nr)[ok],x[ok],y[ok],xy_decimal[ok],dx[ok],dy[ok])
+
+def przelicz_strumien(we,strefa,separator=" ",decimal_point=".",reverse_order=False,context=None,
+                      metoda=METODA_PROJ,zrodlo=None):
+    # Czyta strumień binarny we z wierszami id φ λ paczkami jak konwertuj_strumien
+    # i dla każdej paczki zwraca PaczkaRekordow z wynikiem przelicz_rekordy
+    for paczka in _paczki_linii(we,separator):
+        numery,ids,wsp1,wsp2=_rekordy(paczka,separator)
+        yield PaczkaRekordow(numery,ids,*przelicz_rekordy(wsp1,wsp2,strefa,decimal_point,reverse_order,context,
+                                                         metoda,zrodlo))
+
+def _przelicz_rekordy(ids,wsp1,wsp2,strefa,separator,decimal_point,reverse_order,reverse_order_xy,
+                      context=None,z_blednymi=False,metoda=METODA_PROJ,zrodlo=None):
+    # Zwraca (wiersze wynikowe id x y mx my, maska poprawnych rekordów, numery stref poprawnych rekordów).
+    # Dla z_blednymi=True błędny rekord daje wiersz z samym id, więc wiersze odpowiadają rekordom.
+    rekordy=przelicz_rekordy(wsp1,wsp2,strefa,decimal_point,reverse_order,context,metoda,zrodlo)
+    with pomiar("formatowanie",len(ids)):
+        wynik=_formatuj_rekordy(ids,rekordy,separator,decimal_point,reverse_order_xy,z_blednymi)
+    return wynik,rekordy.poprawne,rekordy.nr
+
+def _formatuj_rekordy(ids,rekordy,separator,decimal_point,reverse_order_xy,z_blednymi):
+    # Wiersze wynikowe _przelicz_rekordy z PrzeliczoneRekordy
+    x,y,xy_decimal,dx,dy=rekordy.x,rekordy.y,rekordy.xy_decimal,rekordy.dx,rekordy.dy
+    wynik=[]
+    j=0
+    for i in range(len(ids)):
+        if rekordy.poprawne[i]:
+            d=xy_decimal[j]
+            pola=[f"{x[j]:.{d}f}",f"{y[j]:.{d}f}",f"{dx[j]*1000:g}",f"{dy[j]*1000:g}"]
+            pola=[p.replace(".",decimal_point) for p in pola]
+            if reverse_order_xy:
+                pola=[pola[1],pola[0],pola[3],pola[2]]
+            wynik.append(separator.join([ids[i]]+pola)+"\n")
+            j+=1
+        elif z_blednymi:
+            wynik.append((ids[i] or "")+"\n")
+    return wynik
+
+def _wynik_paczki(numery,wynik,poprawne,nr=None):
+    # Zwraca (tekst wynikowy, liczba przeliczonych, liczba błędnych, numer pierwszej błędnej linii),
+    # a z numerami stref nr poprawnych rekordów zamiast tekstu słownik {nr strefy: tekst wierszy strefy}
+    n=len(numery)
+    pierwszy_bledny=None
+    if len(wynik)<n:
+        pierwszy_bledny=numery[int(np.flatnonzero(~poprawne)[0])]
+    if nr is None:
+        tekst="".join(wynik)
+    else:
+        tekst={z:"".join([wynik[i] for i in idx]) for z,idx in koszyki_stref(nr)}
+    return tekst,len(wynik),n-len(wynik),pierwszy_bledny
+
+def _konwertuj_rekordy(paczka,strefa,separator,decimal_point,reverse_order,reverse_order_xy,context=None,
+                       metoda=METODA_PROJ,zrodlo=None,strefami=False):
+    # Zwraca wynik paczki jak _wynik_paczki, dla strefami=True z tekstami stref
+    numery,ids,wsp1,wsp2=_rekordy(paczka,separator)
+    wynik,poprawne,nr=_przelicz_rekordy(ids,wsp1,wsp2,strefa,separator,decimal_point,
+                                        reverse_order,reverse_order_xy,context,False,metoda,zrodlo)
+    return _wynik_paczki(numery,wynik,poprawne,nr if strefami else None)
+
+def _konwertuj_rekordy_odwrotnie(paczka,strefa,separator,decimal_point,format,reverse_order,reverse_order_xy,
+                                 context=None):
+    # Jak _konwertuj_rekordy dla wierszy id x y (albo id y x dla reverse_order_xy) i wyników id φ λ
+    # (albo id λ φ dla reverse_order). Dalsze pola wiersza, np. dokładność, są pomijane.
+    numery,ids,wsp1,wsp2=_rekordy(paczka,separator,"linia_xy")
+    if reverse_order_xy:
+        wsp1,wsp2=wsp2,wsp1
+    n=len(numery)
+    x,poprawne_x,miejsca_x=texts_to_float(wsp1,decimal_point)
+    y,poprawne_y,miejsca_y=texts_to_float(wsp2,decimal_point)
+    poprawne=poprawne_x&poprawne_y&(miejsca_x==miejsca_y)
+    b,l=konwertuj_odwrotnie_wsadowo(x[poprawne],y[poprawne],strefa,context)
+    miejsca=miejsca_bl(format,miejsca_x[poprawne])
+    wynik=[]
+    for j,i in enumerate(np.flatnonzero(poprawne)):
+        if np.isnan(b[j]):
+            poprawne[i]=False
+            continue
+        pola=list(bl_to_text(b[j],l[j],format,int(miejsca[j]),decimal_point))
+        if reverse_order:
+            pola.reverse()
+        wynik.append(separator.join([ids[i]]+pola)+"\n")
+    return _wynik_paczki(numery,wynik,poprawne)
+
+def konwertuj_tekst(text,strefa,separator=" ",decimal_point=".",reverse_order=False,reverse_order_xy=False,
+                    context=None,metoda=METODA_PROJ,feedback=None,zrodlo=None):
+    # Przelicza wklejoną kolumnę wierszy: [id] φ λ (albo [id] λ φ dla reverse_order).
+    # Przy separatorze enter wiersze arkusza rozdzielone są tabulatorem.
+    # Zwraca (tekst z wierszami [id] x y mx my rozdzielonymi tabulatorem, liczba przeliczonych,
+    # liczba błędnych). Błędny wiersz zostaje pusty, więc wyniki odpowiadają wierszom tekstu.
+    # Wiersze przeliczane są paczkami po ROZMIAR_PACZKI z postępem w feedback (jak w konwertuj_strumien);
+    # po przerwaniu zwracane są wyniki przeliczonych paczek.
+    if separator=="\n":
+        separator="\t"
+    wzorzec_wiersza=wzorzec("wiersz",separator=separator)
+    ids,wsp1,wsp2=[],[],[]
+    for linia in text.splitlines():
+        if not linia.strip():
+            continue
+        m=wzorzec_wiersza.fullmatch(linia)
+        if m:
+            ids.append(m.group(1))
+            wsp1.append(m.group(2))
+            wsp2.append(m.group(3))
+        else:
+            ids.append(None)
+            wsp1.append("")
+            wsp2.append("")
+    z_id=any(ids)
+    wynik,n=[],0
+    for start in range(0,len(ids),ROZMIAR_PACZKI):
+        koniec=start+ROZMIAR_PACZKI
+        wynik_paczki,poprawne,_=_przelicz_rekordy([i or "" for i in ids[start:koniec]],wsp1[start:koniec],
+                                                  wsp2[start:koniec],strefa,"\t",decimal_point,
+                                                  reverse_order,reverse_order_xy,context,True,metoda,
+                                                  zrodlo)
+        wynik+=wynik_paczki
+        n+=int(poprawne.sum())
+        if feedback:
+            feedback.setProcessedCount(len(wynik))
+            feedback.setProgress(100*len(wynik)/len(ids))
+            if feedback.isCanceled():
+                break
+    if not z_id:
+        wynik=[w[1:] if w.startswith("\t") else w for w in wynik]
+    return "".join(wynik),n,len(wynik)-n
+
+def _mapuj_rownolegle(funkcja,elementy,procesy,argumenty=()):
+    # Jak map, ale w procesach roboczych z zachowaniem kolejności wyników. Naraz przetwarzanych
+    # jest najwyżej 2*procesy elementów, więc zużycie pamięci nie zależy od liczby elementów.
+    # Każdy proces ma własną pulę transformacji.
+    kontekst=multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(procesy,mp_context=kontekst,initializer=inicjuj_qgis) as executor:
+        kolejka=collections.deque()
+        for element in elementy:
+            kolejka.append(executor.submit(funkcja,element,*argumenty))
+            if len(kolejka)>=2*procesy:
+                yield kolejka.popleft().result()
+        while kolejka:
+            yield kolejka.popleft().result()
+
+def _konwertuj_fragment(fragment):
+    return konwertuj_wsadowo(*fragment)
+
+def konwertuj_rownolegle(b,l,strefa,format="deg",miejsca=None,miejsca_l=None,procesy=None,
+                         rozmiar_fragmentu=ROZMIAR_PACZKI,metoda=METODA_PROJ,zrodlo=None):
+    # Równoległa wersja konwertuj_wsadowo. Tablice dzielone są na fragmenty przeliczane
+    # w procesy procesach roboczych (domyślnie liczba rdzeni). Procesy używają transformacji
+    # z domyślnym kontekstem, bo kontekstu projektu nie można przekazać do innego procesu.
+    # Przeliczenie z układu zrodlo do PL-ETRF2000 wykonywane jest przed podziałem na fragmenty,
+    # bo strefy wyznaczane są z λ PL-ETRF2000.
+    b,l=do_pl_etrf2000(b,l,zrodlo)
+    n=len(b)
+    procesy=procesy or os.cpu_count() or 1
+    nr=_tablica_stref(strefa,n,l,b)
+    if miejsca is not None:
+        miejsca=np.broadcast_to(miejsca,(n,))
+        miejsca_l=miejsca if miejsca_l is None else np.broadcast_to(miejsca_l,(n,))
+    format=np.broadcast_to(np.asarray(format),(n,))
+    def fragmenty():
+        for start in range(0,n,rozmiar_fragmentu):
+            f=slice(start,start+rozmiar_fragmentu)
+            yield (b[f],l[f],nr[f],format[f],
+                   None if miejsca is None else miejsca[f],None if miejsca_l is None else miejsca_l[f],
+                   None,metoda)
+    x=np.full(n,np.nan)
+    y=np.full(n,np.nan)
+    xy_decimal=dx=dy=None
+    if miejsca is not None:
+        xy_decimal=np.full(n,-1)
+        dx=np.full(n,np.nan)
+        dy=np.full(n,np.nan)
+    for start,wynik in zip(range(0,n,rozmiar_fragmentu),
+                           _mapuj_rownolegle(_konwertuj_fragment,fragmenty(),procesy)):
+        f=slice(start,start+rozmiar_fragmentu)
+        x[f],y[f]=wynik[0],wynik[1]
+        if miejsca is not None:
+            xy_decimal[f],dx[f],dy[f]=wynik[2],wynik[3],wynik[4]
+    return x,y,xy_decimal,dx,dy
+
+def konwertuj_strumien(we,wy,strefa,separator=" ",decimal_point=".",
+                       reverse_order=False,reverse_order_xy=False,feedback=None,context=None,rozmiar=None,
+                       procesy=1,metoda=METODA_PROJ,zrodlo=None,wy_strefy=None):
+    # Przelicza tekst z wierszami: id φ λ (albo id λ φ dla reverse_order) czytany ze strumienia
+    # binarnego we i zapisuje do strumienia tekstowego wy wiersze: id x y mx my
+    # (albo id y x my mx dla reverse_order_xy), gdzie mx, my to dokładność w mm.
+    # Strumień czytany jest paczkami, więc zużycie pamięci nie zależy od ilości danych.
+    # rozmiar - liczba bajtów strumienia do wyznaczenia postępu, jeśli jest znana.
+    # procesy - liczba procesów roboczych przeliczających paczki, kolejność wierszy jest zachowana.
+    # metoda - METODA_PROJ albo METODA_GK, zrodlo - UkladZrodlowy albo None jak w konwertuj_wsadowo.
+    # wy_strefy - funkcja zwracająca strumień wynikowy strefy wy_strefy(nr) zamiast wspólnego wy,
+    # wtedy wiersze każdej strefy zapisywane są do osobnego strumienia.
+    # Zwraca (liczba przeliczonych wierszy, liczba błędnych wierszy, numer pierwszej błędnej linii).
+    argumenty=(strefa,separator,decimal_point,reverse_order,reverse_order_xy)
+    paczki=_paczki_linii(we,separator)
+    strefami=wy_strefy is not None
+    if procesy>1:
+        wyniki=_mapuj_rownolegle(_konwertuj_rekordy,paczki,procesy,argumenty+(None,metoda,zrodlo,strefami))
+    else:
+        wyniki=(_konwertuj_rekordy(paczka,*argumenty,context,metoda,zrodlo,strefami) for paczka in paczki)
+    return _zapisz_wyniki(wyniki,we,wy,feedback,rozmiar,wy_strefy)
+
+def konwertuj_strumien_odwrotnie(we,wy,strefa=None,separator=" ",decimal_point=".",format="deg",
+                                 reverse_order=False,reverse_order_xy=False,feedback=None,context=None,
+                                 rozmiar=None,procesy=1):
+    # Odwrotność konwertuj_strumien: wiersze id x y (albo id y x dla reverse_order_xy) przeliczane
+    # są na wiersze id φ λ (albo id λ φ dla reverse_order) w formacie deg albo dms.
+    # strefa - jak w konwertuj_odwrotnie_wsadowo, domyślnie z pierwszej cyfry y.
+    # Liczba miejsc dziesiętnych φ, λ odpowiada liczbie miejsc x, y (miejsca_bl).
+    argumenty=(strefa,separator,decimal_point,format,reverse_order,reverse_order_xy)
+    paczki=_paczki_linii(we,separator)
+    if procesy>1:
+        wyniki=_mapuj_rownolegle(_konwertuj_rekordy_odwrotnie,paczki,procesy,argumenty)
+    else:
+        wyniki=(_konwertuj_rekordy_odwrotnie(paczka,*argumenty,context) for paczka in paczki)
+    return _zapisz_wyniki(wyniki,we,wy,feedback,rozmiar)
+
+def _zapisz_wyniki(wyniki,we,wy,feedback,rozmiar,wy_strefy=None):
+    wiersze,bledne,pierwszy_bledny=0,0,None
+    for tekst,przeliczone,bledne_paczki,pierwszy_bledny_paczki in wyniki:
+        if wy_strefy is None:
+            wy.write(tekst)
+        else:
+            for z,tekst_strefy in tekst.items():
+                wy_strefy(z).write(tekst_strefy)
+        wiersze+=przeliczone
+        bledne+=bledne_paczki
+        if pierwszy_bledny is None:
+            pierwszy_bledny=pierwszy_bledny_paczki
+        if feedback:
+            feedback.setProcessedCount(wiersze)
+            if rozmiar:
+                feedback.setProgress(100*we.tell()/rozmiar)
+            if feedback.isCanceled():
+                break
+    wyniki.close()
+    return wiersze,bledne,pierwszy_bledny
+
+def konwertuj_plik(sciezka_we,sciezka_wy,strefa,separator=" ",decimal_point=".",
+                   reverse_order=False,reverse_order_xy=False,feedback=None,context=None,procesy=1,
+                   metoda=METODA_PROJ,zrodlo=None):
+    # Plikowa wersja konwertuj_strumien
+    rozmiar=max(os.path.getsize(sciezka_we),1)
+    with open(sciezka_we,"rb") as we, open(sciezka_wy,"w",encoding="utf-8",newline="\n") as wy:
+        return konwertuj_strumien(we,wy,strefa,separator,decimal_point,reverse_order,reverse_order_xy,
+                                  feedback,context,rozmiar,procesy,metoda,zrodlo)
+
+def konwertuj_plik_strefami(sciezka_we,sciezka_wy,strefa,separator=" ",decimal_point=".",
+                            reverse_order=False,reverse_order_xy=False,feedback=None,context=None,procesy=1,
+                            metoda=METODA_PROJ,zrodlo=None):
+    # Jak konwertuj_plik, ale wiersze każdej strefy zapisywane są do osobnego pliku sciezka_strefy(sciezka_wy, nr)
+    # w kolejności i z id z pliku wejściowego. Pliki stref otwierane są przy pierwszym wierszu strefy,
+    # a paczka dzielona jest na strefy jednym stabilnym sortowaniem (koszyki_stref), więc zużycie pamięci
+    # nie zależy od liczby punktów. Zwraca wynik jak konwertuj_plik.
+    rozmiar=max(os.path.getsize(sciezka_we),1)
+    pliki={}
+    with open(sciezka_we,"rb") as we, contextlib.ExitStack() as stos:
+        def wy_strefy(nr):
+            if nr not in pliki:
+                pliki[nr]=stos.enter_context(open(sciezka_strefy(sciezka_wy,nr),"w",encoding="utf-8",newline="\n"))
+            return pliki[nr]
+        return konwertuj_strumien(we,None,strefa,separator,decimal_point,reverse_order,reverse_order_xy,
+                                  feedback,context,rozmiar,procesy,metoda,zrodlo,wy_strefy)
+
+def konwertuj_plik_odwrotnie(sciezka_we,sciezka_wy,strefa=None,separator=" ",decimal_point=".",format="deg",
+                             reverse_order=False,reverse_order_xy=False,feedback=None,context=None,procesy=1):
+    # Plikowa wersja konwertuj_strumien_odwrotnie
+    rozmiar=max(os.path.getsize(sciezka_we),1)
+    with open(sciezka_we,"rb") as we, open(sciezka_wy,"w",encoding="utf-8",newline="\n") as wy:
+        return konwertuj_strumien_odwrotnie(we,wy,strefa,separator,decimal_point,format,reverse_order,
+                                            reverse_order_xy,feedback,context,rozmiar,procesy)
+
+# Pliki binarne: pary współrzędnych float64 (φ λ albo x y) w pliku .npy albo w surowym pliku
+# bez nagłówka (.f64, .bin) w kolejności bajtów komputera. Pliki otwierane są jako mapy pamięci,
+# więc wynik można czytać bez kopiowania, np. np.load(sciezka, mmap_mode="r") albo np.memmap.
+ROZSZERZENIA_BINARNE=(".npy",".f64",".bin")
+
+def plik_binarny(sciezka):
+    return os.path.splitext(sciezka)[1].lower() in ROZSZERZENIA_BINARNE
+
+def otworz_tablice(sciezka,tryb="r"):
+    # Zwraca mapę pamięci (n, 2) float64 pliku binarnego, tryb "r" albo "r+" jak w np.memmap
+    if sciezka.lower().endswith(".npy"):
+        tablica=np.load(sciezka,mmap_mode=tryb)
+    elif os.path.getsize(sciezka)==0:
+        tablica=np.empty((0,2))
+    else:
+        tablica=np.memmap(sciezka,dtype=np.float64,mode=tryb)
+        if tablica.size%2:
+            raise ValueError(f"Plik {sciezka} nie zawiera par liczb float64")
+        tablica=tablica.reshape(-1,2)
+    if tablica.dtype!=np.float64 or tablica.ndim!=2 or tablica.shape[1]!=2:
+        raise ValueError(f"Plik {sciezka} nie zawiera tablicy (n, 2) float64")
+    return tablica
+
+def utworz_tablice(sciezka,n):
+    # Tworzy plik binarny na n par współrzędnych i zwraca jego mapę pamięci (n, 2) float64
+    if sciezka.lower().endswith(".npy"):
+        if n==0:
+            np.save(sciezka,np.empty((0,2)))
+            return np.empty((0,2))
+        return np.lib.format.open_memmap(sciezka,mode="w+",dtype=np.float64,shape=(n,2))
+    if n==0:
+        open(sciezka,"wb").close()
+        return np.empty((0,2))
+    return np.memmap(sciezka,dtype=np.float64,mode="w+",shape=(n,2))
+
+def konwertuj_tablice(we,wy,strefa=None,odwrotnie=False,reverse_order=False,reverse_order_xy=False,
+                      feedback=None,context=None,metoda=METODA_PROJ,rozmiar_okna=ROZMIAR_PACZKI,zrodlo=None):
+    # we, wy - tablice (n, 2) float64 (np. mapy pamięci z otworz_tablice i utworz_tablice),
+    #          wy może być tablicą we dla przeliczenia w miejscu
+    # Wiersze we: φ λ (λ φ dla reverse_order), wiersze wy: x y (y x dla reverse_order_xy),
+    # a dla odwrotnie=True wiersze we x y i wy φ λ. strefa jak w konwertuj_wsadowo
+    # albo konwertuj_odwrotnie_wsadowo. Tablice przetwarzane są oknami po rozmiar_okna wierszy,
+    # więc zużycie pamięci nie zależy od liczby punktów. Punkty, których nie udało się przeliczyć,
+    # mają w wy nan. Zwraca (liczba przeliczonych, liczba błędnych, numer pierwszego błędnego wiersza).
+    # zrodlo - UkladZrodlowy φ λ jak w konwertuj_wsadowo, tylko dla odwrotnie=False.
+    n=len(we)
+    kolumny_bl=(1,0) if reverse_order else (0,1)
+    kolumny_xy=(1,0) if reverse_order_xy else (0,1)
+    kolumny_we,kolumny_wy=(kolumny_xy,kolumny_bl) if odwrotnie else (kolumny_bl,kolumny_xy)
+    przeliczone,pierwszy_bledny=0,None
+    for start in range(0,n,rozmiar_okna):
+        okno=slice(start,min(start+rozmiar_okna,n))
+        a=we[okno,kolumny_we[0]]
+        b=we[okno,kolumny_we[1]]
+        if odwrotnie:
+            p,q=konwertuj_odwrotnie_wsadowo(a,b,strefa,context)
+        else:
+            p,q,_,_,_=konwertuj_wsadowo(a,b,strefa,context=context,metoda=metoda,zrodlo=zrodlo)
+        wy[okno,kolumny_wy[0]]=p
+        wy[okno,kolumny_wy[1]]=q
+        bledne=np.isnan(p)|np.isnan(q)
+        przeliczone+=len(p)-int(np.count_nonzero(bledne))
+        if pierwszy_bledny is None and bledne.any():
+            pierwszy_bledny=start+int(np.argmax(bledne))+1
+        if feedback:
+            feedback.setProcessedCount(okno.stop)
+            feedback.setProgress(100*okno.stop/n)
+            if feedback.isCanceled():
+                break
+    return przeliczone,n-przeliczone,pierwszy_bledny
+
+def konwertuj_plik_binarny(sciezka_we,sciezka_wy=None,strefa=None,odwrotnie=False,reverse_order=False,
+                           reverse_order_xy=False,feedback=None,context=None,metoda=METODA_PROJ,zrodlo=None):
+    # Plikowa wersja konwertuj_tablice, bez sciezka_wy przeliczenie w miejscu w pliku sciezka_we
+    we=otworz_tablice(sciezka_we,"r" if sciezka_wy else "r+")
+    wy=utworz_tablice(sciezka_wy,len(we)) if sciezka_wy else we
+    wynik=konwertuj_tablice(we,wy,strefa,odwrotnie,reverse_order,reverse_order_xy,feedback,context,metoda,
+                            zrodlo=zrodlo)
+    if isinstance(wy,np.memmap):
+        wy.flush()
+    return wynik
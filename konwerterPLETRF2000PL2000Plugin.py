@@ -5,21 +5,36 @@
 #.....version date......: 2024-08-19
 #     author            : Szymon Kędziora
 
-import re, os, csv
+import os, time, math, sqlite3
 
 from qgis.core import \
-  QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject, QgsPointXY, QgsCoordinateFormatter, \
-  QgsApplication
+  QgsPointXY, QgsApplication, QgsMessageLog, Qgis, QgsMapLayerProxyModel, QgsProject, QgsCoordinateReferenceSystem
+
+from qgis.gui import QgsMapLayerComboBox, QgsProjectionSelectionWidget
 
 from qgis.PyQt.QtCore import \
-  Qt, QLocale, pyqtSignal, QSettings, QRegExp, QUrl
+  Qt, QLocale, pyqtSignal, QSettings, QRegExp, QUrl, QTimer
 
 from qgis.PyQt.QtGui import \
-  QRegExpValidator, QFontMetrics, QValidator, QPalette, QKeySequence, QCursor,QDesktopServices
+  QRegExpValidator, QFontMetrics, QValidator, QPalette, QKeySequence, QCursor,QDesktopServices, QFontDatabase, QIcon
 
 from qgis.PyQt.QtWidgets import \
   QFrame, QDockWidget, QWidget, QGroupBox, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, \
-  QGridLayout, QLineEdit, QMessageBox, QTabWidget, QSizePolicy, QComboBox, QCheckBox, QMenuBar, QApplication
+  QGridLayout, QLineEdit, QMessageBox, QTabWidget, QSizePolicy, QComboBox, QCheckBox, QMenuBar, QApplication, \
+  QProgressBar, QFileDialog, QPlainTextEdit, QAction, QTableWidget, QTableWidgetItem, QAbstractItemView, \
+  QHeaderView
+
+from . import konwerter, eksport
+from .konwerter import KOD_PL_ETRF2000, pula_transformacji
+from .processing_provider import KonwerterProvider
+from .powiaty import indeks_granic_powiatow, granice_powiatow_dostepne, BRAK_GRANIC_POWIATOW
+from .narzedzie_mapy import NarzedzieKonwersji
+from .zadania import ZadanieKonwersjiPliku, ZadanieKonwersjiTekstu, ZadanieSynchronizacji, zadanie_konwersji_warstwy
+from .synchronizacja import SynchronizacjaWarstwy
+from .historia import Historia
+
+STREFA_WG_DLUGOSCI="wg λ"
+STREFA_WG_GRANIC="wg granic powiatów"
 
 class MyLineEdit(QLineEdit):
     
@@ -93,7 +108,6 @@ class TwoLineEdit(QFrame):
         super(TwoLineEdit,self).__init__(parent)
         self.readOnly=False
         self.separator=" "
-        self.pattern="([\S]+)"
         self.format_wkt=False
         self.le1=MyLineEdit(self) 
         self.le2=MyLineEdit(self) 
@@ -214,7 +228,7 @@ class TwoLineEdit(QFrame):
             clipboard = QApplication.clipboard()
             text = clipboard.text()
             if text:
-                m=re.fullmatch(self.pattern+self.separator+self.pattern,text)
+                m=konwerter.wzorzec("para",separator=self.separator).fullmatch(text)
                 if m:
                     if self.le2.hasSelectedText():
                         self.le1.insert(m.group(1))
@@ -227,7 +241,7 @@ class TwoLineEdit(QFrame):
             clipboard = QApplication.clipboard()
             text = clipboard.text()
             if text:
-                m=re.fullmatch(self.pattern+self.separator+self.pattern,text)
+                m=konwerter.wzorzec("para",separator=self.separator).fullmatch(text)
                 if m:
                     if self.le1.hasSelectedText():
                         self.le1.insert(m.group(1))
@@ -396,22 +410,55 @@ class TwoLineEdit(QFrame):
 class MyRegExpValidator(QRegExpValidator):
     def __init__(self):
         super().__init__()
+        self.decimal_point='.'
+        
+    def setLocale(self,locale):
+        super().setLocale(locale)
+        self.decimal_point=locale.decimalPoint()
         
     def validate(self,str,p):
-        if self.locale().decimalPoint()==',':
+        if self.decimal_point==',':
             str=str.replace(".",",")
-        if self.locale().decimalPoint()=='.':
+        else:
             str=str.replace(",",".")
-        return super().validate(str,p)
+        with konwerter.pomiar("walidacja"):
+            return super().validate(str,p)
+
+_walidatory={}
+
+def walidator(format,locale):
+    # Walidatory współdzielone przez pola, tworzone raz dla formatu (deg, dms, xy)
+    # i separatora dziesiętnego
+    klucz=(locale.decimalPoint(),format)
+    validator=_walidatory.get(klucz)
+    if validator is None:
+        validator=MyRegExpValidator()
+        validator.setLocale(locale)
+        if format=="deg":
+            rx=QRegExp(f"\\d{{0,2}}[,.]?\\d{{0,{konwerter.UPPER_DEG_DECI+1}}}")
+        elif format=="xy":
+            # Tyle miejsc dziesiętnych x, y, ile daje przeliczenie φ λ (xy_round_accuracy) i przyjmuje miejsca_bl
+            miejsca_xy=max(konwerter.UPPER_DEG_DECI-5,konwerter.UPPER_DMS_DECI-1)
+            rx=QRegExp(f"\\d{{0,7}}[,.]?\\d{{0,{miejsca_xy}}}")
+        else:
+            rx=QRegExp(f"\\d{{0,2}}[ °]?" \
+                       f"\\d{{0,2}}[ ′']?" \
+                       f"\\d{{0,2}}[,.]?\\d{{0,{konwerter.UPPER_DMS_DECI}}}(\"|″|'')?")
+        validator.setRegExp(rx)
+        _walidatory[klucz]=validator
+    return validator
 
 class PlEtrf2000_2LE(TwoLineEdit):
+    
+    sigPasteLines=pyqtSignal(str)
+    
     def __init__(self,parent,locale):
         super(PlEtrf2000_2LE,self).__init__(parent)
-        self.LOWER_DEG_DECI=8
-        self.UPPER_DEG_DECI=10
+        self.LOWER_DEG_DECI=konwerter.LOWER_DEG_DECI
+        self.UPPER_DEG_DECI=konwerter.UPPER_DEG_DECI
         self.DEG_DMS_DIF=3
-        self.LOWER_DMS_DECI=5
-        self.UPPER_DMS_DECI=7
+        self.LOWER_DMS_DECI=konwerter.LOWER_DMS_DECI
+        self.UPPER_DMS_DECI=konwerter.UPPER_DMS_DECI
         self.DMS_DEG_DIF=4
         self.reverse_order=False
         self._locale=locale
@@ -420,17 +467,9 @@ class PlEtrf2000_2LE(TwoLineEdit):
         self.l_deg_text=None
         self.b_dms_text=None
         self.l_dms_text=None
-        self.deg_validator=MyRegExpValidator()
-        self.deg_validator.setLocale(self._locale)
-        rx = QRegExp(f"\\d{{0,2}}[,.]?\\d{{0,{self.UPPER_DEG_DECI+1}}}")
-        self.deg_validator.setRegExp(rx)
+        self.deg_validator=walidator("deg",self._locale)
         self.setValidator(self.deg_validator)
-        self.dms_validator=MyRegExpValidator()
-        self.dms_validator.setLocale(self._locale)
-        rx = QRegExp(f"\\d{{0,2}}[ °]?" \
-                     f"\\d{{0,2}}[ ′']?" \
-                     f"\\d{{0,2}}[,.]?\\d{{0,{self.UPPER_DMS_DECI}}}(\"|″|'')?")
-        self.dms_validator.setRegExp(rx)
+        self.dms_validator=walidator("dms",self._locale)
         self.le1.sigCopy.disconnect()
         self.le2.sigCopy.disconnect()
         self.le1.sigCopy.connect(self.le1_sigCopy)
@@ -461,19 +500,23 @@ class PlEtrf2000_2LE(TwoLineEdit):
     def le2_sigCopy(self):
         self.le1_sigCopy()
     
+    def wiele_wierszy(self,text):
+        # Kolumna punktów ze schowka, a nie para współrzędnych jednego punktu
+        wiersze=sum(1 for linia in text.splitlines() if linia.strip())
+        return wiersze>2 if self.separator=='\n' else wiersze>1
+    
     def le1_sigPaste(self):
          if not self.readOnly:
             clipboard = QApplication.clipboard()
             text = clipboard.text()
             if text:
+                if self.wiele_wierszy(text):
+                    self.sigPasteLines.emit(text)
+                    return
                 if self.format=="deg":
-                    m=re.match(self.pattern+self.separator+self.pattern,text)
+                    m=konwerter.wzorzec("para",separator=self.separator).match(text)
                 if self.format=="dms":
-                    d_pattern="\d{1,2}[° ]"
-                    m_pattern="(?:\d{1,2}[′' ])"   
-                    s_pattern=f"(?:\d{{0,2}}[{self._locale.decimalPoint()}.,](?=\d)\d*|\d{{1,2}})(?:\"|″|'')?"
-                    pattern=f"({d_pattern}{m_pattern}{s_pattern})"
-                    m=re.match(pattern+self.separator+pattern,text)
+                    m=konwerter.wzorzec("para_dms",self._locale.decimalPoint(),self.separator).match(text)
                 if m:
                     if not self.le1.text() and not self.le2.text() \
                        or self.le1.hasSelectedText() and self.le2.hasSelectedText():
@@ -491,14 +534,13 @@ class PlEtrf2000_2LE(TwoLineEdit):
             clipboard = QApplication.clipboard()
             text = clipboard.text()
             if text:
+                if self.wiele_wierszy(text):
+                    self.sigPasteLines.emit(text)
+                    return
                 if self.format=="deg":
-                    m=re.match(self.pattern+self.separator+self.pattern,text)
+                    m=konwerter.wzorzec("para",separator=self.separator).match(text)
                 if self.format=="dms":
-                    d_pattern="\d{1,2}[° ]"
-                    m_pattern="(?:\d{1,2}[′' ])"   
-                    s_pattern=f"(?:\d{{0,2}}[{self._locale.decimalPoint()}.,](?=\d)\d*|\d{{1,2}})(?:\"|″|'')?"
-                    pattern=f"({d_pattern}{m_pattern}{s_pattern})"
-                    m=re.match(pattern+self.separator+pattern,text)
+                    m=konwerter.wzorzec("para_dms",self._locale.decimalPoint(),self.separator).match(text)
                 if m:
                     if not self.le1.text() and not self.le2.text() \
                        or self.le1.hasSelectedText() and self.le2.hasSelectedText():
@@ -564,8 +606,9 @@ class PlEtrf2000_2LE(TwoLineEdit):
         
         decimal_point=self._locale.decimalPoint()
         self._locale=locale
-        self.deg_validator.setLocale(locale)
-        self.dms_validator.setLocale(locale)
+        self.deg_validator=walidator("deg",locale)
+        self.dms_validator=walidator("dms",locale)
+        self.setValidator(self.dms_validator if self.format=="dms" else self.deg_validator)
         
         if decimal_point!=locale.decimalPoint():
             
@@ -589,56 +632,20 @@ class PlEtrf2000_2LE(TwoLineEdit):
             self.blockSignals(False)
     
     def deg_text_to_deg(self,deg_text):
-        decimalPoint=self._locale.decimalPoint()
-        if deg_text:
-            if self.b_dms_text or self.l_dms_text:
-                pattern=f"\\d{{2}}[{decimalPoint}.,]" \
-                        f"\\d{{{self.LOWER_DEG_DECI},{self.UPPER_DEG_DECI+1}}}"
-            else:
-                pattern=f"\\d{{2}}[{decimalPoint}.,]" \
-                        f"\\d{{{self.LOWER_DEG_DECI},{self.UPPER_DEG_DECI}}}"
-            m=re.fullmatch(pattern,deg_text)
-            if m:
-                deg=self._locale.toDouble(deg_text)[0]
-                return deg
-            else:
-                return None
+        if self.b_dms_text or self.l_dms_text:
+            upper_deg_deci=self.UPPER_DEG_DECI+1
         else:
-            return None
+            upper_deg_deci=self.UPPER_DEG_DECI
+        return konwerter.deg_text_to_deg(deg_text,self._locale.decimalPoint(),upper_deg_deci)
             
     def dms_text_to_parts(self,dms_text):
-        decimalPoint=self._locale.decimalPoint()
-        d_pattern="((\d{2})[° ])"
-        m_pattern="((\d{1,2})[′' ])"
-        s_pattern=f"(\d{{0,2}}[{decimalPoint}]\\d{{{self.LOWER_DMS_DECI},{self.UPPER_DMS_DECI}}})(\"|″|'')?"
-        pattern=f"{d_pattern}{m_pattern}{s_pattern}"
-        
-        m=re.fullmatch(pattern,dms_text)
-            
-        if m:
-            d_text,m_text,s_text=m.group(2),m.group(4),m.group(5)
-            return (d_text,m_text,s_text)
-        else:
-            return None
+        return konwerter.dms_text_to_parts(dms_text,self._locale.decimalPoint())
     
     def dms_parts_to_dms(self,dms_parts):
-        d_text,m_text,s_text=dms_parts
-        
-        if d_text: d=float(d_text)
-        else: d=0.0
-        
-        if m_text: m=float(m_text)
-        else: m=0.0
-        
-        if s_text: s=self._locale.toDouble(s_text)[0]
-        else: s=0.0
-        
-        return (d,m,s)
+        return konwerter.dms_parts_to_dms(dms_parts,self._locale.decimalPoint())
     
     def dms_to_deg(self,dms):
-        d,m,s=dms
-        deg=d+m/60+s/(60*60)
-        return deg
+        return konwerter.dms_to_deg(dms)
     
     def dms_text_to_deg(self,dms_text):
         dms_parts=self.dms_text_to_parts(dms_text)
@@ -650,28 +657,25 @@ class PlEtrf2000_2LE(TwoLineEdit):
             return None
         
     def deg_b_to_dms_text(self,b,precision):
-        dms_text=QgsCoordinateFormatter().formatY(
-            b,
-            QgsCoordinateFormatter().FormatDegreesMinutesSeconds,
-            precision,
-            QgsCoordinateFormatter().FlagDegreesPadMinutesSeconds
-        )
-        return dms_text
+        return konwerter.deg_b_to_dms_text(b,precision)
     
     def deg_l_to_dms_text(self,l,precision):
-        dms_text=QgsCoordinateFormatter().formatX(
-            l,
-            QgsCoordinateFormatter().FormatDegreesMinutesSeconds,
-            precision,
-            QgsCoordinateFormatter().FlagDegreesPadMinutesSeconds
-        )
-        return dms_text
+        return konwerter.deg_l_to_dms_text(l,precision)
     
     def transformuj_punkt(self,pt,kod_strefy):
-        crs1 = QgsCoordinateReferenceSystem("EPSG:9702") 
-        crs2 = QgsCoordinateReferenceSystem(kod_strefy)
-        proj = QgsCoordinateTransform(crs1,crs2,QgsProject.instance())
-        return (proj.transform(pt))
+        proj=pula_transformacji().transformacja(KOD_PL_ETRF2000,kod_strefy)
+        with konwerter.pomiar("transformacja"):
+            return (proj.transform(pt))
+    
+    def punkt_pl_etrf2000(self,pt,zrodlo):
+        # Punkt λ φ układu zrodlo (konwerter.UkladZrodlowy albo None) w PL-ETRF2000,
+        # None jeśli przeliczenie się nie powiodło
+        if zrodlo is None:
+            return pt
+        b,l=konwerter.do_pl_etrf2000([pt.y()],[pt.x()],zrodlo)
+        if math.isnan(b[0]) or math.isnan(l[0]):
+            return None
+        return QgsPointXY(float(l[0]),float(b[0]))
         
     def toggled_dms_values(self):
         if self.is_dms_entered():
@@ -761,6 +765,7 @@ class Pl2000_2LE(TwoLineEdit):
         self._locale=locale
         self.x=None
         self.y=None
+        self.setValidator(walidator("xy",locale))
         self.le1.sigCopy.disconnect()
         self.le2.sigCopy.disconnect()
         self.le1.sigCopy.connect(self.le1_sigCopy)
@@ -787,6 +792,7 @@ class Pl2000_2LE(TwoLineEdit):
     def setLocale(self,locale):
         decimal_point=self._locale.decimalPoint()
         self._locale=locale
+        self.setValidator(walidator("xy",locale))
         if decimal_point!=self._locale.decimalPoint():
             if self.le1.text():
                 x_text=self.le1.text().replace(decimal_point,self._locale.decimalPoint())
@@ -805,18 +811,32 @@ class Pl2000_2LE(TwoLineEdit):
         return (d1,d2)
     
 class MyDockWidget(QDockWidget):
+    # Zawartość panelu, w tym tabela powiatów, budowana jest przy pierwszym pokazaniu panelu,
+    # więc zamknięty panel nie wydłuża uruchamiania QGIS.
     def __init__(self,title,parent,flags,settings,plugin_dir):
         super(MyDockWidget,self).__init__(title,parent,flags)
         self.settings   = settings
         self.plugin_dir = plugin_dir
+        self.setObjectName(title)
+        self.title=title
+        self.zbudowany=False
+    
+    def showEvent(self,event):
+        if not self.zbudowany:
+            self.zbudowany=True
+            self.zbuduj()
+        super().showEvent(event)
+    
+    def zbuduj(self):
         if self.settings.value('decimal_point_cmbbox')=="kropka":
             self.locale=QLocale().c()
         if self.settings.value('decimal_point_cmbbox')=="systemowy":
             self.locale=QLocale()
         self.kod_strefy=""
+        self.uklad_zrodlowy=None
         self.d={}
-        self.setObjectName(title)
-        self.title=title
+        self.historia=Historia(self.sciezka_historii())
+        self.historia_ostatni=None
         widget=QWidget(self)
         self.setWidget(widget) 
         layout=QVBoxLayout(widget)
@@ -827,6 +847,11 @@ class MyDockWidget(QDockWidget):
         self.tabs.setFocusPolicy(Qt.NoFocus)
         self.tabKonwerter=self.tabKonwerter()
         self.tabs.addTab(self.tabKonwerter,"Konwerter")
+        self.tabPlik=self.tabPlik()
+        self.tabs.addTab(self.tabPlik,"Plik")
+        self.tabHistoria=self.tabHistoria()
+        self.tabs.addTab(self.tabHistoria,"Historia")
+        self.tabs.currentChanged.connect(self.tabs_currentChanged)
         self.tabOpcje=self.tabUstawienia()
         self.tabs.addTab(self.tabOpcje,"Ustawienia")
         menu=QMenuBar(widget)
@@ -843,7 +868,12 @@ class MyDockWidget(QDockWidget):
             layout1.setAlignment(Qt.AlignLeft)
             self.nr_strefy_lab=QLabel("Nr strefy PL-2000",parent)
             self.nr_strefy_cmbBox=QComboBox(parent)
-            self.nr_strefy_cmbBox.addItems(["-","5","6","7","8"])
+            self.nr_strefy_cmbBox.addItems(["-","5","6","7","8",STREFA_WG_DLUGOSCI,STREFA_WG_GRANIC])
+            if not granice_powiatow_dostepne():
+                # Bez pliku granic powiatów tryb jest widoczny z wyjaśnieniem, ale nie można go wybrać
+                i=self.nr_strefy_cmbBox.count()-1
+                self.nr_strefy_cmbBox.model().item(i).setEnabled(False)
+                self.nr_strefy_cmbBox.setItemData(i,BRAK_GRANIC_POWIATOW,Qt.ToolTipRole)
             self.nr_strefy_cmbBox.setFixedSize(self.nr_strefy_cmbBox.sizeHint())
             self.nr_strefy_cmbBox.setFocusPolicy(Qt.NoFocus)
             self.nr_strefy_lab.hide()
@@ -856,12 +886,8 @@ class MyDockWidget(QDockWidget):
             layout2.setAlignment(Qt.AlignLeft)
             self.powiat_lab=QLabel("Powiat",parent)
             self.powiat_cmbBox=QComboBox(parent)
-            with open(self.plugin_dir+'/Powiaty_w_strefach_PL-2000.csv') as f:
-                dict_reader = csv.DictReader(f, delimiter=',')
-                for row in dict_reader:
-                    self.d[row['Województwo']+' '+row['Powiat']]=row['Nr strefy']
-            l=sorted(self.d.keys())
-            l.insert(0,"-")
+            self.d=konwerter.tabela_powiatow()
+            l=["-"]+list(konwerter.nazwy_powiatow())
             self.powiat_cmbBox.addItems(l)
             self.powiat_cmbBox.setMinimumContentsLength(20)
             self.powiat_cmbBox.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
@@ -926,52 +952,52 @@ class MyDockWidget(QDockWidget):
             layout.addWidget(self.y_units_lab,1,2)
             return pl_2000_grBox,pl_2000_2le
             
-        def xy_round_accuracy(self,locale,format,decimal_part1,decimal_part2):
+        def decimal_places(self,locale,decimal_part1,decimal_part2):
             decimal_remainder1=decimal_part1.split(locale.decimalPoint())[1]
             decimal_remainder2=decimal_part2.split(locale.decimalPoint())[1]
-            len_decimal_remainder1=len(decimal_remainder1)
-            len_decimal_remainder2=len(decimal_remainder2)
-            if len_decimal_remainder1==len_decimal_remainder2:
-                if format=="deg":
-                    xy_decimal=len_decimal_remainder1-5
-                    dx=float(f"2e-{xy_decimal}")
-                    dy=float(f"1e-{xy_decimal}")
-                    return xy_decimal,dx,dy
-                if format=="dms":
-                    xy_decimal=len_decimal_remainder1-1
-                    dx=float(f"4e-{xy_decimal}")
-                    dy=float(f"2e-{xy_decimal}")
-                    return xy_decimal,dx,dy
-            else:
-                return None,None,None
+            return len(decimal_remainder1),len(decimal_remainder2)
+            
+        def pl_etrf2000_2le_sigPasteLines(self,text):
+            if not self.kod_strefy:
+                self.label.setText("Nie wybrano numeru strefy PL-2000")
+                return
+            zadanie=ZadanieKonwersjiTekstu(
+                text,self.kod_strefy,self.pl_etrf2000_2le.separator,self.locale.decimalPoint(),
+                self.pl_etrf2000_2le.reverse_order,self.pl_2000_2le.reverse_order,self.uklad_zrodlowy)
+            zadanie.przeliczono.connect(lambda wiersze,czas: self.label.setText(f"Przeliczono {wiersze} wierszy…"))
+            zadanie.zakonczono.connect(lambda result: pl_etrf2000_2le_pasteFinished(self,zadanie))
+            self.schowek_zadania.append(zadanie)
+            self.label.setText("Przeliczanie wklejonych punktów…")
+            QgsApplication.taskManager().addTask(zadanie)
         
-        def xy_accuracy(self,locale,format,pt,decimal_part,pt_dms,pt_deg):
-            xy_decimal=6
-            decimal_remainder=decimal_part.split(locale.decimalPoint())[1]
-            len_decimal_remainder=len(decimal_remainder)
-            step=float(f"1e-{len_decimal_remainder}")
-            if format=="deg":
-                b_deg,l_deg=pt_deg
-                b_deg_succ=b_deg+step
-                l_deg_succ=l_deg+step
-            if format=="dms":
-                b_dms,l_dms=pt_dms
-                b_dms_succ=list(b_dms)
-                b_dms_succ[2]=b_dms_succ[2]+step
-                b_dms_succ=tuple(b_dms_succ)
-                l_dms_succ=list(l_dms)
-                l_dms_succ[2]=l_dms_succ[2]+step
-                l_dms_succ=tuple(l_dms_succ)
-                b_deg_succ=self.pl_etrf2000_2le.dms_to_deg(b_dms_succ)
-                l_deg_succ=self.pl_etrf2000_2le.dms_to_deg(l_dms_succ)
-            pt_succ,kod_strefy,komunikat=self.pl_etrf2000_2le.transformuj_punkt(QgsPointXY(l_deg_succ,b_deg_succ))
-            dx=pt_succ.y()-pt.y()
-            dy=pt_succ.x()-pt.x()
-            return xy_decimal,dx,dy
+        def pl_etrf2000_2le_pasteFinished(self,zadanie):
+            self.schowek_zadania.remove(zadanie)
+            if zadanie.blad:
+                self.label.setText(f"Przeliczanie wklejonych punktów: {zadanie.opis_bledu()}")
+                return
+            if zadanie.wynik is None:
+                self.label.setText("Przeliczanie wklejonych punktów przerwano")
+                return
+            wynik,przeliczone,bledne=zadanie.wynik
+            QApplication.clipboard().setText(wynik)
+            text=f"Przeliczono {przeliczone} punktów, wyniki z dokładnością w mm skopiowano do schowka."
+            if bledne:
+                text+=f" Błędnych wierszy: {bledne}."
+            if zadanie.isCanceled():
+                text+=" Przerwano."
+            self.label.setText(text)
             
         def pl_etrf2000_2le_editingFinished(self):
+            if self.odwrotnie_chkbox.isChecked():
+                return
             if not self.pl_etrf2000_2le.hasFocus() and not self.pl_2000_2le.hasFocus():
                 return
+            pl_etrf2000_przelicz(self)
+        
+        def pl_etrf2000_przelicz(self,z_ukladu_zrodlowego=True,uklad=None):
+            # z_ukladu_zrodlowego=False dla φ λ w PL-ETRF2000 niezależnie od ustawionego układu źródłowego,
+            # uklad - konwerter.UkladZrodlowy wpisu historii użyty zamiast ustawionego, bez zmiany ustawień
+            zrodlo=(uklad or self.uklad_zrodlowy) if z_ukladu_zrodlowego else None
             if not self.pl_etrf2000_2le.le1.text():
                 dlg=QMessageBox(self)
                 dlg.setWindowTitle("Uwaga")
@@ -1027,11 +1053,32 @@ class MyDockWidget(QDockWidget):
                     l_deg=self.pl_etrf2000_2le.dms_to_deg(l_dms)
             if b_deg and l_deg:
                 ent_format,ent_decimal_part1,ent_decimal_part2=self.pl_etrf2000_2le.entered_decimal_parts()
-                xy_decimal,dx,dy=xy_round_accuracy(self,locale,ent_format,ent_decimal_part1,ent_decimal_part2)
-                if xy_decimal:
+                decimal_places1,decimal_places2=decimal_places(self,locale,ent_decimal_part1,ent_decimal_part2)
+                if decimal_places1==decimal_places2:
                     if self.kod_strefy:
-                        pt=self.pl_etrf2000_2le.transformuj_punkt(QgsPointXY(l_deg,b_deg),self.kod_strefy)
-                        if pt:
+                        pt=self.pl_etrf2000_2le.punkt_pl_etrf2000(
+                            QgsPointXY(l_deg,b_deg),zrodlo)
+                        if pt is None:
+                            self.label.setText("Przeliczenie do PL-ETRF2000 nie powiodło się")
+                            return
+                        b_etrf,l_etrf=pt.y(),pt.x()
+                        kod_strefy=self.kod_strefy
+                        if kod_strefy==konwerter.STREFA_AUTO:
+                            kod_strefy=konwerter.kod_strefy_z_dlugosci(l_etrf)
+                            self.pl_2000_grBox.setTitle("PL-2000 ("+STREFA_WG_DLUGOSCI+" "+kod_strefy+")")
+                        if kod_strefy==konwerter.STREFA_POWIATY:
+                            indeks=indeks_granic_powiatow()
+                            with konwerter.pomiar("strefa"):
+                                powiat=indeks.powiat(l_etrf,b_etrf)
+                            if powiat<0:
+                                self.label.setText("Punkt leży poza granicami powiatów")
+                                return
+                            kod_strefy=konwerter.kod_strefy(indeks.strefy[powiat])
+                            self.pl_2000_grBox.setTitle("PL-2000 ("+indeks.nazwy[powiat]+" "+kod_strefy+")")
+                        xy_decimal,dx,dy=konwerter.xy_round_accuracy(ent_format,decimal_places1,decimal_places2,
+                                                                     b_etrf,l_etrf,kod_strefy)
+                        pt=self.pl_etrf2000_2le.transformuj_punkt(pt,kod_strefy)
+                        if pt and xy_decimal:
                             self.x=pt.y()
                             self.y=pt.x()
                             x_text=locale.toString(self.x,'f',xy_decimal)
@@ -1040,7 +1087,11 @@ class MyDockWidget(QDockWidget):
                             dxmm_text=locale.toString(dx*1000)
                             dymm_text=locale.toString(dy*1000)
                             text=f"x±{dxmm_text}mm y±{dymm_text}mm"
+                            if zrodlo!=self.uklad_zrodlowy:
+                                text+=f" (φ λ w układzie {zrodlo.kod if zrodlo else konwerter.KOD_PL_ETRF2000})"
                             self.label.setText(text)
+                            self.dodaj_do_historii(ent_format,str1,str2,b_deg,l_deg,kod_strefy,
+                                                   x_text,y_text,self.x,self.y,dx,dy,uklad=zrodlo)
                         else:
                             self.label.setText("Transformacja współrzędnych nie powidła się")
                     else:
@@ -1054,11 +1105,76 @@ class MyDockWidget(QDockWidget):
                     
         
         def pl_etrf2000_2le_textChanged(self):
+            if self.odwracanie:
+                return
             if self.label.text(): self.label.clear()
+            self.odwracanie=True
             self.pl_2000_2le.clear()
+            self.odwracanie=False
             self.x=None
             self.y=None
         
+        def pl_2000_2le_textChanged(self):
+            if self.odwracanie or not self.odwrotnie_chkbox.isChecked():
+                return
+            if self.label.text(): self.label.clear()
+            self.odwracanie=True
+            self.pl_etrf2000_2le.clear()
+            self.odwracanie=False
+        
+        def pl_2000_2le_editingFinished(self):
+            if not self.odwrotnie_chkbox.isChecked():
+                return
+            x_text=self.pl_2000_2le.le1.text()
+            y_text=self.pl_2000_2le.le2.text()
+            if not x_text or not y_text:
+                return
+            locale=self.pl_2000_2le._locale
+            xy,poprawne,miejsca=konwerter.texts_to_float([x_text,y_text],locale.decimalPoint())
+            if not poprawne.all() or miejsca[0]!=miejsca[1]:
+                dlg=QMessageBox(self)
+                dlg.setWindowTitle("Uwaga")
+                text=f"Obie współrzędne muszą być liczbami z taką samą ilością miejsc dziesiętnych."
+                dlg.setText(text)
+                dlg.show()
+                return
+            if self.kod_strefy in konwerter.KODY_STREF.values():
+                kod_strefy=self.kod_strefy
+            else:
+                nr=int(konwerter.nr_strefy_z_y(xy[1]))
+                if not nr:
+                    self.label.setText("Współrzędna y nie należy do żadnej strefy PL-2000")
+                    return
+                kod_strefy=konwerter.kod_strefy(nr)
+                self.pl_2000_grBox.setTitle("PL-2000 (wg y "+kod_strefy+")")
+            b,l=konwerter.konwertuj_odwrotnie_wsadowo(xy[:1],xy[1:],kod_strefy)
+            if math.isnan(b[0]):
+                self.label.setText("Transformacja współrzędnych nie powidła się")
+                return
+            format=self.pl_etrf2000_2le.format
+            b_text,l_text=konwerter.bl_to_text(b[0],l[0],format,int(konwerter.miejsca_bl(format,miejsca[0])),
+                                               locale.decimalPoint())
+            self.odwracanie=True
+            self.pl_etrf2000_2le.setText(b_text,l_text)
+            self.odwracanie=False
+            self.dodaj_do_historii(format,b_text,l_text,b[0],l[0],kod_strefy,x_text,y_text,xy[0],xy[1],
+                                   odwrotnie=True)
+        
+        def odwrotnie_chkbox_stateChanged(self):
+            odwrotnie=self.odwrotnie_chkbox.isChecked()
+            self.settings.setValue('odwrotnie_chkbox',odwrotnie)
+            self.odwracanie=True
+            self.pl_etrf2000_2le.clear()
+            self.pl_2000_2le.clear()
+            self.odwracanie=False
+            self.label.clear()
+            self.pl_etrf2000_2le.setReadOnly(odwrotnie)
+            self.pl_2000_2le.setReadOnly(not odwrotnie)
+            if odwrotnie:
+                self.pl_2000_2le.le1.setFocus()
+            else:
+                self.pl_etrf2000_2le.le1.setFocus()
+        
         def pl_etrf2000_2le_toggle_format(self):
             if self.pl_etrf2000_2le.format=="deg":
                 self.b_units_lab.setText("°")
@@ -1073,23 +1189,391 @@ class MyDockWidget(QDockWidget):
         layout=QVBoxLayout(widget)
         widget.setLayout(layout)
         strefa(self,widget)
-        pl_etrf2000_grBox,self.pl_etrf2000_2le=pl_etrf2000_grBox(self,widget)
+        self.odwracanie=False
+        self.schowek_zadania=[]
+        layout3=QHBoxLayout()
+        layout3.setAlignment(Qt.AlignLeft)
+        odwrotnie_lab=QLabel("PL-2000 → PL-ETRF2000",widget)
+        self.odwrotnie_chkbox=QCheckBox(widget)
+        self.odwrotnie_chkbox.setFocusPolicy(Qt.NoFocus)
+        layout3.addWidget(odwrotnie_lab)
+        layout3.addWidget(self.odwrotnie_chkbox)
+        layout.addLayout(layout3)
+        self.pl_etrf2000_grBox,self.pl_etrf2000_2le=pl_etrf2000_grBox(self,widget)
         self.pl_2000_grBox,self.pl_2000_2le=pl_2000_grBox(self,widget)
+        self.pl_2000_2le.editingFinished.connect(lambda: pl_2000_2le_editingFinished(self))
+        self.pl_2000_2le.textChanged.connect(lambda: pl_2000_2le_textChanged(self))
+        self.odwrotnie_chkbox.stateChanged.connect(lambda: odwrotnie_chkbox_stateChanged(self))
         self.pl_etrf2000_2le.editingFinished.connect(lambda: pl_etrf2000_2le_editingFinished(self))
+        self.pl_etrf2000_przelicz=lambda z_ukladu_zrodlowego=True,uklad=None: \
+            pl_etrf2000_przelicz(self,z_ukladu_zrodlowego,uklad)
+        self.pl_2000_przelicz=lambda: pl_2000_2le_editingFinished(self)
+        self.pl_etrf2000_format=lambda: pl_etrf2000_2le_toggle_format(self)
         self.pl_etrf2000_2le.textChanged.connect(lambda: pl_etrf2000_2le_textChanged(self))
+        self.pl_etrf2000_2le.sigPasteLines.connect(lambda text: pl_etrf2000_2le_sigPasteLines(self,text))
         self.label=QLabel(widget)
         self.label.setFixedHeight(2*self.label.sizeHint().height()+10) 
         self.label.setWordWrap(True)
-        layout.addWidget(pl_etrf2000_grBox)
+        layout.addWidget(self.pl_etrf2000_grBox)
         layout.addWidget(self.pl_2000_grBox)
         layout.addWidget(self.label)
         layout.addStretch()
-        self.nr_strefy_cmbBox.setCurrentText(self.settings.value('nr_strefy_cmbBox'))
+        nr_strefy=self.settings.value('nr_strefy_cmbBox')
+        if nr_strefy!=STREFA_WG_GRANIC or granice_powiatow_dostepne():
+            self.nr_strefy_cmbBox.setCurrentText(nr_strefy)
         self.powiat_cmbBox.setCurrentText(self.settings.value('powiat_cmbBox'))
         self.pl_etrf2000_2le.le1.sigKey_T.connect(lambda: pl_etrf2000_2le_toggle_format(self))
         self.pl_etrf2000_2le.le2.sigKey_T.connect(lambda: pl_etrf2000_2le_toggle_format(self))
+        self.odwrotnie_chkbox.setChecked(self.settings.value('odwrotnie_chkbox',False,bool))
         return widget
     
+    def tabPlik(self):
+        
+        def plik_we_pshbtn_clicked(self):
+            sciezka,_=QFileDialog.getOpenFileName(self,"Plik ze współrzędnymi PL-ETRF2000",self.plik_we_le.text(),
+                                                  "Pliki tekstowe (*.txt *.csv);;Wszystkie pliki (*)")
+            if sciezka:
+                self.plik_we_le.setText(sciezka)
+                if not self.plik_wy_le.text():
+                    nazwa,rozszerzenie=os.path.splitext(sciezka)
+                    uklad="_PL-ETRF2000" if self.odwrotnie_chkbox.isChecked() else "_PL-2000"
+                    self.plik_wy_le.setText(nazwa+uklad+rozszerzenie)
+        
+        def plik_wy_pshbtn_clicked(self):
+            sciezka,_=QFileDialog.getSaveFileName(self,"Plik ze współrzędnymi PL-2000",self.plik_wy_le.text(),
+                                                  "Pliki tekstowe (*.txt *.csv);;GeoPackage (*.gpkg);;"
+                                                  "Shapefile (*.shp);;Wszystkie pliki (*)")
+            if sciezka:
+                self.plik_wy_le.setText(sciezka)
+        
+        def zadanie_przeliczono(self,zadanie,wiersze,czas):
+            if not self.plik_zadania or zadanie is not self.plik_zadania[-1]:
+                return
+            self.plik_progressBar.setValue(int(zadanie.progress()))
+            if czas>0:
+                self.plik_label.setText(f"Przeliczono {wiersze:.0f} wierszy ({wiersze/czas:.0f} wierszy/s)")
+        
+        def zadanie_zakonczono(self,zadanie,result):
+            if zadanie in self.plik_zadania:
+                self.plik_zadania.remove(zadanie)
+            self.przerwij_pshbtn.setEnabled(bool(self.plik_zadania))
+            nazwa=os.path.basename(zadanie.sciezka_we)
+            if zadanie.blad:
+                self.plik_label.setText(f"{nazwa}: {zadanie.opis_bledu()}")
+                return
+            if zadanie.wynik is None:
+                self.plik_label.setText(f"{nazwa}: konwersja nie powiodła się")
+                return
+            wiersze,bledne,pierwszy_bledny=zadanie.wynik
+            czas=zadanie.czas()
+            text=f"{nazwa}: przeliczono {wiersze} wierszy w {czas:.1f} s ({wiersze/max(czas,1e-9):.0f} wierszy/s)."
+            if bledne:
+                text+=f" Pominięto {bledne} błędnych wierszy, pierwszy w linii {pierwszy_bledny}."
+            if zadanie.isCanceled():
+                text+=" Przerwano."
+            if not self.plik_zadania:
+                self.plik_progressBar.setValue(100)
+            self.plik_label.setText(text)
+            if konwerter.diagnostyka_wlaczona():
+                QgsMessageLog.logMessage(f"{text}\n{konwerter.statystyki_tekst()}",
+                                         "Konwerter PL-ETRF2000 PL-2000",Qgis.Info)
+        
+        def synchronizacja_chkbox_stateChanged(self):
+            self.settings.setValue('synchronizacja_chkbox',self.synchronizacja_chkbox.isChecked())
+        
+        def podzial_stref_chkbox_stateChanged(self):
+            self.settings.setValue('podzial_stref_chkbox',self.podzial_stref_chkbox.isChecked())
+        
+        def przerwij_pshbtn_clicked(self):
+            for zadanie in self.plik_zadania:
+                zadanie.cancel()
+        
+        def konwertuj_pshbtn_clicked(self):
+            sciezka_we=self.plik_we_le.text()
+            sciezka_wy=self.plik_wy_le.text()
+            if not os.path.isfile(sciezka_we):
+                self.plik_label.setText("Nie wybrano pliku wejściowego")
+                return
+            if not sciezka_wy:
+                self.plik_label.setText("Nie wybrano pliku wynikowego")
+                return
+            if os.path.abspath(sciezka_we)==os.path.abspath(sciezka_wy):
+                self.plik_label.setText("Plik wynikowy musi być inny niż plik wejściowy")
+                return
+            for zadanie in self.plik_zadania:
+                if os.path.abspath(sciezka_wy) in (os.path.abspath(zadanie.sciezka_we),
+                                                   os.path.abspath(zadanie.sciezka_wy)):
+                    self.plik_label.setText("Plik wynikowy jest używany przez trwającą konwersję")
+                    return
+            odwrotnie=self.odwrotnie_chkbox.isChecked()
+            if not self.kod_strefy and not odwrotnie:
+                self.plik_label.setText("Nie wybrano numeru strefy PL-2000")
+                return
+            if eksport.plik_wektorowy(sciezka_wy) and (odwrotnie or konwerter.plik_binarny(sciezka_we)):
+                self.plik_label.setText("Do pliku .gpkg albo .shp można zapisać tylko wynik konwersji "
+                                        "pliku tekstowego do PL-2000")
+                return
+            if odwrotnie:
+                kod_strefy=self.kod_strefy if self.kod_strefy in konwerter.KODY_STREF.values() else None
+            else:
+                kod_strefy=self.kod_strefy
+            zadanie=ZadanieKonwersjiPliku(sciezka_we,sciezka_wy,kod_strefy,
+                                          self.pl_etrf2000_2le.separator,self.locale.decimalPoint(),
+                                          self.pl_etrf2000_2le.reverse_order,self.pl_2000_2le.reverse_order,
+                                          odwrotnie,self.pl_etrf2000_2le.format,
+                                          self.podzial_stref_chkbox.isChecked() and not odwrotnie,
+                                          None if odwrotnie else self.uklad_zrodlowy)
+            zadanie.przeliczono.connect(lambda wiersze,czas: zadanie_przeliczono(self,zadanie,wiersze,czas))
+            zadanie.zakonczono.connect(lambda result: zadanie_zakonczono(self,zadanie,result))
+            self.plik_zadania.append(zadanie)
+            self.plik_progressBar.setValue(0)
+            self.przerwij_pshbtn.setEnabled(True)
+            self.plik_label.setText(f"{os.path.basename(sciezka_we)}: konwersja w tle")
+            QgsApplication.taskManager().addTask(zadanie)
+        
+        def synchronizacja_zakonczono(self,zadanie,result):
+            if zadanie in self.warstwa_zadania:
+                self.warstwa_zadania.remove(zadanie)
+            synchronizacja=zadanie.synchronizacja
+            nazwa=synchronizacja.warstwa.name()
+            if zadanie.blad:
+                self.plik_label.setText(f"{nazwa}: {zadanie.opis_bledu()}")
+                return
+            if not result:
+                self.plik_label.setText(f"{nazwa}: konwersja nie powiodła się")
+                return
+            self.zakoncz_synchronizacje(synchronizacja.warstwa.id())
+            self.synchronizacje[synchronizacja.warstwa.id()]=synchronizacja
+            synchronizacja.warstwa.willBeDeleted.connect(
+                lambda: self.zakoncz_synchronizacje(synchronizacja.warstwa.id(),synchronizacja))
+            synchronizacja.zaktualizowano.connect(
+                lambda przeliczone,usuniete: synchronizacja_zaktualizowano(self,synchronizacja,przeliczone,usuniete))
+            dodaj_warstwy_synchronizacji(self,synchronizacja)
+            synchronizacja.polacz()
+            czas=zadanie.czas()
+            self.plik_label.setText(f"{nazwa}: przeliczono {zadanie.wynik} obiektów w {czas:.1f} s, "
+                                    "zmiany warstwy będą przeliczane po zapisaniu edycji")
+        
+        def dodaj_warstwy_synchronizacji(self,synchronizacja):
+            for wynik in synchronizacja.warstwy_wynikowe():
+                if QgsProject.instance().mapLayer(wynik.id()) is None:
+                    QgsProject.instance().addMapLayer(wynik)
+                    wynik.willBeDeleted.connect(
+                        lambda: self.zakoncz_synchronizacje(synchronizacja.warstwa.id(),synchronizacja))
+        
+        def synchronizacja_zaktualizowano(self,synchronizacja,przeliczone,usuniete):
+            dodaj_warstwy_synchronizacji(self,synchronizacja)
+            self.plik_label.setText(f"{synchronizacja.warstwa.name()}: przeliczono {przeliczone} "
+                                    f"zmienionych obiektów, usunięto {usuniete} obiektów")
+        
+        def warstwa_pshbtn_clicked(self):
+            warstwa=self.warstwa_cmbBox.currentLayer()
+            if warstwa is None:
+                self.plik_label.setText("Nie wybrano warstwy")
+                return
+            if not self.kod_strefy:
+                self.plik_label.setText("Nie wybrano numeru strefy PL-2000")
+                return
+            if self.synchronizacja_chkbox.isChecked():
+                synchronizacja=self.synchronizacje.get(warstwa.id())
+                if synchronizacja is not None and synchronizacja.strefa==self.kod_strefy:
+                    synchronizacja.synchronizuj()
+                    self.plik_label.setText(f"{warstwa.name()}: warstwy wynikowe są aktualne")
+                    return
+                synchronizacja=SynchronizacjaWarstwy(warstwa,self.kod_strefy,
+                                                     QgsProject.instance().transformContext())
+                zadanie=ZadanieSynchronizacji(synchronizacja)
+                zadanie.zakonczono.connect(lambda result: synchronizacja_zakonczono(self,zadanie,result))
+                self.warstwa_zadania.append(zadanie)
+                self.plik_label.setText(f"{warstwa.name()}: konwersja warstwy w tle")
+                QgsApplication.taskManager().addTask(zadanie)
+                return
+            zadanie=zadanie_konwersji_warstwy(warstwa,self.kod_strefy)
+            zadanie.executed.connect(lambda successful,results: self.plik_label.setText(
+                f"{warstwa.name()}: " + ("przeliczono warstwę" if successful else "konwersja nie powiodła się")))
+            self.plik_label.setText(f"{warstwa.name()}: konwersja warstwy w tle")
+            QgsApplication.taskManager().addTask(zadanie)
+        
+        widget=QWidget(self)
+        layout=QVBoxLayout(widget)
+        widget.setLayout(layout)
+        self.plik_zadania=[]
+        self.warstwa_zadania=[]
+        self.synchronizacje={}
+        layout1=QGridLayout()
+        plik_we_lab=QLabel("PL-ETRF2000",widget)
+        self.plik_we_le=QLineEdit(widget)
+        plik_we_pshbtn=QPushButton("…",widget)
+        plik_we_pshbtn.setFixedWidth(plik_we_pshbtn.sizeHint().height())
+        plik_we_pshbtn.clicked.connect(lambda: plik_we_pshbtn_clicked(self))
+        plik_wy_lab=QLabel("PL-2000",widget)
+        self.plik_wy_le=QLineEdit(widget)
+        plik_wy_pshbtn=QPushButton("…",widget)
+        plik_wy_pshbtn.setFixedWidth(plik_wy_pshbtn.sizeHint().height())
+        plik_wy_pshbtn.clicked.connect(lambda: plik_wy_pshbtn_clicked(self))
+        layout1.addWidget(plik_we_lab,0,0)
+        layout1.addWidget(self.plik_we_le,0,1)
+        layout1.addWidget(plik_we_pshbtn,0,2)
+        layout1.addWidget(plik_wy_lab,1,0)
+        layout1.addWidget(self.plik_wy_le,1,1)
+        layout1.addWidget(plik_wy_pshbtn,1,2)
+        self.konwertuj_pshbtn=QPushButton("Konwertuj",widget)
+        self.konwertuj_pshbtn.clicked.connect(lambda: konwertuj_pshbtn_clicked(self))
+        self.przerwij_pshbtn=QPushButton("Przerwij",widget)
+        self.przerwij_pshbtn.setEnabled(False)
+        self.przerwij_pshbtn.clicked.connect(lambda: przerwij_pshbtn_clicked(self))
+        self.podzial_stref_chkbox=QCheckBox("Osobny plik dla każdej strefy",widget)
+        self.podzial_stref_chkbox.setToolTip("Wiersze punktów z różnych stref zapisywane są do plików nazwa_strefa_N")
+        self.podzial_stref_chkbox.setChecked(self.settings.value('podzial_stref_chkbox',False,bool))
+        self.podzial_stref_chkbox.stateChanged.connect(lambda: podzial_stref_chkbox_stateChanged(self))
+        layout2=QHBoxLayout()
+        layout2.addWidget(self.podzial_stref_chkbox)
+        layout2.addStretch()
+        layout2.addWidget(self.konwertuj_pshbtn)
+        layout2.addWidget(self.przerwij_pshbtn)
+        warstwa_lab=QLabel("Warstwa",widget)
+        self.warstwa_cmbBox=QgsMapLayerComboBox(widget)
+        self.warstwa_cmbBox.setFilters(QgsMapLayerProxyModel.PointLayer)
+        self.warstwa_pshbtn=QPushButton("Konwertuj warstwę",widget)
+        self.warstwa_pshbtn.setToolTip("Konwersja warstwy punktowej do warstw tymczasowych stref PL-2000")
+        self.warstwa_pshbtn.clicked.connect(lambda: warstwa_pshbtn_clicked(self))
+        self.synchronizacja_chkbox=QCheckBox("Aktualizuj po edycji",widget)
+        self.synchronizacja_chkbox.setToolTip("Po zapisaniu edycji warstwy przeliczane są tylko "
+                                              "dodane i zmienione obiekty")
+        self.synchronizacja_chkbox.setChecked(self.settings.value('synchronizacja_chkbox',False,bool))
+        self.synchronizacja_chkbox.stateChanged.connect(lambda: synchronizacja_chkbox_stateChanged(self))
+        layout3=QHBoxLayout()
+        layout3.addWidget(warstwa_lab)
+        layout3.addWidget(self.warstwa_cmbBox,1)
+        layout3.addWidget(self.warstwa_pshbtn)
+        layout4=QHBoxLayout()
+        layout4.addStretch()
+        layout4.addWidget(self.synchronizacja_chkbox)
+        self.plik_progressBar=QProgressBar(widget)
+        self.plik_progressBar.setRange(0,100)
+        self.plik_label=QLabel(widget)
+        self.plik_label.setWordWrap(True)
+        layout.addLayout(layout1)
+        layout.addLayout(layout2)
+        layout.addWidget(self.plik_progressBar)
+        layout.addWidget(self.plik_label)
+        layout.addLayout(layout3)
+        layout.addLayout(layout4)
+        layout.addStretch()
+        return widget
+    
+    def tabHistoria(self):
+        
+        def historia_szukaj(self):
+            try:
+                wpisy=self.historia.szukaj(self.historia_le.text())
+                liczba=self.historia.liczba()
+            except sqlite3.Error as e:
+                self.historia_label.setText(f"Błąd historii: {e}")
+                return
+            self.historia_wpisy=wpisy
+            self.historia_tbl.setRowCount(len(wpisy))
+            for i,wpis in enumerate(wpisy):
+                czas=time.strftime("%Y-%m-%d %H:%M:%S",time.localtime(wpis.czas))
+                kierunek="←" if wpis.odwrotnie else "→"
+                uklad=""
+                if wpis.uklad:
+                    uklad=wpis.uklad.kod+(f" {wpis.uklad.epoka:g}" if wpis.uklad.epoka is not None else "")
+                pola=[czas,uklad,wpis.b_text,wpis.l_text,kierunek,wpis.strefa,wpis.x_text,wpis.y_text]
+                for j,pole in enumerate(pola):
+                    self.historia_tbl.setItem(i,j,QTableWidgetItem(pole))
+            self.historia_tbl.resizeColumnsToContents()
+            self.historia_label.setText(f"Wyświetlono {len(wpisy)} z {liczba} wpisów")
+        
+        def historia_tbl_cellDoubleClicked(self,row):
+            self.przywroc_z_historii(self.historia_wpisy[row])
+        
+        widget=QWidget(self)
+        layout=QVBoxLayout(widget)
+        widget.setLayout(layout)
+        self.historia_wpisy=[]
+        self.historia_le=QLineEdit(widget)
+        self.historia_le.setPlaceholderText("współrzędna φ, λ, x, y albo data RRRR-MM-DD")
+        self.historia_le.setClearButtonEnabled(True)
+        self.historia_timer=QTimer(widget)
+        self.historia_timer.setSingleShot(True)
+        self.historia_timer.setInterval(200)
+        self.historia_timer.timeout.connect(lambda: historia_szukaj(self))
+        self.historia_le.textChanged.connect(self.historia_timer.start)
+        self.historia_tbl=QTableWidget(0,8,widget)
+        self.historia_tbl.setHorizontalHeaderLabels(["Czas","Układ φ λ","φ","λ","","Strefa","x","y"])
+        self.historia_tbl.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.historia_tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.historia_tbl.verticalHeader().hide()
+        self.historia_tbl.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.historia_tbl.setToolTip("Dwukrotne kliknięcie wpisuje punkt w zakładce Konwerter")
+        self.historia_tbl.cellDoubleClicked.connect(lambda row,column: historia_tbl_cellDoubleClicked(self,row))
+        self.historia_label=QLabel(widget)
+        self.historia_szukaj=lambda: historia_szukaj(self)
+        szukaj_lab=QLabel("Szukaj",widget)
+        layout1=QHBoxLayout()
+        layout1.addWidget(szukaj_lab)
+        layout1.addWidget(self.historia_le)
+        layout.addLayout(layout1)
+        layout.addWidget(self.historia_tbl)
+        layout.addWidget(self.historia_label)
+        return widget
+    
+    def tabs_currentChanged(self):
+        if self.tabs.currentWidget() is self.tabHistoria:
+            self.historia_szukaj()
+    
+    def dodaj_do_historii(self,*wpis,**opcje):
+        # Zapis konwersji punktu w historii, wywoływany po przeliczeniu, a nie przy każdym znaku.
+        # Ponowne przeliczenie tego samego punktu (np. po zmianie fokusu) nie dodaje wpisu.
+        if (wpis,opcje)==self.historia_ostatni:
+            return
+        try:
+            self.historia.dodaj(*wpis,**opcje)
+            self.historia_ostatni=(wpis,opcje)
+        except sqlite3.Error as e:
+            QgsMessageLog.logMessage(f"Nie można zapisać historii konwersji: {e}",
+                                     "Konwerter PL-ETRF2000 PL-2000",Qgis.Warning)
+    
+    def sciezka_historii(self):
+        # Historia zapisywana jest w katalogu profilu QGIS, bo katalog wtyczki jest zastępowany przy aktualizacji.
+        # Baza z katalogu wtyczki (wcześniejsze wersje) przenoszona jest przy pierwszym uruchomieniu.
+        katalog=os.path.join(QgsApplication.qgisSettingsDirPath(),"konwerterPLETRF2000PL2000")
+        sciezka=os.path.join(katalog,"historia.sqlite")
+        stara=os.path.join(self.plugin_dir,"historia.sqlite")
+        try:
+            os.makedirs(katalog,exist_ok=True)
+            if os.path.exists(stara) and not os.path.exists(sciezka):
+                for koncowka in ("-wal","-shm",""):
+                    if os.path.exists(stara+koncowka):
+                        os.replace(stara+koncowka,sciezka+koncowka)
+        except OSError as e:
+            QgsMessageLog.logMessage(f"Nie można przenieść historii konwersji: {e}",
+                                     "Konwerter PL-ETRF2000 PL-2000",Qgis.Warning)
+        return sciezka
+    
+    def przywroc_z_historii(self,wpis):
+        # Wpis historii wpisywany jest do pól zakładki Konwerter i przeliczany w bieżącej strefie,
+        # φ λ w układzie źródłowym wpisu (z epoką i siatką poprawek), bez zmiany ustawionego układu źródłowego
+        self.tabs.setCurrentWidget(self.tabKonwerter)
+        self.odwrotnie_chkbox.setChecked(bool(wpis.odwrotnie))
+        decimal_point=self.locale.decimalPoint()
+        tekst=lambda t: t.replace(",",".").replace(".",decimal_point)
+        le=self.pl_etrf2000_2le
+        if wpis.format!=le.format:
+            le.clear()
+            if wpis.format=="dms":
+                le.toggle_to_dms()
+            else:
+                le.toggle_to_deg()
+            self.pl_etrf2000_format()
+        if wpis.odwrotnie:
+            self.pl_2000_2le.setText(tekst(wpis.x_text),tekst(wpis.y_text))
+            self.pl_2000_przelicz()
+        else:
+            le.setText(tekst(wpis.b_text),tekst(wpis.l_text))
+            self.pl_etrf2000_przelicz(wpis.uklad is not None,wpis.uklad)
+    
     def tabUstawienia(self):
         
         def decimal_point_cmbbox_currentTextChanged(self):
@@ -1117,6 +1601,16 @@ class MyDockWidget(QDockWidget):
             self.coordinates_separator_cmbbox.setCurrentText(self.settings.value('copy_paste_coordinates_separator_cmbbox'))
             self.order_lb_chkbox.setChecked(self.settings.value('copy_paste_order_lb_chkbox',False,bool))
             self.order_yx_chkbox.setChecked(self.settings.value('copy_paste_order_yx_chkbox',False,bool))
+            self.diagnostyka_chkbox.setChecked(self.settings.value('diagnostyka_chkbox',False,bool))
+            # Zmiana pól układu źródłowego zapisuje wszystkie pola, więc ustawienia odczytywane są najpierw
+            uklad=(self.settings.value('uklad_zrodlowy_crs',KOD_PL_ETRF2000),
+                   self.settings.value('uklad_zrodlowy_epoka_le',""),self.settings.value('uklad_zrodlowy_siatka_le',""),
+                   self.settings.value('uklad_zrodlowy_chkbox',False,bool))
+            self.epoka_le.setText(uklad[1])
+            self.siatka_le.setText(uklad[2])
+            self.uklad_zrodlowy_chkbox.setChecked(uklad[3])
+            self.uklad_zrodlowy_crs.setCrs(QgsCoordinateReferenceSystem(uklad[0]))
+            self.uklad_zrodlowy_zmieniony()
         
         def copy_paste_grBox(self,parent):
             
@@ -1177,6 +1671,179 @@ class MyDockWidget(QDockWidget):
             layout.addLayout(layout2)
             
             return copy_paste_grBox
+        
+        def uklad_zrodlowy_grBox(self,parent):
+            # Układ φ λ wpisywanych, wklejanych i przeliczanych w plikach punktów, przeliczany najpierw
+            # do PL-ETRF2000 transformacją z epoką i poprawkami z siatki (konwerter.do_pl_etrf2000)
+            
+            def uklad_zrodlowy_zmieniony(self):
+                wlaczony=self.uklad_zrodlowy_chkbox.isChecked()
+                self.settings.setValue('uklad_zrodlowy_chkbox',wlaczony)
+                self.settings.setValue('uklad_zrodlowy_crs',self.uklad_zrodlowy_crs.crs().authid())
+                self.settings.setValue('uklad_zrodlowy_epoka_le',self.epoka_le.text())
+                self.settings.setValue('uklad_zrodlowy_siatka_le',self.siatka_le.text())
+                for w in (self.uklad_zrodlowy_crs,self.epoka_le,self.siatka_le,self.siatka_pshbtn):
+                    w.setEnabled(wlaczony)
+                self.uklad_zrodlowy=None
+                self.uklad_zrodlowy_komunikat_lab.clear()
+                self.pl_etrf2000_grBox.setTitle("PL-ETRF2000 (EPSG:9702)")
+                if not wlaczony:
+                    return
+                kod=self.uklad_zrodlowy_crs.crs().authid()
+                if not kod:
+                    self.uklad_zrodlowy_komunikat_lab.setText("Nie wybrano układu źródłowego")
+                    return
+                epoka=None
+                if self.epoka_le.text():
+                    try:
+                        epoka=float(self.epoka_le.text().replace(",","."))
+                    except ValueError:
+                        self.uklad_zrodlowy_komunikat_lab.setText("Epoka musi być rokiem dziesiętnym, np. 2024.5")
+                        return
+                siatka=self.siatka_le.text() or None
+                if siatka:
+                    try:
+                        konwerter.wczytaj_siatke(siatka)
+                    except (OSError,ValueError) as e:
+                        self.uklad_zrodlowy_komunikat_lab.setText(f"Błędna siatka poprawek: {e}")
+                        return
+                self.uklad_zrodlowy=konwerter.UkladZrodlowy(kod,epoka,siatka)
+                title=kod
+                if epoka is not None:
+                    title+=f" epoka {epoka:g}"
+                if siatka:
+                    title+=" + siatka"
+                self.pl_etrf2000_grBox.setTitle(title+" → PL-ETRF2000")
+            
+            def siatka_pshbtn_clicked(self):
+                sciezka,_=QFileDialog.getOpenFileName(self,"Siatka poprawek",self.siatka_le.text(),
+                                                      "Siatka poprawek (*.npz *.txt *.csv);;Wszystkie pliki (*)")
+                if sciezka:
+                    self.siatka_le.setText(sciezka)
+                    uklad_zrodlowy_zmieniony(self)
+            
+            layout = QVBoxLayout()
+            layout.setAlignment(Qt.AlignTop)
+            uklad_zrodlowy_grBox=QGroupBox("Układ źródłowy φ λ",parent)
+            uklad_zrodlowy_grBox.setStyleSheet("font-weight: normal;")
+            uklad_zrodlowy_grBox.setFocusPolicy(Qt.NoFocus)
+            uklad_zrodlowy_grBox.setLayout(layout)
+            
+            przeliczenie_lab=QLabel("Przeliczenie do PL-ETRF2000",widget)
+            self.uklad_zrodlowy_chkbox=QCheckBox(widget)
+            self.uklad_zrodlowy_chkbox.setToolTip("Wpisane, wklejane i przeliczane w plikach φ λ są w układzie "
+                                                  "źródłowym, np. ITRF2014 w epoce pomiaru")
+            self.uklad_zrodlowy_chkbox.stateChanged.connect(lambda: uklad_zrodlowy_zmieniony(self))
+            self.uklad_zrodlowy_crs=QgsProjectionSelectionWidget(widget)
+            self.uklad_zrodlowy_crs.crsChanged.connect(lambda: uklad_zrodlowy_zmieniony(self))
+            
+            epoka_lab=QLabel("Epoka",widget)
+            self.epoka_le=QLineEdit(widget)
+            self.epoka_le.setPlaceholderText("np. 2024.5")
+            self.epoka_le.setToolTip("Epoka współrzędnych układu dynamicznego jako rok dziesiętny")
+            self.epoka_le.editingFinished.connect(lambda: uklad_zrodlowy_zmieniony(self))
+            
+            siatka_lab=QLabel("Siatka poprawek",widget)
+            self.siatka_le=QLineEdit(widget)
+            self.siatka_le.setToolTip("Plik .npz albo tekstowy z wierszami φ λ dφ dλ, poprawki w sekundach")
+            self.siatka_le.editingFinished.connect(lambda: uklad_zrodlowy_zmieniony(self))
+            self.siatka_pshbtn=QPushButton("…",widget)
+            self.siatka_pshbtn.setFixedWidth(self.siatka_pshbtn.sizeHint().height())
+            self.siatka_pshbtn.clicked.connect(lambda: siatka_pshbtn_clicked(self))
+            
+            self.uklad_zrodlowy_komunikat_lab=QLabel(widget)
+            self.uklad_zrodlowy_komunikat_lab.setWordWrap(True)
+            
+            layout1=QHBoxLayout()
+            layout1.addWidget(przeliczenie_lab)
+            layout1.addWidget(self.uklad_zrodlowy_chkbox,0,Qt.AlignLeft)
+            layout2=QHBoxLayout()
+            layout2.addWidget(epoka_lab)
+            layout2.addWidget(self.epoka_le)
+            layout3=QHBoxLayout()
+            layout3.addWidget(siatka_lab)
+            layout3.addWidget(self.siatka_le)
+            layout3.addWidget(self.siatka_pshbtn)
+            layout.addLayout(layout1)
+            layout.addWidget(self.uklad_zrodlowy_crs)
+            layout.addLayout(layout2)
+            layout.addLayout(layout3)
+            layout.addWidget(self.uklad_zrodlowy_komunikat_lab)
+            
+            self.uklad_zrodlowy_zmieniony=lambda: uklad_zrodlowy_zmieniony(self)
+            return uklad_zrodlowy_grBox
+        
+        def diagnostyka_grBox(self,parent):
+            # Czasy etapów przeliczeń mierzone w konwerter.pomiar
+            
+            def diagnostyka_chkbox_stateChanged(self):
+                konwerter.wlacz_diagnostyke(self.diagnostyka_chkbox.isChecked())
+                self.settings.setValue('diagnostyka_chkbox',self.diagnostyka_chkbox.isChecked())
+                odswiez_pshbtn_clicked(self)
+            
+            def odswiez_pshbtn_clicked(self):
+                self.diagnostyka_pte.setPlainText(konwerter.statystyki_tekst())
+            
+            def wyczysc_pshbtn_clicked(self):
+                konwerter.wyczysc_statystyki()
+                odswiez_pshbtn_clicked(self)
+            
+            def dziennik_pshbtn_clicked(self):
+                odswiez_pshbtn_clicked(self)
+                QgsMessageLog.logMessage(konwerter.statystyki_tekst(),"Konwerter PL-ETRF2000 PL-2000",Qgis.Info)
+            
+            def json_pshbtn_clicked(self):
+                sciezka,_=QFileDialog.getSaveFileName(self,"Zapis statystyk","diagnostyka_konwertera.json",
+                                                      "JSON (*.json)")
+                if not sciezka:
+                    return
+                try:
+                    konwerter.zapisz_statystyki(sciezka)
+                except OSError as e:
+                    QMessageBox.warning(self,"Uwaga",f"Nie można zapisać pliku {sciezka}: {e}")
+            
+            layout = QVBoxLayout()
+            layout.setAlignment(Qt.AlignTop)
+            diagnostyka_grBox=QGroupBox("Diagnostyka",parent)
+            diagnostyka_grBox.setStyleSheet("font-weight: normal;")
+            diagnostyka_grBox.setFocusPolicy(Qt.NoFocus)
+            diagnostyka_grBox.setLayout(layout)
+            
+            diagnostyka_lab=QLabel("Pomiar czasu przeliczeń",widget)
+            self.diagnostyka_chkbox=QCheckBox(widget)
+            self.diagnostyka_chkbox.stateChanged.connect(lambda: diagnostyka_chkbox_stateChanged(self))
+            
+            self.diagnostyka_pte=QPlainTextEdit(widget)
+            self.diagnostyka_pte.setReadOnly(True)
+            self.diagnostyka_pte.setLineWrapMode(QPlainTextEdit.NoWrap)
+            self.diagnostyka_pte.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+            self.diagnostyka_pte.setMaximumHeight(QFontMetrics(self.diagnostyka_pte.font()).lineSpacing()*9)
+            
+            odswiez_pshbtn=QPushButton("Odśwież",widget)
+            odswiez_pshbtn.clicked.connect(lambda: odswiez_pshbtn_clicked(self))
+            wyczysc_pshbtn=QPushButton("Wyczyść",widget)
+            wyczysc_pshbtn.clicked.connect(lambda: wyczysc_pshbtn_clicked(self))
+            dziennik_pshbtn=QPushButton("Do dziennika",widget)
+            dziennik_pshbtn.setToolTip("Zapis statystyk w dzienniku komunikatów QGIS")
+            dziennik_pshbtn.clicked.connect(lambda: dziennik_pshbtn_clicked(self))
+            json_pshbtn=QPushButton("JSON…",widget)
+            json_pshbtn.setToolTip("Eksport statystyk do pliku JSON")
+            json_pshbtn.clicked.connect(lambda: json_pshbtn_clicked(self))
+            
+            layout1=QHBoxLayout()
+            layout1.addWidget(diagnostyka_lab)
+            layout1.addWidget(self.diagnostyka_chkbox,0,Qt.AlignLeft)
+            layout2=QHBoxLayout()
+            layout2.addWidget(odswiez_pshbtn)
+            layout2.addWidget(wyczysc_pshbtn)
+            layout2.addWidget(dziennik_pshbtn)
+            layout2.addWidget(json_pshbtn)
+            layout.addLayout(layout1)
+            layout.addWidget(self.diagnostyka_pte)
+            layout.addLayout(layout2)
+            
+            odswiez_pshbtn_clicked(self)
+            return diagnostyka_grBox
             
         def strefa_wg_powiatu_chkbox_stateChanged(self):
             if self.strefa_wg_powiatu_chkbox.isChecked():
@@ -1204,6 +1871,8 @@ class MyDockWidget(QDockWidget):
         self.decimal_point_cmbbox.setFixedSize(self.decimal_point_cmbbox.sizeHint())
         self.decimal_point_cmbbox.currentTextChanged.connect(lambda: decimal_point_cmbbox_currentTextChanged(self))
         self.copy_paste_grBox=copy_paste_grBox(self,widget)
+        self.uklad_zrodlowy_grBox=uklad_zrodlowy_grBox(self,widget)
+        self.diagnostyka_grBox=diagnostyka_grBox(self,widget)
         default_settings_pshbtn=QPushButton("Przywróć",widget)
         default_settings_pshbtn.clicked.connect(lambda: restore_default_settings(self))
         default_settings_pshbtn.setFixedSize(default_settings_pshbtn.sizeHint())
@@ -1224,6 +1893,8 @@ class MyDockWidget(QDockWidget):
         layout.addLayout(layout1)
         layout.addLayout(layout2)
         layout.addWidget(self.copy_paste_grBox)
+        layout.addWidget(self.uklad_zrodlowy_grBox)
+        layout.addWidget(self.diagnostyka_grBox)
         layout.addStretch()
         layout.addLayout(layout4)
         layout.addStretch()
@@ -1232,15 +1903,16 @@ class MyDockWidget(QDockWidget):
     def nr_strefy_cmbBox_currentTextChanged(self):
         if self.nr_strefy_cmbBox.currentText()=="-":
             self.kod_strefy=""
-        elif self.nr_strefy_cmbBox.currentText()=="5":
-            self.kod_strefy="EPSG:2176"
-        elif self.nr_strefy_cmbBox.currentText()=="6":
-            self.kod_strefy="EPSG:2177"
-        elif self.nr_strefy_cmbBox.currentText()=="7":
-            self.kod_strefy="EPSG:2178"
-        elif self.nr_strefy_cmbBox.currentText()=="8":
-            self.kod_strefy="EPSG:2179"
-        self.pl_2000_grBox.setTitle("PL-2000 ("+self.kod_strefy+")")
+            self.pl_2000_grBox.setTitle("PL-2000 ()")
+        elif self.nr_strefy_cmbBox.currentText()==STREFA_WG_DLUGOSCI:
+            self.kod_strefy=konwerter.STREFA_AUTO
+            self.pl_2000_grBox.setTitle("PL-2000 ("+STREFA_WG_DLUGOSCI+")")
+        elif self.nr_strefy_cmbBox.currentText()==STREFA_WG_GRANIC:
+            self.kod_strefy=konwerter.STREFA_POWIATY if granice_powiatow_dostepne() else ""
+            self.pl_2000_grBox.setTitle("PL-2000 ("+STREFA_WG_GRANIC+")")
+        else:
+            self.kod_strefy=konwerter.kod_strefy(self.nr_strefy_cmbBox.currentText())
+            self.pl_2000_grBox.setTitle("PL-2000 ("+self.kod_strefy+")")
         self.label.setText("")
         self.pl_2000_2le.clear()
         self.pl_etrf2000_2le.clear()
@@ -1250,23 +1922,46 @@ class MyDockWidget(QDockWidget):
         if self.powiat_cmbBox.currentText()=="-":
             self.kod_strefy=""
         else:
-            nr_strefy=self.d[self.powiat_cmbBox.currentText()]
-            if nr_strefy=="5":
-                self.kod_strefy="EPSG:2176"
-            elif nr_strefy=="6":
-                self.kod_strefy="EPSG:2177"
-            elif nr_strefy=="7":
-                self.kod_strefy="EPSG:2178"
-            elif nr_strefy=="8":
-                self.kod_strefy="EPSG:2179"
+            self.kod_strefy=konwerter.kod_strefy(self.d[self.powiat_cmbBox.currentText()])
         self.pl_2000_grBox.setTitle("PL-2000 ("+self.kod_strefy+")")
         self.label.setText("")
         self.pl_2000_2le.clear()
         self.pl_etrf2000_2le.clear()
         self.settings.setValue('powiat_cmbBox',self.powiat_cmbBox.currentText())
         
+    def przerwij_zadania(self):
+        if not self.zbudowany:
+            return
+        for zadanie in self.plik_zadania+self.schowek_zadania+self.warstwa_zadania:
+            zadanie.cancel()
+        for layer_id in list(self.synchronizacje):
+            self.zakoncz_synchronizacje(layer_id)
+    
+    def zakoncz_synchronizacje(self,layer_id,synchronizacja=None):
+        # Po usunięciu warstwy źródłowej albo wynikowej zmiany nie są dalej przeliczane.
+        # synchronizacja - kończona tylko, jeśli nie została zastąpiona nową synchronizacją warstwy,
+        # np. po ponownej konwersji w innej strefie, a wynikowe warstwy starej są usuwane
+        if synchronizacja is not None and self.synchronizacje.get(layer_id) is not synchronizacja:
+            return
+        synchronizacja=self.synchronizacje.pop(layer_id,None)
+        if synchronizacja is not None:
+            synchronizacja.rozlacz()
+    
+    def konwertuj_punkt_mapy(self,b,l):
+        # Punkt wskazany na mapie wpisywany jest z najmniejszą liczbą miejsc dziesiętnych formatu φ λ
+        # i przeliczany jako punkt PL-ETRF2000, bez układu źródłowego z ustawień
+        if self.odwrotnie_chkbox.isChecked():
+            self.odwrotnie_chkbox.setChecked(False)
+        self.tabs.setCurrentWidget(self.tabKonwerter)
+        le=self.pl_etrf2000_2le
+        if le.format=="dms":
+            le.setText(le.deg_b_to_dms_text(b,le.LOWER_DMS_DECI),le.deg_l_to_dms_text(l,le.LOWER_DMS_DECI))
+        else:
+            le.setText(le._locale.toString(b,'f',le.LOWER_DEG_DECI),le._locale.toString(l,'f',le.LOWER_DEG_DECI))
+        self.pl_etrf2000_przelicz(False)
+        
     def help(self):
-        if self.tabs.currentIndex()==0:
+        if self.tabs.currentWidget() is not self.tabOpcje:
             f="Pomoc_dla_konwertera.html"
         else:
             f="Pomoc_dla_ustawień.html"
@@ -1278,6 +1973,11 @@ class MyDockWidget(QDockWidget):
         self.settings.setValue('copy_paste_coordinates_separator_cmbbox',"spacja")
         self.settings.setValue('copy_paste_order_lb_chkbox',False)
         self.settings.setValue('copy_paste_order_yx_chkbox',False)
+        self.settings.setValue('diagnostyka_chkbox',False)
+        self.settings.setValue('uklad_zrodlowy_chkbox',False)
+        self.settings.setValue('uklad_zrodlowy_crs',KOD_PL_ETRF2000)
+        self.settings.setValue('uklad_zrodlowy_epoka_le',"")
+        self.settings.setValue('uklad_zrodlowy_siatka_le',"")
 
 class KonwerterPLETRF2000PL2000Plugin():
     def __init__(self, iface):
@@ -1285,15 +1985,56 @@ class KonwerterPLETRF2000PL2000Plugin():
         self.title='Konwerter PL-ETRF2000 PL-2000'
         self.plugin_dir = os.path.dirname(__file__)
         self.settings = QSettings(self.plugin_dir+"/konwerterPLETRF2000PL2000Plugin.ini",QSettings.IniFormat)
+        self.provider=None
+        self.mapTool=None
+    
+    def initProcessing(self):
+        self.provider=KonwerterProvider()
+        QgsApplication.processingRegistry().addProvider(self.provider)
     
     def initGui(self):
+        self.initProcessing()
         self.myDockWidget=MyDockWidget(self.title,
                                        self.iface.mainWindow(),
                                        Qt.SubWindow,
                                        self.settings,
                                        self.plugin_dir) 
         self.iface.mainWindow().addDockWidget(Qt.RightDockWidgetArea, self.myDockWidget)
+        self.mapToolAction=QAction(QIcon(os.path.join(self.plugin_dir,"icon.png")),
+                                   "Konwersja punktu z mapy",self.iface.mainWindow())
+        self.mapToolAction.setCheckable(True)
+        self.mapToolAction.setToolTip("Konwersja punktu z mapy: kliknięcie przelicza punkt, "
+                                      "ruch kursora pokazuje x y PL-2000 na pasku stanu")
+        self.mapToolAction.triggered.connect(self.mapToolAction_triggered)
+        self.iface.addToolBarIcon(self.mapToolAction)
+        self.iface.addPluginToMenu(self.title,self.mapToolAction)
+    
+    def mapToolAction_triggered(self,checked):
+        canvas=self.iface.mapCanvas()
+        if not checked:
+            if canvas.mapTool() is self.mapTool:
+                canvas.unsetMapTool(self.mapTool)
+            return
+        self.myDockWidget.show()
+        self.myDockWidget.raise_()
+        if self.mapTool is None:
+            self.mapTool=NarzedzieKonwersji(canvas,self.myDockWidget,self.iface)
+            self.mapTool.setAction(self.mapToolAction)
+        canvas.setMapTool(self.mapTool)
         
     def unload(self):
+        if self.mapTool:
+            if self.iface.mapCanvas().mapTool() is self.mapTool:
+                self.iface.mapCanvas().unsetMapTool(self.mapTool)
+            self.mapTool=None
+        self.iface.removePluginMenu(self.title,self.mapToolAction)
+        self.iface.removeToolBarIcon(self.mapToolAction)
+        self.mapToolAction=None
+        self.myDockWidget.przerwij_zadania()
+        if self.myDockWidget.zbudowany:
+            self.myDockWidget.historia.zamknij()
         self.iface.removeDockWidget(self.myDockWidget)
         self.myDockWidget=None
+        if self.provider:
+            QgsApplication.processingRegistry().removeProvider(self.provider)
+            self.provider=None
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# przygotuj_granice_powiatow.py  -  Builds Powiaty_w_strefach_PL-2000.gpkg from the PRG county boundaries
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Użycie w środowisku Pythona QGIS:
+#   python przygotuj_granice_powiatow.py A02_Granice_powiatow.shp [tolerancja_m]
+# Plik A02_Granice_powiatow.shp pochodzi z Państwowego Rejestru Granic (EPSG:2180).
+# Granice upraszczane są z tolerancją w metrach (domyślnie 1 m) i zapisywane w EPSG:9702
+# z atrybutami Województwo, Powiat i Nr strefy dopasowanymi do Powiaty_w_strefach_PL-2000.csv.
+
+import os, sys
+
+from qgis.core import \
+  QgsApplication, QgsVectorLayer, QgsVectorFileWriter, QgsFields, QgsField, QgsFeature, \
+  QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject, QgsWkbTypes
+
+from qgis.PyQt.QtCore import QVariant
+
+PLUGIN_DIR=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,PLUGIN_DIR)
+
+import konwerter
+
+WOJEWODZTWA={"02":"dolnośląskie","04":"kujawsko-pomorskie","06":"lubelskie","08":"lubuskie",
+             "10":"łódzkie","12":"małopolskie","14":"mazowieckie","16":"opolskie",
+             "18":"podkarpackie","20":"podlaskie","22":"pomorskie","24":"śląskie",
+             "26":"świętokrzyskie","28":"warmińsko-mazurskie","30":"wielkopolskie",
+             "32":"zachodniopomorskie"}
+
+def nazwa_powiatu(nazwa):
+    nazwa=" ".join(nazwa.lower().split())
+    for przedrostek in ("powiat ","m.st. ","m. "):
+        if nazwa.startswith(przedrostek):
+            nazwa=nazwa[len(przedrostek):]
+    return nazwa
+
+def main(argv):
+    if len(argv)<2:
+        print("Użycie: przygotuj_granice_powiatow.py A02_Granice_powiatow.shp [tolerancja_m]")
+        return 2
+    tolerancja=float(argv[2]) if len(argv)>2 else 1.0
+    aplikacja=QgsApplication([],False)
+    aplikacja.initQgis()
+    powiaty={}
+    for klucz,nr in konwerter.wczytaj_powiaty(os.path.join(PLUGIN_DIR,"Powiaty_w_strefach_PL-2000.csv")).items():
+        wojewodztwo,powiat=klucz.split(" ",1)
+        powiaty[(wojewodztwo,nazwa_powiatu(powiat))]=(wojewodztwo,powiat,nr)
+    prg=QgsVectorLayer(argv[1],"prg","ogr")
+    if not prg.isValid():
+        print(f"Nie można wczytać {argv[1]}")
+        return 1
+    fields=QgsFields()
+    fields.append(QgsField("Województwo",QVariant.String))
+    fields.append(QgsField("Powiat",QVariant.String))
+    fields.append(QgsField("Nr strefy",QVariant.String))
+    crs=QgsCoordinateReferenceSystem(konwerter.KOD_PL_ETRF2000)
+    proj=QgsCoordinateTransform(prg.crs(),crs,QgsProject.instance())
+    options=QgsVectorFileWriter.SaveVectorOptions()
+    options.driverName="GPKG"
+    options.layerName="powiaty"
+    sciezka=os.path.join(PLUGIN_DIR,"Powiaty_w_strefach_PL-2000.gpkg")
+    writer=QgsVectorFileWriter.create(sciezka,fields,QgsWkbTypes.MultiPolygon,crs,
+                                      QgsProject.instance().transformContext(),options)
+    znalezione=set()
+    for feature in prg.getFeatures():
+        wojewodztwo=WOJEWODZTWA.get(str(feature["JPT_KOD_JE"])[:2])
+        klucz=(wojewodztwo,nazwa_powiatu(str(feature["JPT_NAZWA_"])))
+        if klucz not in powiaty:
+            print(f"Brak powiatu w tabeli stref: {wojewodztwo} {feature['JPT_NAZWA_']}")
+            continue
+        geom=feature.geometry().simplify(tolerancja)
+        geom.transform(proj)
+        geom.convertToMultiType()
+        out=QgsFeature(fields)
+        out.setGeometry(geom)
+        out.setAttributes(list(powiaty[klucz]))
+        writer.addFeature(out)
+        znalezione.add(klucz)
+    del writer
+    for klucz in sorted(set(powiaty)-znalezione):
+        print(f"Brak granic powiatu: {' '.join(klucz)}")
+    aplikacja.exitQgis()
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# wydajnosc.py  -  Benchmarks of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Użycie w środowisku Pythona QGIS (bez interfejsu, wymaga tylko qgis.core):
+#   python wydajnosc.py [--zapisz] [--baza plik.json] [--tolerancja 0.2] [--rozmiary 1000,100000,10000000]
+#   python wydajnosc.py --sprawdz-gk
+# Mierzy osobno odczyt współrzędnych, budowę transformacji, formatowanie dms, oszacowanie
+# dokładności, przeliczenie wsadowe i konwersję pliku. Z opcją --zapisz wyniki zapisywane są
+# jako baza, w przeciwnym razie porównywane z bazą: czas na punkt dłuższy od bazowego
+# o więcej niż tolerancja oznaczany jest jako regresja i kończy skrypt kodem 1.
+# Z opcją --sprawdz-gk porównuje tylko przeliczenie gk_wsadowo z transformacją PROJ w strefach 5-8
+# i na ich granicach; odchylenie od TOLERANCJA_GK metrów kończy skrypt kodem 1.
+
+import os, sys, json, time, argparse, tempfile, platform
+
+import numpy as np
+
+from qgis.core import QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsProject
+
+PLUGIN_DIR=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,PLUGIN_DIR)
+
+import konwerter
+
+PLIK_BAZY=os.path.join(os.path.dirname(os.path.abspath(__file__)),"wydajnosc_baza.json")
+POWTORZENIA=3
+TOLERANCJA_GK=1e-4
+
+def zmierz(funkcja,powtorzenia=POWTORZENIA):
+    # Najkrótszy czas z powtórzeń w sekundach
+    najlepszy=None
+    for _ in range(powtorzenia):
+        start=time.perf_counter()
+        funkcja()
+        czas=time.perf_counter()-start
+        if najlepszy is None or czas<najlepszy:
+            najlepszy=czas
+    return najlepszy
+
+def punkty(n,ziarno=0):
+    rng=np.random.default_rng(ziarno)
+    b=rng.uniform(49.0,54.8,n)
+    l=rng.uniform(14.2,24.1,n)
+    return b,l
+
+def teksty_deg(b):
+    return [f"{v:.10f}" for v in b]
+
+def teksty_dms(b):
+    return [konwerter.deg_b_to_dms_text(v,7) for v in b]
+
+def zapisz_plik_punktow(sciezka,n):
+    with open(sciezka,"w",encoding="utf-8",newline="\n") as f:
+        for start in range(0,n,konwerter.ROZMIAR_PACZKI):
+            b,l=punkty(min(konwerter.ROZMIAR_PACZKI,n-start),start)
+            f.writelines(f"p{start+i} {b[i]:.10f} {l[i]:.10f}\n" for i in range(len(b)))
+
+def testy(rozmiary):
+    # Zwraca listę (nazwa, liczba punktów, funkcja)
+    n=100000
+    b,l=punkty(n)
+    deg=teksty_deg(b)
+    dms=teksty_dms(b[:n//10])
+    nr=konwerter.nr_strefy_z_dlugosci(l)
+    miejsca=np.full(n,10)
+    pula=konwerter.pula_transformacji()
+    zrodlo=QgsCoordinateReferenceSystem(konwerter.KOD_PL_ETRF2000)
+    cel=QgsCoordinateReferenceSystem(konwerter.kod_strefy(6))
+    kontekst=QgsProject.instance().transformContext()
+    lista=[
+        ("odczyt_deg",n,lambda: [konwerter.deg_text_to_deg(t,".") for t in deg]),
+        ("odczyt_dms",len(dms),lambda: [konwerter.dms_text_to_parts(t,".") for t in dms]),
+        ("odczyt_deg_wsadowo",n,lambda: konwerter.texts_to_deg(deg,".")),
+        ("odczyt_dms_wsadowo",len(dms),lambda: konwerter.texts_to_deg(dms,".")),
+        ("transformacja_nowa",1000,lambda: [QgsCoordinateTransform(zrodlo,cel,kontekst) for _ in range(1000)]),
+        ("transformacja_z_puli",1000,
+         lambda: [pula.transformacja(konwerter.KOD_PL_ETRF2000,konwerter.kod_strefy(6)) for _ in range(1000)]),
+        ("formatowanie_dms",n//10,lambda: [konwerter.deg_b_to_dms_text(v,7) for v in b[:n//10]]),
+        ("dokladnosc_wsadowo",n,lambda: konwerter.xy_round_accuracy_wsadowo("deg",miejsca,miejsca,b,l,nr)),
+        ("przeliczenie_proj",n,lambda: konwerter.konwertuj_wsadowo(b,l,nr)),
+        ("przeliczenie_gk",n,lambda: konwerter.gk_wsadowo(b,l,nr)),
+    ]
+    for rozmiar in rozmiary:
+        lista.append((f"plik_{rozmiar}",rozmiar,rozmiar))
+    return lista
+
+def uruchom(rozmiary):
+    wyniki={}
+    with tempfile.TemporaryDirectory() as katalog:
+        for nazwa,n,test in testy(rozmiary):
+            if isinstance(test,int):
+                sciezka_we=os.path.join(katalog,"we.txt")
+                sciezka_wy=os.path.join(katalog,"wy.txt")
+                zapisz_plik_punktow(sciezka_we,test)
+                powtorzenia=1 if test>1000000 else POWTORZENIA
+                czas=zmierz(lambda: konwerter.konwertuj_plik(sciezka_we,sciezka_wy,konwerter.STREFA_AUTO),
+                            powtorzenia)
+            else:
+                czas=zmierz(test)
+            wyniki[nazwa]={"n":n,"czas":czas,"czas_na_punkt":czas/n}
+            print(f"{nazwa:24s} {n:>10d} {czas:10.4f} s {czas/n*1e6:12.3f} µs/punkt",flush=True)
+    return wyniki
+
+def sprawdz_gk():
+    # Siatka φ całej Polski i λ od -1.5° do +1.5° od południka osiowego każdej strefy, z granicami
+    # stref 16.5°, 19.5°, 22.5° i punktami tuż obok nich; zwraca False przy odchyleniu od TOLERANCJA_GK
+    b=np.linspace(49.0,54.9,60)
+    poprawne=True
+    for nr in range(5,9):
+        srodek=3.0*nr
+        l=np.concatenate((np.linspace(srodek-1.5,srodek+1.5,61),srodek+np.array([-1.5,1.5])+1e-9,
+                          srodek+np.array([-1.5,1.5])-1e-9))
+        bb,ll=np.meshgrid(b,l)
+        odchylenie=konwerter.odchylenie_gk(bb.ravel(),ll.ravel(),nr)
+        znacznik="" if odchylenie<TOLERANCJA_GK else "BŁĄD"
+        print(f"strefa {nr} λ {srodek-1.5:.1f}-{srodek+1.5:.1f} {odchylenie*1000:10.6f} mm {znacznik}")
+        poprawne=poprawne and not znacznik
+    return poprawne
+
+def porownaj(wyniki,baza,tolerancja):
+    # Zwraca nazwy testów z regresją względem bazy
+    regresje=[]
+    for nazwa,wynik in wyniki.items():
+        bazowy=baza.get("wyniki",{}).get(nazwa)
+        if not bazowy:
+            continue
+        stosunek=wynik["czas_na_punkt"]/bazowy["czas_na_punkt"]
+        znacznik="REGRESJA" if stosunek>1+tolerancja else ""
+        print(f"{nazwa:24s} {stosunek:8.2f}x bazy {znacznik}")
+        if znacznik:
+            regresje.append(nazwa)
+    return regresje
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Pomiar wydajności konwertera PL-ETRF2000 - PL-2000")
+    parser.add_argument("--baza",default=PLIK_BAZY,help="plik JSON z wynikami bazowymi")
+    parser.add_argument("--zapisz",action="store_true",help="zapisanie wyników jako bazy")
+    parser.add_argument("--tolerancja",type=float,default=0.2,
+                        help="dopuszczalny względny wzrost czasu na punkt (domyślnie 0.2)")
+    parser.add_argument("--rozmiary",default="1000,100000,10000000",
+                        help="liczby punktów plików konwertowanych w całości (domyślnie 1000,100000,10000000)")
+    parser.add_argument("--sprawdz-gk",action="store_true",
+                        help=f"tylko porównanie gk_wsadowo z PROJ, kod 1 przy odchyleniu od {TOLERANCJA_GK} m")
+    args=parser.parse_args(argv)
+    rozmiary=[int(r) for r in args.rozmiary.split(",") if r]
+    konwerter.inicjuj_qgis()
+    if args.sprawdz_gk:
+        return 0 if sprawdz_gk() else 1
+    wyniki=uruchom(rozmiary)
+    if args.zapisz:
+        with open(args.baza,"w",encoding="utf-8") as f:
+            json.dump({"system":platform.platform(),"python":platform.python_version(),"wyniki":wyniki},
+                      f,indent=2,ensure_ascii=False)
+        print(f"Zapisano bazę {args.baza}")
+        return 0
+    if not os.path.isfile(args.baza):
+        print(f"Brak bazy {args.baza}, uruchom z opcją --zapisz")
+        return 0
+    with open(args.baza,encoding="utf-8") as f:
+        baza=json.load(f)
+    regresje=porownaj(wyniki,baza,args.tolerancja)
+    if regresje:
+        print(f"Regresje: {', '.join(regresje)}")
+        return 1
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
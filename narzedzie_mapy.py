@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# narzedzie_mapy.py  -  Map tool of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+
+from qgis.core import QgsCsException, QgsPointXY
+from qgis.gui import QgsMapToolEmitPoint
+
+from qgis.PyQt.QtCore import Qt, QTimer
+
+from . import konwerter
+from .konwerter import KOD_PL_ETRF2000, pula_transformacji
+from .powiaty import indeks_granic_powiatow
+
+ODSTEP_ODCZYTU=16
+
+class NarzedzieKonwersji(QgsMapToolEmitPoint):
+    # Kliknięcie na mapie wpisuje φ λ punktu do panelu i przelicza je do PL-2000, a ruch kursora
+    # pokazuje x y PL-2000 na pasku stanu. Zdarzenie ruchu zapamiętuje tylko ostatni punkt, który
+    # przeliczany jest najwyżej raz na ODSTEP_ODCZYTU ms (ok. 60 razy na sekundę)
+    # transformacjami z puli, bez budowania QgsCoordinateTransform dla zdarzenia.
+
+    def __init__(self,canvas,dock,iface):
+        super().__init__(canvas)
+        self.canvas=canvas
+        self.dock=dock
+        self.iface=iface
+        self.punkt=None
+        self.timer=QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(ODSTEP_ODCZYTU)
+        self.timer.timeout.connect(self.pokaz_odczyt)
+        self.setCursor(Qt.CrossCursor)
+
+    def pl_etrf2000(self,pt):
+        # Zwraca (φ, λ) PL-ETRF2000 punktu pt w układzie mapy albo None
+        crs=self.canvas.mapSettings().destinationCrs()
+        if crs.authid()!=KOD_PL_ETRF2000:
+            try:
+                pt=pula_transformacji().transformacja(crs,KOD_PL_ETRF2000).transform(QgsPointXY(pt))
+            except QgsCsException:
+                return None
+        return pt.y(),pt.x()
+
+    def kod_strefy(self,b,l):
+        # Strefa wybrana w panelu, None jeśli nie wybrano strefy albo punkt leży poza powiatami
+        kod=getattr(self.dock,'kod_strefy',"")
+        if kod==konwerter.STREFA_AUTO:
+            return konwerter.kod_strefy_z_dlugosci(l)
+        if kod==konwerter.STREFA_POWIATY:
+            nr=indeks_granic_powiatow().nr_strefy(l,b)
+            return konwerter.kod_strefy(nr) if nr else None
+        return kod or None
+
+    def canvasMoveEvent(self,e):
+        self.punkt=e.mapPoint()
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def canvasReleaseEvent(self,e):
+        if e.button()!=Qt.LeftButton:
+            return
+        bl=self.pl_etrf2000(e.mapPoint())
+        if bl is None:
+            self.iface.statusBarIface().showMessage("Transformacja współrzędnych nie powiodła się",2000)
+            return
+        self.dock.konwertuj_punkt_mapy(*bl)
+
+    def pokaz_odczyt(self):
+        if self.punkt is None:
+            return
+        bl=self.pl_etrf2000(self.punkt)
+        if bl is None:
+            return
+        b,l=bl
+        kod=self.kod_strefy(b,l)
+        if kod is None:
+            self.iface.statusBarIface().showMessage("PL-2000: nie wybrano strefy albo punkt leży poza powiatami")
+            return
+        try:
+            pt=pula_transformacji().transformacja(KOD_PL_ETRF2000,kod).transform(QgsPointXY(l,b))
+        except QgsCsException:
+            return
+        locale=getattr(self.dock,'locale',None)
+        x_text=locale.toString(pt.y(),'f',2) if locale else f"{pt.y():.2f}"
+        y_text=locale.toString(pt.x(),'f',2) if locale else f"{pt.x():.2f}"
+        self.iface.statusBarIface().showMessage(f"PL-2000 ({kod}) x {x_text} y {y_text}")
+
+    def deactivate(self):
+        self.timer.stop()
+        self.punkt=None
+        self.iface.statusBarIface().clearMessage()
+        super().deactivate()
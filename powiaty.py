@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# powiaty.py  -  County boundaries index of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Granice powiatów z atrybutami Województwo, Powiat i Nr strefy (jak w Powiaty_w_strefach_PL-2000.csv)
+# wczytywane są z pliku Powiaty_w_strefach_PL-2000.gpkg przygotowanego skryptem
+# narzedzia/przygotuj_granice_powiatow.py z Państwowego Rejestru Granic. Plik nie jest dołączony
+# do wtyczki, więc bez niego wybór strefy wg granic powiatów zgłasza BRAK_GRANIC_POWIATOW.
+
+import os, threading
+
+import numpy as np
+
+from qgis.core import \
+  QgsVectorLayer, QgsSpatialIndex, QgsGeometry, QgsRectangle, QgsPoint
+
+from .konwerter import KOD_PL_ETRF2000, pula_transformacji
+
+PLIK_GRANIC_POWIATOW=os.path.join(os.path.dirname(__file__),"Powiaty_w_strefach_PL-2000.gpkg")
+ROZMIAR_KOMORKI=0.01
+BRAK_GRANIC_POWIATOW=("Brak pliku z granicami powiatów Powiaty_w_strefach_PL-2000.gpkg w katalogu wtyczki. "
+                      "Plik można przygotować z granic powiatów PRG skryptem narzedzia/przygotuj_granice_powiatow.py.")
+
+class IndeksGranicPowiatow():
+    # Powiat punktu wyszukiwany jest w drzewie R (QgsSpatialIndex) prostokątów powiatów,
+    # a przynależność do kandydatów sprawdzana jest na przygotowanych geometriach GEOS.
+    # context - kontekst transformacji granic do PL-ETRF2000; w zadaniach w tle trzeba podać kontekst
+    # pobrany w wątku głównym, bo projektu nie można używać w innym wątku.
+
+    def __init__(self,sciezka=PLIK_GRANIC_POWIATOW,context=None):
+        if not os.path.isfile(sciezka):
+            raise OSError(BRAK_GRANIC_POWIATOW)
+        warstwa=QgsVectorLayer(sciezka,"powiaty","ogr")
+        if not warstwa.isValid():
+            raise OSError(f"Nie można wczytać granic powiatów z pliku {sciezka}")
+        proj=None
+        if warstwa.crs().authid()!=KOD_PL_ETRF2000:
+            proj=pula_transformacji().transformacja(warstwa.crs(),KOD_PL_ETRF2000,context)
+        self.nazwy=[]
+        strefy=[]
+        self._geometrie=[]
+        self._silniki=[]
+        self._indeks=QgsSpatialIndex()
+        for feature in warstwa.getFeatures():
+            geom=feature.geometry()
+            if proj:
+                geom.transform(proj)
+            i=len(self.nazwy)
+            self.nazwy.append(feature['Województwo']+' '+feature['Powiat'])
+            strefy.append(int(feature['Nr strefy']))
+            silnik=QgsGeometry.createGeometryEngine(geom.constGet())
+            silnik.prepareGeometry()
+            self._geometrie.append(geom)
+            self._silniki.append(silnik)
+            self._indeks.addFeature(i,geom.boundingBox())
+        self.strefy=np.array(strefy+[0],dtype=np.int8)
+
+    def powiat(self,l,b):
+        # Zwraca numer powiatu na liście nazwy albo -1 dla punktu poza powiatami
+        pt=QgsPoint(l,b)
+        for i in self._indeks.intersects(QgsRectangle(l,b,l,b)):
+            if self._silniki[i].intersects(pt):
+                return i
+        return -1
+
+    def nr_strefy(self,l,b):
+        return int(self.strefy[self.powiat(l,b)])
+
+    def powiaty_wsadowo(self,l,b):
+        # Punkty grupowane są w komórki ROZMIAR_KOMORKI stopni. Kandydaci wyszukiwani są raz
+        # dla komórki, a komórka leżąca w całości w jednym powiecie nie wymaga sprawdzania punktów.
+        l=np.asarray(l,dtype=np.float64)
+        b=np.asarray(b,dtype=np.float64)
+        wynik=np.full(len(l),-1,dtype=np.int64)
+        poprawne=np.flatnonzero(~(np.isnan(l)|np.isnan(b)))
+        komorki=np.floor(np.stack([l[poprawne],b[poprawne]],axis=1)/ROZMIAR_KOMORKI).astype(np.int64)
+        komorki,odwrotne=np.unique(komorki,axis=0,return_inverse=True)
+        odwrotne=odwrotne.ravel()
+        kolejnosc=np.argsort(odwrotne,kind="stable")
+        granice=np.searchsorted(odwrotne[kolejnosc],np.arange(len(komorki)+1))
+        for k,(kl,kb) in enumerate(komorki):
+            punkty=poprawne[kolejnosc[granice[k]:granice[k+1]]]
+            prostokat=QgsRectangle(kl*ROZMIAR_KOMORKI,kb*ROZMIAR_KOMORKI,
+                                   (kl+1)*ROZMIAR_KOMORKI,(kb+1)*ROZMIAR_KOMORKI)
+            kandydaci=self._indeks.intersects(prostokat)
+            if not kandydaci:
+                continue
+            if len(kandydaci)==1 and self._silniki[kandydaci[0]].contains(
+                    QgsGeometry.fromRect(prostokat).constGet()):
+                wynik[punkty]=kandydaci[0]
+                continue
+            for p in punkty:
+                pt=QgsPoint(l[p],b[p])
+                for i in kandydaci:
+                    if self._silniki[i].intersects(pt):
+                        wynik[p]=i
+                        break
+        return wynik
+
+    def strefy_wsadowo(self,l,b):
+        # Numery stref PL-2000 punktów, 0 dla punktów poza powiatami
+        return self.strefy[self.powiaty_wsadowo(l,b)]
+
+_watek=threading.local()
+
+def granice_powiatow_dostepne():
+    return os.path.isfile(PLIK_GRANIC_POWIATOW)
+
+def indeks_granic_powiatow(context=None):
+    # Indeks budowany jest raz na wątek, bo przygotowane geometrie GEOS
+    # nie mogą być używane równocześnie przez kilka wątków. context jak w IndeksGranicPowiatow.
+    indeks=getattr(_watek,'indeks',None)
+    if indeks is None:
+        indeks=IndeksGranicPowiatow(context=context)
+        _watek.indeks=indeks
+    return indeks
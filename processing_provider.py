@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# processing_provider.py  -  Processing provider of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+
+import os
+
+from qgis.core import \
+  QgsProcessingProvider, QgsProcessingAlgorithm, QgsProcessingParameterFeatureSource, \
+  QgsProcessingParameterEnum, QgsProcessingParameterField, QgsProcessingParameterFeatureSink, \
+  QgsProcessing, QgsProcessingException, QgsFeatureSink, QgsFeature, QgsFields, QgsField, \
+  QgsCsException
+
+from qgis.PyQt.QtCore import QVariant
+from qgis.PyQt.QtGui import QIcon
+
+from . import konwerter
+from .konwerter import KOD_PL_ETRF2000, KODY_STREF, pula_transformacji
+from .powiaty import indeks_granic_powiatow, granice_powiatow_dostepne, BRAK_GRANIC_POWIATOW
+
+PLUGIN_DIR=os.path.dirname(__file__)
+
+class KonwerterProvider(QgsProcessingProvider):
+
+    def loadAlgorithms(self):
+        self.addAlgorithm(KonwersjaWarstwyAlgorithm())
+
+    def id(self):
+        return "konwerter_pl2000"
+
+    def name(self):
+        return "Konwerter PL-ETRF2000 PL-2000"
+
+    def icon(self):
+        return QIcon(os.path.join(PLUGIN_DIR,"icon.png"))
+
+class KonwersjaWarstwyAlgorithm(QgsProcessingAlgorithm):
+
+    INPUT="INPUT"
+    ZONE_MODE="ZONE_MODE"
+    COUNTY_FIELD="COUNTY_FIELD"
+    ZONE="ZONE"
+    OUTPUTS={nr:f"OUTPUT_{nr}" for nr in KODY_STREF}
+
+    ZONE_FROM_LONGITUDE=0
+    ZONE_FROM_COUNTY=1
+    ZONE_FROM_COUNTY_BOUNDARIES=2
+    ZONE_FIXED=3
+    ZONE_MODES={ZONE_FROM_LONGITUDE:"wg długości geograficznej λ",ZONE_FROM_COUNTY:"wg powiatu",
+                ZONE_FROM_COUNTY_BOUNDARIES:"wg granic powiatów",ZONE_FIXED:"stała strefa"}
+
+    def createInstance(self):
+        return KonwersjaWarstwyAlgorithm()
+
+    def name(self):
+        return "pl_etrf2000_do_pl2000"
+
+    def displayName(self):
+        return "Konwersja warstwy PL-ETRF2000 do PL-2000"
+
+    def shortHelpString(self):
+        return "Przelicza punkty warstwy z układu PL-ETRF2000 (EPSG:9702) do układu PL-2000. " \
+               "Strefa układu PL-2000 wybierana jest dla każdego obiektu z długości geograficznej λ " \
+               "albo z atrybutu z nazwą powiatu według tabeli Powiaty_w_strefach_PL-2000.csv, " \
+               "albo z granic powiatu, w którym leży punkt (Powiaty_w_strefach_PL-2000.gpkg), " \
+               "albo jest jedna dla wszystkich obiektów. " \
+               "Nazwa powiatu może mieć postać \"województwo powiat\" albo samą nazwę powiatu, " \
+               "jeśli jednoznacznie wskazuje strefę. Obiekty każdej strefy zapisywane są do osobnej " \
+               "warstwy w układzie EPSG:2176-2179 z dodanymi atrybutami strefa, x_2000 i y_2000."
+
+    def zone_modes(self):
+        # Tryby wyboru strefy w kolejności opcji parametru ZONE_MODE, bez trybu granic powiatów,
+        # jeśli nie ma pliku Powiaty_w_strefach_PL-2000.gpkg
+        return [m for m in self.ZONE_MODES if m!=self.ZONE_FROM_COUNTY_BOUNDARIES or granice_powiatow_dostepne()]
+
+    def initAlgorithm(self,config=None):
+        self.addParameter(QgsProcessingParameterFeatureSource(
+            self.INPUT,"Warstwa punktowa PL-ETRF2000",[QgsProcessing.TypeVectorPoint]))
+        self.addParameter(QgsProcessingParameterEnum(
+            self.ZONE_MODE,"Wybór strefy",[self.ZONE_MODES[m] for m in self.zone_modes()],
+            defaultValue=self.zone_modes().index(self.ZONE_FROM_LONGITUDE)))
+        self.addParameter(QgsProcessingParameterEnum(
+            self.ZONE,"Stała strefa",[str(nr) for nr in KODY_STREF],defaultValue=1,optional=True))
+        self.addParameter(QgsProcessingParameterField(
+            self.COUNTY_FIELD,"Atrybut z nazwą powiatu",parentLayerParameterName=self.INPUT,
+            type=QgsProcessingParameterField.String,optional=True))
+        for nr,output in self.OUTPUTS.items():
+            self.addParameter(QgsProcessingParameterFeatureSink(
+                output,f"PL-2000 strefa {nr} ({KODY_STREF[nr]})",QgsProcessing.TypeVectorPoint,
+                optional=True,createByDefault=True))
+
+    def processAlgorithm(self,parameters,context,feedback):
+        source=self.parameterAsSource(parameters,self.INPUT,context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters,self.INPUT))
+        zone_mode=self.zone_modes()[self.parameterAsEnum(parameters,self.ZONE_MODE,context)]
+        county_field=self.parameterAsString(parameters,self.COUNTY_FIELD,context)
+        fixed_zone=list(KODY_STREF)[self.parameterAsEnum(parameters,self.ZONE,context)]
+        county_index=None
+        if zone_mode==self.ZONE_FROM_COUNTY:
+            if not county_field:
+                raise QgsProcessingException("Nie wybrano atrybutu z nazwą powiatu")
+            county_index=konwerter.indeks_tabeli_powiatow()
+            county_field_index=source.fields().lookupField(county_field)
+        county_boundaries=None
+        if zone_mode==self.ZONE_FROM_COUNTY_BOUNDARIES:
+            if not granice_powiatow_dostepne():
+                raise QgsProcessingException(BRAK_GRANIC_POWIATOW)
+            county_boundaries=indeks_granic_powiatow(context.transformContext())
+
+        fields=QgsFields(source.fields())
+        fields.append(QgsField("strefa",QVariant.Int))
+        fields.append(QgsField("x_2000",QVariant.Double))
+        fields.append(QgsField("y_2000",QVariant.Double))
+
+        pula=pula_transformacji()
+        transform_context=context.transformContext()
+        source_crs=source.sourceCrs()
+        to_etrf2000=None
+        if source_crs.authid()!=KOD_PL_ETRF2000:
+            to_etrf2000=pula.transformacja(source_crs,KOD_PL_ETRF2000,transform_context)
+
+        sinks={}
+        results={}
+        total=100.0/source.featureCount() if source.featureCount() else 0
+        skipped=0
+        for current,feature in enumerate(source.getFeatures()):
+            if feedback.isCanceled():
+                break
+            feedback.setProgress(int(current*total))
+            geom=feature.geometry()
+            if geom.isNull() or geom.isEmpty():
+                skipped+=1
+                continue
+            try:
+                if to_etrf2000:
+                    geom.transform(to_etrf2000)
+                if zone_mode==self.ZONE_FIXED:
+                    nr=fixed_zone
+                elif county_boundaries is not None:
+                    pt=geom.vertexAt(0)
+                    nr=county_boundaries.nr_strefy(pt.x(),pt.y())
+                    if not nr:
+                        feedback.reportError(f"Obiekt {feature.id()} leży poza granicami powiatów")
+                        skipped+=1
+                        continue
+                elif county_index is None:
+                    nr=int(konwerter.nr_strefy_z_dlugosci(geom.vertexAt(0).x()))
+                else:
+                    nr=konwerter.nr_strefy_powiatu(county_index,feature.attribute(county_field_index))
+                    if nr is None:
+                        feedback.reportError(f"Nieznany powiat obiektu {feature.id()}: "
+                                             f"{feature.attribute(county_field_index)}")
+                        skipped+=1
+                        continue
+                geom.transform(pula.transformacja(KOD_PL_ETRF2000,KODY_STREF[nr],transform_context))
+            except QgsCsException:
+                feedback.reportError(f"Transformacja współrzędnych obiektu {feature.id()} nie powiodła się")
+                skipped+=1
+                continue
+            if nr not in sinks:
+                sink,dest_id=self.parameterAsSink(parameters,self.OUTPUTS[nr],context,fields,
+                                                  source.wkbType(),pula.crs(KODY_STREF[nr]))
+                sinks[nr]=sink
+                if sink is not None:
+                    results[self.OUTPUTS[nr]]=dest_id
+            sink=sinks[nr]
+            if sink is None:
+                continue
+            pt=geom.vertexAt(0)
+            out=QgsFeature(fields)
+            out.setGeometry(geom)
+            out.setAttributes(feature.attributes()+[nr,pt.y(),pt.x()])
+            if not sink.addFeature(out,QgsFeatureSink.FastInsert):
+                raise QgsProcessingException(self.writeFeatureError(sink,parameters,self.OUTPUTS[nr]))
+        if skipped:
+            feedback.pushInfo(f"Pominięto obiektów: {skipped}")
+        return results
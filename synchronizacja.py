@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# synchronizacja.py  -  Incremental layer conversion of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Warstwa punktowa przeliczana jest do warstw tymczasowych stref PL-2000 (jak algorytm przetwarzania
+# Konwersja warstwy PL-ETRF2000 do PL-2000), a dla każdego obiektu zapamiętywany jest odcisk geometrii
+# i atrybutów, strefa i id obiektu wynikowego. Po zatwierdzeniu edycji warstwy przeliczane są tylko
+# obiekty dodane i zmienione, a obiekty usunięte usuwane są z warstw wynikowych. Zmiany poza sesją
+# edycji (np. w trybie transakcji albo przez inny program) uwzględnia synchronizuj, porównując odciski.
+
+import collections
+
+import numpy as np
+
+from qgis.core import \
+  QgsVectorLayer, QgsVectorLayerFeatureSource, QgsFeatureRequest, QgsFeature, QgsFields, QgsField, \
+  QgsGeometry, QgsPoint, QgsCoordinateReferenceSystem
+
+from qgis.PyQt.QtCore import QObject, QVariant, QTimer, pyqtSignal
+
+from . import konwerter
+from .konwerter import KOD_PL_ETRF2000, ROZMIAR_PACZKI, pula_transformacji
+
+Wpis=collections.namedtuple("Wpis","odcisk nr fid")
+
+def odcisk(feature):
+    return hash((bytes(feature.geometry().asWkb()),repr(feature.attributes())))
+
+class SynchronizacjaWarstwy(QObject):
+    # warstwa - warstwa punktowa, strefa - kod strefy, STREFA_AUTO albo STREFA_POWIATY.
+    # zbuduj przelicza całą warstwę i może działać w zadaniu w tle, bo czyta obiekty przez
+    # QgsVectorLayerFeatureSource, a transformację bierze z puli swojego wątku. Warstwy wynikowe
+    # należą do wątku głównego, więc przeliczone obiekty dodaje do nich dopiero zastosuj,
+    # wywoływane w wątku głównym po zakończeniu zadania. Po polacz zmiany zatwierdzone w warstwie przeliczane są w wątku głównym, a sygnał
+    # zaktualizowano podaje liczbę przeliczonych i usuniętych obiektów.
+    # Obiekty wielopunktowe reprezentowane są przez pierwszy punkt, a atrybuty wynikowe odpowiadają
+    # polom warstwy z chwili utworzenia synchronizacji.
+
+    zaktualizowano=pyqtSignal(int,int)
+
+    def __init__(self,warstwa,strefa,context=None):
+        super().__init__()
+        self.warstwa=warstwa
+        self.strefa=strefa
+        self.context=context
+        self.zrodlo=QgsVectorLayerFeatureSource(warstwa)
+        self.crs=QgsCoordinateReferenceSystem(warstwa.crs())
+        self.liczba_pol=warstwa.fields().count()
+        self.fields=QgsFields(warstwa.fields())
+        self.fields.append(QgsField("strefa",QVariant.Int))
+        self.fields.append(QgsField("x_2000",QVariant.Double))
+        self.fields.append(QgsField("y_2000",QVariant.Double))
+        self.warstwy={}
+        for nr,kod in konwerter.KODY_STREF.items():
+            wynik=QgsVectorLayer(f"Point?crs={kod}",f"{warstwa.name()} PL-2000 {kod}","memory")
+            wynik.dataProvider().addAttributes(self.fields.toList())
+            wynik.updateFields()
+            wynik.setReadOnly(True)
+            self.warstwy[nr]=wynik
+        self.wpisy={}
+        self.oczekujace=[]
+        self.zmienione=set()
+        self.usuniete=set()
+        self.wszystkie=False
+        self.polaczona=False
+        self.timer=QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.aktualizuj)
+
+    def zbuduj(self,feedback=None):
+        # Przelicza wszystkie obiekty warstwy do zastosuj, zwraca liczbę przeliczonych obiektów
+        proj=self._proj()
+        n=max(self.zrodlo.featureCount(),1)
+        paczka,przeliczone,odczytane=[],0,0
+        for feature in self.zrodlo.getFeatures():
+            paczka.append(feature)
+            if len(paczka)<ROZMIAR_PACZKI:
+                continue
+            przeliczone+=self._przelicz(paczka,proj)
+            odczytane+=len(paczka)
+            paczka=[]
+            if feedback:
+                feedback.setProcessedCount(odczytane)
+                feedback.setProgress(100*odczytane/n)
+                if feedback.isCanceled():
+                    return przeliczone
+        return przeliczone+self._przelicz(paczka,proj)
+
+    def _proj(self):
+        # Transformacja do PL-ETRF2000 z puli wątku wywołującego albo None dla warstwy w PL-ETRF2000
+        if self.crs.authid()==KOD_PL_ETRF2000:
+            return None
+        return pula_transformacji().transformacja(self.crs,KOD_PL_ETRF2000,self.context)
+
+    def warstwy_wynikowe(self):
+        # Warstwy stref z co najmniej jednym obiektem
+        return [w for w in self.warstwy.values() if w.featureCount()]
+
+    def _punkty(self,features,proj):
+        # Zwraca φ, λ PL-ETRF2000 pierwszych punktów geometrii, nan dla obiektów bez geometrii
+        n=len(features)
+        xs=np.full(n,np.nan)
+        ys=np.full(n,np.nan)
+        for i,feature in enumerate(features):
+            geom=feature.geometry()
+            if geom.isNull() or geom.isEmpty():
+                continue
+            pt=geom.vertexAt(0)
+            xs[i]=pt.x()
+            ys[i]=pt.y()
+        if proj is not None:
+            ok=~np.isnan(xs)
+            xs[ok],ys[ok]=konwerter._transformuj_tablice(proj,xs[ok],ys[ok])
+        return ys,xs
+
+    def _przelicz(self,features,proj):
+        # Przelicza obiekty do oczekujace: (nr strefy albo None, obiekty wynikowe, (id, odcisk) obiektów),
+        # bez zmian warstw wynikowych i wpisów; zwraca liczbę przeliczonych obiektów
+        if not features:
+            return 0
+        b,l=self._punkty(features,proj)
+        ok=~np.isnan(b)
+        nr=np.zeros(len(features),dtype=np.int8)
+        nr[ok]=konwerter._tablica_stref(self.strefa,int(np.count_nonzero(ok)),l[ok],b[ok],self.context)
+        x,y,_,_,_=konwerter.konwertuj_wsadowo(b,l,nr,context=self.context)
+        przeliczone=0
+        for z,idx in konwerter.koszyki_stref(nr):
+            if z not in self.warstwy:
+                self.oczekujace.append((None,[],[(features[i].id(),odcisk(features[i])) for i in idx]))
+                continue
+            wyniki,zrodla,pominiete=[],[],[]
+            for i in idx:
+                if np.isnan(x[i]):
+                    pominiete.append((features[i].id(),odcisk(features[i])))
+                    continue
+                out=QgsFeature(self.fields)
+                out.setGeometry(QgsGeometry(QgsPoint(float(y[i]),float(x[i]))))
+                atrybuty=features[i].attributes()[:self.liczba_pol]
+                atrybuty+=[None]*(self.liczba_pol-len(atrybuty))
+                out.setAttributes(atrybuty+[z,float(x[i]),float(y[i])])
+                wyniki.append(out)
+                zrodla.append((features[i].id(),odcisk(features[i])))
+            if pominiete:
+                self.oczekujace.append((None,[],pominiete))
+            self.oczekujace.append((z,wyniki,zrodla))
+            przeliczone+=len(wyniki)
+        return przeliczone
+
+    def zastosuj(self):
+        # Dodaje przeliczone obiekty do warstw stref i zapamiętuje ich wpisy, tylko w wątku głównym
+        oczekujace,self.oczekujace=self.oczekujace,[]
+        for z,wyniki,zrodla in oczekujace:
+            if z is None:
+                for fid,o in zrodla:
+                    self.wpisy[fid]=Wpis(o,None,None)
+                continue
+            dodano,wyniki=self.warstwy[z].dataProvider().addFeatures(wyniki)
+            if not dodano:
+                raise OSError(f"Nie można dodać obiektów do warstwy {self.warstwy[z].name()}")
+            for (fid,o),out in zip(zrodla,wyniki):
+                self.wpisy[fid]=Wpis(o,z,out.id())
+
+    def _dodaj(self,features):
+        # Przelicza obiekty w wątku głównym i od razu dodaje je do warstw stref
+        przeliczone=self._przelicz(features,self._proj())
+        self.zastosuj()
+        return przeliczone
+
+    def polacz(self):
+        if self.polaczona:
+            return
+        self.warstwa.committedFeaturesAdded.connect(self.warstwa_committedFeaturesAdded)
+        self.warstwa.committedFeaturesRemoved.connect(self.warstwa_committedFeaturesRemoved)
+        self.warstwa.committedGeometriesChanges.connect(self.warstwa_committedChanges)
+        self.warstwa.committedAttributeValuesChanges.connect(self.warstwa_committedChanges)
+        self.polaczona=True
+
+    def rozlacz(self):
+        if not self.polaczona:
+            return
+        self.timer.stop()
+        self.warstwa.committedFeaturesAdded.disconnect(self.warstwa_committedFeaturesAdded)
+        self.warstwa.committedFeaturesRemoved.disconnect(self.warstwa_committedFeaturesRemoved)
+        self.warstwa.committedGeometriesChanges.disconnect(self.warstwa_committedChanges)
+        self.warstwa.committedAttributeValuesChanges.disconnect(self.warstwa_committedChanges)
+        self.polaczona=False
+
+    def warstwa_committedFeaturesAdded(self,layer_id,features):
+        self.zmienione.update(f.id() for f in features)
+        self.timer.start()
+
+    def warstwa_committedFeaturesRemoved(self,layer_id,fids):
+        self.usuniete.update(fids)
+        self.timer.start()
+
+    def warstwa_committedChanges(self,layer_id,zmiany):
+        self.zmienione.update(zmiany.keys())
+        self.timer.start()
+
+    def synchronizuj(self):
+        # Porównuje odciski wszystkich obiektów warstwy, np. po zmianie danych poza sesją edycji
+        # albo ponownym uruchomieniu konwersji. Przeliczane są tylko obiekty ze zmienionym odciskiem.
+        self.wszystkie=True
+        self.aktualizuj()
+
+    def aktualizuj(self):
+        self.timer.stop()
+        usuniete,self.usuniete=self.usuniete,set()
+        zmienione,self.zmienione=self.zmienione-usuniete,set()
+        wszystkie,self.wszystkie=self.wszystkie,False
+        if wszystkie:
+            zmienione|=set(self.wpisy)-usuniete
+        do_usuniecia=collections.defaultdict(list)
+        def usun(fid):
+            wpis=self.wpisy.pop(fid,None)
+            if wpis is not None and wpis.nr is not None:
+                do_usuniecia[wpis.nr].append(wpis.fid)
+        for fid in usuniete:
+            usun(fid)
+        liczba_usunietych=len(usuniete)
+        features=[]
+        if zmienione or wszystkie:
+            request=QgsFeatureRequest() if wszystkie else QgsFeatureRequest().setFilterFids(list(zmienione))
+            znalezione=set()
+            for feature in self.warstwa.getFeatures(request):
+                znalezione.add(feature.id())
+                wpis=self.wpisy.get(feature.id())
+                if wpis is not None and wpis.odcisk==odcisk(feature):
+                    continue
+                usun(feature.id())
+                features.append(feature)
+            for fid in zmienione-znalezione:
+                usun(fid)
+                liczba_usunietych+=1
+        for nr,fids in do_usuniecia.items():
+            self.warstwy[nr].dataProvider().deleteFeatures(fids)
+        przeliczone=self._dodaj(features)
+        for nr in set(do_usuniecia)|{self.wpisy[f.id()].nr for f in features}:
+            if nr is not None:
+                self.warstwy[nr].updateExtents()
+                self.warstwy[nr].triggerRepaint()
+        if przeliczone or do_usuniecia:
+            self.zaktualizowano.emit(przeliczone,liczba_usunietych)
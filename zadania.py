@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# zadania.py  -  Background tasks of the PL-ETRF2000 to PL-2000 converter - QGIS plugin in python
+#     begin             : 2026-10-18
+#     author            : Szymon Kędziora
+#
+# Konwersje plików, wklejonego tekstu i warstw uruchamiane są jako zadania QgsTask w menedżerze
+# zadań QGIS, więc nie blokują wątku głównego, a kilka zadań może czekać w kolejce menedżera.
+
+import time, traceback
+
+from qgis.core import \
+  QgsApplication, QgsTask, QgsFeedback, QgsProject, QgsProcessingAlgRunnerTask, QgsProcessingContext, \
+  QgsProcessingFeedback, QgsMessageLog, Qgis
+
+from qgis.PyQt.QtCore import pyqtSignal
+
+from . import konwerter, eksport
+from .processing_provider import KonwersjaWarstwyAlgorithm
+
+ID_ALGORYTMU="konwerter_pl2000:pl_etrf2000_do_pl2000"
+
+class ZadanieKonwersji(QgsTask):
+    # Postęp i liczba przeliczonych wierszy przekazywane są w trakcie pracy sygnałem przeliczono,
+    # a koniec zadania sygnałem zakonczono w wątku głównym. Kontekst transformacji projektu
+    # pobierany jest przy tworzeniu zadania, bo projekt może być używany tylko w wątku głównym.
+    # praca - funkcja praca(feedback) wykonywana w tle, jej wynik zapisywany jest w wynik,
+    # a wyjątek w blad.
+
+    przeliczono=pyqtSignal(int,float)
+    zakonczono=pyqtSignal(bool)
+
+    def __init__(self,opis,praca):
+        super().__init__(opis,QgsTask.CanCancel)
+        self.praca=praca
+        self.context=QgsProject.instance().transformContext()
+        self.feedback=QgsFeedback()
+        self.feedback.progressChanged.connect(self.feedback_progressChanged)
+        self.wynik=None
+        self.blad=None
+        self.start=time.perf_counter()
+
+    def run(self):
+        self.start=time.perf_counter()
+        try:
+            self.wynik=self.praca(self.feedback)
+        except (OSError,ValueError) as e:
+            self.blad=e
+            return False
+        except Exception as e:
+            # Nieoczekiwany błąd nie może wyjść z wątku zadania, zapis w dzienniku do diagnozy
+            self.blad=e
+            QgsMessageLog.logMessage(traceback.format_exc(),"Konwerter PL-ETRF2000 PL-2000",Qgis.Critical)
+            return False
+        return not self.feedback.isCanceled()
+
+    def opis_bledu(self):
+        # Tekst błędu do panelu
+        if isinstance(self.blad,OSError):
+            return f"błąd pliku: {self.blad}"
+        if isinstance(self.blad,ValueError):
+            return str(self.blad)
+        return f"błąd {type(self.blad).__name__}: {self.blad}"
+
+    def czas(self):
+        return time.perf_counter()-self.start
+
+    def feedback_progressChanged(self,progress):
+        self.setProgress(progress)
+        self.przeliczono.emit(int(self.feedback.processedCount()),self.czas())
+
+    def cancel(self):
+        self.feedback.cancel()
+        super().cancel()
+
+    def finished(self,result):
+        self.zakonczono.emit(result)
+
+class ZadanieKonwersjiPliku(ZadanieKonwersji):
+    # konwerter.konwertuj_plik albo konwertuj_plik_odwrotnie w tle, wynik jak w tych funkcjach,
+    # a dla plików binarnych (.npy, .f64, .bin) konwerter.konwertuj_plik_binarny.
+    # Wynik w pliku .gpkg albo .shp zapisuje eksport.eksportuj_plik, a z podzial_stref=True wiersze
+    # każdej strefy zapisywane są do osobnego pliku konwerter.konwertuj_plik_strefami.
+    # zrodlo - konwerter.UkladZrodlowy współrzędnych φ λ albo None dla PL-ETRF2000 (bez odwrotnie).
+
+    def __init__(self,sciezka_we,sciezka_wy,strefa,separator,decimal_point,reverse_order,reverse_order_xy,
+                 odwrotnie=False,format="deg",podzial_stref=False,zrodlo=None):
+        super().__init__(f"Konwersja pliku {sciezka_we}",self.wykonaj)
+        self.sciezka_we=sciezka_we
+        self.sciezka_wy=sciezka_wy
+        self.strefa=strefa
+        self.separator=separator
+        self.decimal_point=decimal_point
+        self.reverse_order=reverse_order
+        self.reverse_order_xy=reverse_order_xy
+        self.odwrotnie=odwrotnie
+        self.format=format
+        self.podzial_stref=podzial_stref
+        self.zrodlo=zrodlo
+
+    def wykonaj(self,feedback):
+        if eksport.plik_wektorowy(self.sciezka_wy):
+            if self.odwrotnie or konwerter.plik_binarny(self.sciezka_we):
+                raise ValueError("do pliku .gpkg albo .shp można zapisać tylko wynik konwersji pliku tekstowego "
+                                 "do PL-2000")
+            return eksport.eksportuj_plik(
+                self.sciezka_we,self.sciezka_wy,self.strefa,self.separator,self.decimal_point,
+                self.reverse_order,feedback,self.context,zrodlo=self.zrodlo)
+        if konwerter.plik_binarny(self.sciezka_we):
+            return konwerter.konwertuj_plik_binarny(
+                self.sciezka_we,self.sciezka_wy,self.strefa,self.odwrotnie,self.reverse_order,
+                self.reverse_order_xy,feedback,self.context,zrodlo=None if self.odwrotnie else self.zrodlo)
+        if self.odwrotnie:
+            return konwerter.konwertuj_plik_odwrotnie(
+                self.sciezka_we,self.sciezka_wy,self.strefa,self.separator,self.decimal_point,self.format,
+                self.reverse_order,self.reverse_order_xy,feedback,self.context)
+        if self.podzial_stref:
+            return konwerter.konwertuj_plik_strefami(
+                self.sciezka_we,self.sciezka_wy,self.strefa,self.separator,self.decimal_point,
+                self.reverse_order,self.reverse_order_xy,feedback,self.context,zrodlo=self.zrodlo)
+        return konwerter.konwertuj_plik(
+            self.sciezka_we,self.sciezka_wy,self.strefa,self.separator,self.decimal_point,
+            self.reverse_order,self.reverse_order_xy,feedback,self.context,zrodlo=self.zrodlo)
+
+class ZadanieKonwersjiTekstu(ZadanieKonwersji):
+    # konwerter.konwertuj_tekst w tle, wynik jak w konwertuj_tekst
+
+    def __init__(self,text,strefa,separator,decimal_point,reverse_order,reverse_order_xy,zrodlo=None):
+        super().__init__("Konwersja wklejonych punktów",self.wykonaj)
+        self.text=text
+        self.strefa=strefa
+        self.separator=separator
+        self.decimal_point=decimal_point
+        self.reverse_order=reverse_order
+        self.reverse_order_xy=reverse_order_xy
+        self.zrodlo=zrodlo
+
+    def wykonaj(self,feedback):
+        return konwerter.konwertuj_tekst(self.text,self.strefa,self.separator,self.decimal_point,
+                                         self.reverse_order,self.reverse_order_xy,self.context,
+                                         feedback=feedback,zrodlo=self.zrodlo)
+
+class ZadanieSynchronizacji(ZadanieKonwersji):
+    # Pierwsze przeliczenie warstwy synchronizacja.SynchronizacjaWarstwy w tle,
+    # wynik: liczba przeliczonych obiektów
+
+    def __init__(self,synchronizacja):
+        super().__init__(f"Konwersja warstwy {synchronizacja.warstwa.name()}",self.wykonaj)
+        self.synchronizacja=synchronizacja
+
+    def wykonaj(self,feedback):
+        return self.synchronizacja.zbuduj(feedback)
+
+    def finished(self,result):
+        # Obiekty przeliczone w tle dodawane są do warstw wynikowych w wątku głównym
+        if result:
+            try:
+                self.synchronizacja.zastosuj()
+            except OSError as e:
+                self.blad=e
+                result=False
+        super().finished(result)
+
+def zadanie_konwersji_warstwy(warstwa,strefa):
+    # Algorytm przetwarzania konwersji warstwy w tle (QgsProcessingAlgRunnerTask) z wynikami
+    # w warstwach tymczasowych dodawanych do projektu po zakończeniu zadania.
+    # strefa - kod strefy z panelu, STREFA_AUTO albo STREFA_POWIATY
+    alg=QgsApplication.processingRegistry().createAlgorithmById(ID_ALGORYTMU)
+    parametry={KonwersjaWarstwyAlgorithm.INPUT:warstwa}
+    for output in KonwersjaWarstwyAlgorithm.OUTPUTS.values():
+        parametry[output]="TEMPORARY_OUTPUT"
+    if strefa==konwerter.STREFA_POWIATY:
+        tryb=KonwersjaWarstwyAlgorithm.ZONE_FROM_COUNTY_BOUNDARIES
+    elif strefa==konwerter.STREFA_AUTO:
+        tryb=KonwersjaWarstwyAlgorithm.ZONE_FROM_LONGITUDE
+    else:
+        tryb=KonwersjaWarstwyAlgorithm.ZONE_FIXED
+        parametry[KonwersjaWarstwyAlgorithm.ZONE]=list(konwerter.KODY_STREF).index(konwerter.nr_strefy(strefa))
+    parametry[KonwersjaWarstwyAlgorithm.ZONE_MODE]=alg.zone_modes().index(tryb)
+    context=QgsProcessingContext()
+    context.setProject(QgsProject.instance())
+    feedback=QgsProcessingFeedback()
+    zadanie=QgsProcessingAlgRunnerTask(alg,parametry,context,feedback)
+    zadanie.context=context
+    zadanie.feedback=feedback
+
+    def executed(successful,results):
+        if not successful:
+            return
+        for output in KonwersjaWarstwyAlgorithm.OUTPUTS.values():
+            if output not in results:
+                continue
+            wynik=context.takeResultLayer(results[output])
+            if wynik is not None:
+                wynik.setName(f"{warstwa.name()} PL-2000 {wynik.crs().authid()}")
+                QgsProject.instance().addMapLayer(wynik)
+
+    zadanie.executed.connect(executed)
+    return zadanie